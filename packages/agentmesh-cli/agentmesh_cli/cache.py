@@ -0,0 +1,68 @@
+"""Small on-disk cache for daemon responses that carry an ``ETag``.
+
+agentmeshd tags responses once every run in them has a final status. The
+client keeps those bodies here and revalidates them with ``If-None-Match``,
+so tracing a finished run again costs one 304 with no body. The cache is
+best effort: unreadable entries are misses and write errors are ignored.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+DEFAULT_MAX_ENTRIES = 64
+
+
+def default_cache_dir() -> Path:
+    raw = os.environ.get("AGENTMESH_CACHE_DIR")
+    if raw:
+        return Path(raw).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or "~/.cache"
+    return Path(base).expanduser() / "agentmesh"
+
+
+class ResponseCache:
+    """ETag-keyed JSON bodies, one file per key, least recently used evicted first."""
+
+    def __init__(self, directory: Path, *, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._dir = directory
+        self._max_entries = max_entries
+
+    def get(self, key: str) -> tuple[str, Any] | None:
+        """Return ``(etag, body)`` stored under ``key``, or ``None``."""
+        path = self._path(key)
+        try:
+            entry: dict[str, Any] = json.loads(path.read_bytes())
+            etag = entry["etag"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not isinstance(etag, str):
+            return None
+        return etag, entry.get("body")
+
+    def put(self, key: str, etag: str, body: Any) -> None:
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps({"etag": etag, "body": body}))
+            tmp.replace(path)
+            self._evict()
+        except OSError:
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _evict(self) -> None:
+        entries = sorted(self._dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in entries[: max(0, len(entries) - self._max_entries)]:
+            with contextlib.suppress(OSError):
+                path.unlink()
@@ -6,7 +6,8 @@ from agentmesh_cli.commands.discover import discover
 from agentmesh_cli.commands.nanoclaw import nanoclaw_app
 from agentmesh_cli.commands.openclaw import openclaw_app
 from agentmesh_cli.commands.run import run
-from agentmesh_cli.commands.trace import trace
+from agentmesh_cli.commands.sync import sync
+from agentmesh_cli.commands.trace import trace_app
 from agentmesh_cli.errors import CLIError
 from agentmesh_cli.output import print_error
 
@@ -18,7 +19,8 @@ app = typer.Typer(
 
 app.command()(discover)
 app.command()(run)
-app.command()(trace)
+app.command()(sync)
+app.add_typer(trace_app)
 app.add_typer(openclaw_app)
 app.add_typer(nanoclaw_app)
 
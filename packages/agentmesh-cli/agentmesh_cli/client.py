@@ -1,23 +1,85 @@
 from __future__ import annotations
 
+import json
 import os
+import socket
+from collections.abc import AsyncGenerator
+from pathlib import Path
 from typing import Any
+from urllib.parse import quote, urlencode
 
 import httpx
 
+from agentmesh_cli.cache import ResponseCache
+from agentmesh_cli.ingest import IngestStream, open_ingest_stream
+
 DEFAULT_DAEMON_URL = "http://127.0.0.1:8321"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+UNIX_SCHEME = "unix://"
+
+# Requests over a Unix socket still need an HTTP URL; the host is not used.
+_UDS_BASE_URL = "http://agentmeshd"
+
+# The daemon sends a keepalive every 15s; a silent stream this long is dead.
+_STREAM_TIMEOUT = httpx.Timeout(10.0, read=60.0)
+
+
+def default_data_dir() -> Path:
+    """The daemon's data directory, shared with the CLI's spool and embedded store."""
+    raw = os.environ.get("AGENTMESH_DATA_DIR", "~/.agentmesh")
+    return Path(raw).expanduser()
 
 
-def _resolve_daemon_url(override: str | None = None) -> str:
+def default_socket_path() -> Path:
+    return default_data_dir() / "agentmeshd.sock"
+
+
+def resolve_daemon_url(override: str | None = None) -> str:
+    """Pick the daemon URL: explicit, ``$AGENTMESH_DAEMON_URL``, local socket, TCP default."""
     if override:
         return override
-    return os.environ.get("AGENTMESH_DAEMON_URL", DEFAULT_DAEMON_URL)
+    env_url = os.environ.get("AGENTMESH_DAEMON_URL")
+    if env_url:
+        return env_url
+    socket_path = default_socket_path()
+    if socket_path.is_socket() and _accepts_connections(socket_path):
+        return f"{UNIX_SCHEME}{socket_path}"
+    return DEFAULT_DAEMON_URL
+
+
+def _accepts_connections(socket_path: Path) -> bool:
+    """Whether a daemon listens on ``socket_path``, not just a file left by a killed one."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(1.0)
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
 
 
 class AgentmeshdClient:
-    def __init__(self, base_url: str | None = None) -> None:
-        self._base_url = _resolve_daemon_url(base_url)
-        self._client = httpx.AsyncClient(base_url=self._base_url, timeout=10.0)
+    """Async client for the agentmeshd HTTP API.
+
+    ``base_url`` may be ``unix:///path/to/agentmeshd.sock`` to talk to the
+    daemon over a Unix domain socket. Without an explicit URL or
+    ``$AGENTMESH_DAEMON_URL``, the daemon's socket in the data directory is
+    used when a daemon listens on it, and ``http://127.0.0.1:8321`` otherwise.
+    """
+
+    def __init__(self, base_url: str | None = None, *, cache: ResponseCache | None = None) -> None:
+        self._base_url = resolve_daemon_url(base_url)
+        self._uds: str | None = None
+        if self._base_url.startswith(UNIX_SCHEME):
+            self._uds = str(Path(self._base_url.removeprefix(UNIX_SCHEME)).expanduser())
+            self._client = httpx.AsyncClient(
+                base_url=_UDS_BASE_URL,
+                transport=httpx.AsyncHTTPTransport(uds=self._uds),
+                timeout=10.0,
+            )
+        else:
+            self._client = httpx.AsyncClient(base_url=self._base_url, timeout=10.0)
+        self._cache = cache
 
     async def healthz(self) -> bool:
         try:
@@ -32,14 +94,56 @@ class AgentmeshdClient:
         result: dict[str, Any] = resp.json()
         return result
 
+    async def post_events(self, events: list[dict[str, Any]]) -> dict[str, Any]:
+        """Post a batch of events in one request; returns per-item results."""
+        resp = await self._client.post("/api/events/batch", json=events)
+        resp.raise_for_status()
+        result: dict[str, Any] = resp.json()
+        return result
+
+    async def open_ingest_stream(self, run_id: str) -> IngestStream | None:
+        """Open a WebSocket ingest channel for ``run_id``; ``None`` if unavailable."""
+        if self._uds is not None:
+            return await open_ingest_stream(_UDS_BASE_URL, run_id, uds=self._uds)
+        return await open_ingest_stream(self._base_url.rstrip("/"), run_id)
+
     async def get_events(
         self,
         *,
         run_id: str | None = None,
         task_id: str | None = None,
         kind: str | None = None,
+        team_run_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        after_id: int | None = None,
         limit: int = 200,
     ) -> list[dict[str, Any]]:
+        events, _ = await self.get_events_page(
+            run_id=run_id,
+            task_id=task_id,
+            kind=kind,
+            team_run_id=team_run_id,
+            since=since,
+            until=until,
+            after_id=after_id,
+            limit=limit,
+        )
+        return events
+
+    async def get_events_page(
+        self,
+        *,
+        run_id: str | None = None,
+        task_id: str | None = None,
+        kind: str | None = None,
+        team_run_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        after_id: int | None = None,
+        limit: int = 200,
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """Fetch one page of events and the cursor for the next page, if any."""
         params: dict[str, str | int] = {"limit": limit}
         if run_id is not None:
             params["run_id"] = run_id
@@ -47,10 +151,210 @@ class AgentmeshdClient:
             params["task_id"] = task_id
         if kind is not None:
             params["kind"] = kind
+        if team_run_id is not None:
+            params["team_run_id"] = team_run_id
+        if since is not None:
+            params["since"] = since
+        if until is not None:
+            params["until"] = until
+        if after_id is not None:
+            params["after_id"] = after_id
         resp = await self._client.get("/api/events", params=params)
         resp.raise_for_status()
         result: list[dict[str, Any]] = resp.json()
+        cursor = resp.headers.get(NEXT_CURSOR_HEADER)
+        return result, int(cursor) if cursor else None
+
+    async def get_all_events(
+        self,
+        *,
+        run_id: str | None = None,
+        task_id: str | None = None,
+        kind: str | None = None,
+        team_run_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        page_size: int = 1000,
+    ) -> list[dict[str, Any]]:
+        """Fetch every matching event by following the pagination cursor."""
+        events: list[dict[str, Any]] = []
+        cursor: int | None = None
+        while True:
+            page, cursor = await self.get_events_page(
+                run_id=run_id,
+                task_id=task_id,
+                kind=kind,
+                team_run_id=team_run_id,
+                since=since,
+                until=until,
+                after_id=cursor,
+                limit=page_size,
+            )
+            events.extend(page)
+            if cursor is None:
+                return events
+
+    async def iter_events(
+        self,
+        *,
+        run_id: str | None = None,
+        task_id: str | None = None,
+        kind: str | None = None,
+        team_run_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        after_id: int | None = None,
+        limit: int = 0,
+    ) -> AsyncGenerator[dict[str, Any]]:
+        """Yield matching events one by one from a single NDJSON response.
+
+        The daemon streams the result page by page, so neither side holds
+        the full result in memory. ``limit=0`` yields every matching event.
+        """
+        params: dict[str, str | int] = {"format": "ndjson", "limit": limit}
+        if run_id is not None:
+            params["run_id"] = run_id
+        if task_id is not None:
+            params["task_id"] = task_id
+        if kind is not None:
+            params["kind"] = kind
+        if team_run_id is not None:
+            params["team_run_id"] = team_run_id
+        if since is not None:
+            params["since"] = since
+        if until is not None:
+            params["until"] = until
+        if after_id is not None:
+            params["after_id"] = after_id
+        async with self._client.stream(
+            "GET", "/api/events", params=params, timeout=_STREAM_TIMEOUT
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if line:
+                    event: dict[str, Any] = json.loads(line)
+                    yield event
+
+    async def search_events(
+        self,
+        query: str,
+        *,
+        run_id: str | None = None,
+        kind: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        cursor: str | None = None,
+        limit: int = 50,
+        fts_syntax: bool = False,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Full-text search over payload text, best match first.
+
+        The words of ``query`` match literally unless ``fts_syntax`` is set,
+        in which case it is sent as an FTS5 query. Returns one page of events
+        and the opaque cursor for the next page.
+        """
+        params: dict[str, str | int] = {"q": query, "limit": limit}
+        if fts_syntax:
+            params["syntax"] = "fts"
+        if run_id is not None:
+            params["run_id"] = run_id
+        if kind is not None:
+            params["kind"] = kind
+        if since is not None:
+            params["since"] = since
+        if until is not None:
+            params["until"] = until
+        if cursor is not None:
+            params["cursor"] = cursor
+        resp = await self._client.get("/api/events", params=params)
+        if resp.status_code == 400:
+            error = resp.json().get("error", "invalid search query")
+            raise ValueError(error)
+        resp.raise_for_status()
+        result: list[dict[str, Any]] = resp.json()
+        return result, resp.headers.get(NEXT_CURSOR_HEADER)
+
+    async def get_trace(
+        self, id: str, *, after_id: int | None = None, limit: int | None = None
+    ) -> dict[str, Any] | None:
+        """Resolve a run, task or team run id to its runs and events in one request.
+
+        Returns the daemon's ``{"id", "match", "run_ids", "runs", "events"}``
+        document, or ``None`` if the id is unknown. Without ``limit`` every
+        event of the resolved runs is included. With a cache, finished runs
+        are revalidated by ETag instead of downloaded again.
+        """
+        params: dict[str, str | int] = {}
+        if after_id is not None:
+            params["after_id"] = after_id
+        if limit is not None:
+            params["limit"] = limit
+        path = f"/api/trace/{quote(id, safe='')}"
+        key = f"{self._base_url}{path}?{urlencode(sorted(params.items()))}"
+        cached = self._cache.get(key) if self._cache is not None else None
+        headers = {"If-None-Match": cached[0]} if cached is not None else {}
+        resp = await self._client.get(path, params=params, headers=headers)
+        if resp.status_code == 304 and cached is not None:
+            cached_result: dict[str, Any] = cached[1]
+            return cached_result
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        result: dict[str, Any] = resp.json()
+        etag = resp.headers.get("ETag")
+        if self._cache is not None and etag:
+            self._cache.put(key, etag, result)
         return result
 
+    async def stream_events(
+        self,
+        *,
+        run_id: str | None = None,
+        task_id: str | None = None,
+        kind: str | None = None,
+        team_run_id: str | None = None,
+        after_id: int | None = None,
+    ) -> AsyncGenerator[tuple[int, dict[str, Any]]]:
+        """Yield ``(id, event)`` from the daemon's SSE stream until the caller stops.
+
+        With ``after_id`` the daemon first replays stored events after it. If
+        the daemon ends the stream (e.g. the subscriber fell behind), this
+        reconnects from the last id seen, so no event is skipped or repeated.
+        """
+        params: dict[str, str] = {}
+        if run_id is not None:
+            params["run_id"] = run_id
+        if task_id is not None:
+            params["task_id"] = task_id
+        if kind is not None:
+            params["kind"] = kind
+        if team_run_id is not None:
+            params["team_run_id"] = team_run_id
+        last_id = after_id
+        while True:
+            headers = {"Last-Event-ID": str(last_id)} if last_id is not None else {}
+            async with self._client.stream(
+                "GET",
+                "/api/events/stream",
+                params=params,
+                headers=headers,
+                timeout=_STREAM_TIMEOUT,
+            ) as resp:
+                resp.raise_for_status()
+                event_id: int | None = None
+                data: list[str] = []
+                async for line in resp.aiter_lines():
+                    if line.startswith("id:"):
+                        event_id = int(line[3:].strip())
+                    elif line.startswith("data:"):
+                        data.append(line[5:].lstrip())
+                    elif not line:
+                        if event_id is not None and data:
+                            event: dict[str, Any] = json.loads("\n".join(data))
+                            last_id = event_id
+                            yield event_id, event
+                        event_id = None
+                        data = []
+
     async def close(self) -> None:
         await self._client.aclose()
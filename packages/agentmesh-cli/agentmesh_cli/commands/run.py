@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import json
+import os
 import uuid
 from pathlib import Path
 from typing import Annotated
@@ -44,7 +45,7 @@ def run(
     ] = False,
     no_daemon: Annotated[
         bool,
-        typer.Option("--no-daemon", help="Skip daemon check."),
+        typer.Option("--no-daemon", help="Skip daemon check and spool events locally."),
     ] = False,
     daemon_url: Annotated[
         str | None,
@@ -99,23 +100,32 @@ async def _run_invoke(
 ) -> None:
     from agentmesh_cli.a2a_invoke import invoke_agent
     from agentmesh_cli.client import AgentmeshdClient
+    from agentmesh_cli.embedded import EmbeddedStore, open_embedded_store
     from agentmesh_cli.event_recorder import EventRecorder
+    from agentmesh_cli.spool import SpoolWriter, default_spool_dir
 
-    # 1. Check daemon connectivity
-    client: AgentmeshdClient | None = None
+    # 1. Check daemon connectivity; events the daemon can't take are spooled
+    client: AgentmeshdClient | EmbeddedStore | None = None
     recorder: EventRecorder
+    spool = SpoolWriter(default_spool_dir())
 
     if no_daemon:
-        recorder = EventRecorder(None)
+        recorder = EventRecorder(None, spool=spool)
     else:
         client = AgentmeshdClient(base_url=daemon_url)
-        recorder = EventRecorder(client)
+        recorder = EventRecorder(client, spool=spool, websocket=True)
         if not await recorder.try_connect():
             await client.close()
-            raise DaemonUnavailableError(
-                "agentmeshd not running — trace will be unavailable. "
-                "Start with 'agentmeshd start' or use --no-daemon."
-            )
+            # Without an explicit daemon URL, record into the local store directly.
+            explicit_url = daemon_url or os.environ.get("AGENTMESH_DAEMON_URL")
+            client = None if explicit_url else open_embedded_store()
+            if client is None:
+                raise DaemonUnavailableError(
+                    "agentmeshd not running — trace will be unavailable. "
+                    "Start with 'agentmeshd start' or use --no-daemon."
+                )
+            recorder = EventRecorder(client, spool=spool)
+            console.print(f"[dim]agentmeshd not running; recording to {client.data_dir}[/dim]")
 
     try:
         # 2. Auto-detect token if not provided
@@ -195,6 +205,14 @@ async def _run_invoke(
             console.print(f"[dim]task_id: {task_id}[/dim]")
 
     finally:
+        await recorder.close()
+        if recorder.dropped:
+            print_warning(f"{recorder.dropped} event(s) could not be recorded to agentmeshd")
+        if spool.count:
+            console.print(
+                f"[dim]{spool.count} event(s) spooled to {spool.directory}; "
+                "upload them with 'agentmesh sync'[/dim]"
+            )
         if client:
             await client.close()
 
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Annotated
+
+import typer
+
+from agentmesh_cli.errors import DaemonUnavailableError, ExitCode
+from agentmesh_cli.output import console, print_error, print_success
+
+if TYPE_CHECKING:
+    from agentmesh_cli.spool import SyncStats
+
+
+def sync(
+    daemon_url: Annotated[
+        str | None,
+        typer.Option("--daemon-url", help="agentmeshd URL."),
+    ] = None,
+) -> None:
+    """Upload events spooled while agentmeshd was unavailable."""
+    try:
+        stats = asyncio.run(_sync(daemon_url=daemon_url))
+    except DaemonUnavailableError as e:
+        print_error(str(e))
+        raise typer.Exit(code=e.exit_code) from None
+    except Exception as e:
+        print_error(f"Sync failed: {e}")
+        raise typer.Exit(code=ExitCode.GENERAL_ERROR) from None
+
+    if stats.segments == 0:
+        console.print("[dim]Nothing to sync.[/dim]")
+        return
+    print_success(f"Uploaded {stats.uploaded} event(s) from {stats.segments} spool file(s).")
+    if stats.duplicates:
+        console.print(f"[dim]{stats.duplicates} event(s) were already stored.[/dim]")
+    if stats.failed:
+        print_error(f"{stats.failed} spooled event(s) were rejected.")
+        raise typer.Exit(code=ExitCode.GENERAL_ERROR)
+
+
+async def _sync(*, daemon_url: str | None) -> SyncStats:
+    from agentmesh_cli.client import AgentmeshdClient
+    from agentmesh_cli.spool import default_spool_dir, replay
+
+    client = AgentmeshdClient(base_url=daemon_url)
+    try:
+        if not await client.healthz():
+            raise DaemonUnavailableError(
+                "agentmeshd not running — sync requires daemon. Start with 'agentmeshd start'."
+            )
+        return await replay(client, default_spool_dir())
+    finally:
+        await client.close()
@@ -1,15 +1,52 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
-from typing import Annotated, Any
+from typing import TYPE_CHECKING, Annotated, Any
 
 import typer
+from typer.core import TyperGroup
 
 from agentmesh_cli.errors import DaemonUnavailableError, ExitCode
-from agentmesh_cli.output import console, print_error, print_trace_timeline
+from agentmesh_cli.output import (
+    console,
+    print_error,
+    print_search_results,
+    print_trace_event,
+    print_trace_header,
+    print_trace_summary,
+    print_trace_timeline,
+)
+
+if TYPE_CHECKING:
+    from agentmesh_cli.client import AgentmeshdClient
+
+# A2A task states after which a run produces no more events. Mirrors
+# agentmeshd.events.TERMINAL_STATES (the CLI does not depend on agentmeshd);
+# tests/test_cli_trace.py checks the two agree.
+_TERMINAL_STATES = frozenset({"completed", "failed", "canceled", "rejected"})
+
+
+class _TraceGroup(TyperGroup):
+    """Run ``show`` for ``trace <id>``, so ids and subcommands share one command."""
+
+    # ``ctx`` is click's Context, which newer typer releases vendor.
+    def parse_args(self, ctx: Any, args: list[str]) -> list[str]:
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = ["show", *args]
+        return super().parse_args(ctx, args)
+
+
+trace_app = typer.Typer(
+    name="trace",
+    cls=_TraceGroup,
+    help="View the event trace for a task or run, or search events.",
+    no_args_is_help=True,
+)
 
 
+@trace_app.command("show")
 def trace(
     id: Annotated[str, typer.Argument(help="Task ID or Run ID to trace.")],
     format: Annotated[
@@ -20,8 +57,27 @@ def trace(
         str | None,
         typer.Option("--daemon-url", help="agentmeshd URL."),
     ] = None,
+    follow: Annotated[
+        bool,
+        typer.Option(
+            "--follow", "-f", help="Keep streaming new events until the run reaches a final status."
+        ),
+    ] = False,
 ) -> None:
     """View the event trace for a task or run."""
+    if follow:
+        try:
+            asyncio.run(_follow_trace(id=id, daemon_url=daemon_url, as_json=format == "json"))
+        except KeyboardInterrupt:
+            raise typer.Exit(code=ExitCode.OK) from None
+        except DaemonUnavailableError as e:
+            print_error(str(e))
+            raise typer.Exit(code=e.exit_code) from None
+        except Exception as e:
+            print_error(f"Trace failed: {e}")
+            raise typer.Exit(code=ExitCode.GENERAL_ERROR) from None
+        return
+
     try:
         events, resolved_id = asyncio.run(_fetch_trace(id=id, daemon_url=daemon_url))
     except DaemonUnavailableError as e:
@@ -41,35 +97,170 @@ def trace(
         print_trace_timeline(events, resolved_id)
 
 
+@trace_app.command("search")
+def search(
+    query: Annotated[
+        str,
+        typer.Argument(help="Text to find; every word must match, taken literally."),
+    ],
+    fts: Annotated[
+        bool,
+        typer.Option("--fts", help='Treat QUERY as FTS5 syntax: "phrases", OR, NOT, prefix*.'),
+    ] = False,
+    kind: Annotated[
+        str | None,
+        typer.Option("--kind", help="Only events of this kind, e.g. error."),
+    ] = None,
+    run_id: Annotated[
+        str | None,
+        typer.Option("--run-id", help="Only events of this run."),
+    ] = None,
+    limit: Annotated[int, typer.Option("--limit", help="Results per page.")] = 20,
+    cursor: Annotated[
+        str | None,
+        typer.Option("--cursor", help="Continue from a previous page."),
+    ] = None,
+    format: Annotated[
+        str,
+        typer.Option("--format", help="Output format: table or json."),
+    ] = "table",
+    daemon_url: Annotated[
+        str | None,
+        typer.Option("--daemon-url", help="agentmeshd URL."),
+    ] = None,
+) -> None:
+    """Search event payload text across all runs, best match first."""
+    try:
+        events, next_cursor = asyncio.run(
+            _search(
+                query=query,
+                kind=kind,
+                run_id=run_id,
+                limit=limit,
+                cursor=cursor,
+                fts=fts,
+                daemon_url=daemon_url,
+            )
+        )
+    except DaemonUnavailableError as e:
+        print_error(str(e))
+        raise typer.Exit(code=e.exit_code) from None
+    except Exception as e:
+        print_error(f"Search failed: {e}")
+        raise typer.Exit(code=ExitCode.GENERAL_ERROR) from None
+
+    if not events:
+        print_error(f"No events match '{query}'.")
+        raise typer.Exit(code=ExitCode.GENERAL_ERROR)
+
+    if format == "json":
+        console.print_json(json.dumps({"events": events, "next_cursor": next_cursor}))
+    else:
+        print_search_results(events, query)
+        if next_cursor:
+            console.print(f"[dim]More results: --cursor {next_cursor}[/dim]")
+
+
+async def _search(
+    *,
+    query: str,
+    kind: str | None,
+    run_id: str | None,
+    limit: int,
+    cursor: str | None,
+    fts: bool,
+    daemon_url: str | None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    from agentmesh_cli.client import AgentmeshdClient
+
+    client = AgentmeshdClient(base_url=daemon_url)
+    try:
+        await _require_daemon(client)
+        return await client.search_events(
+            query, run_id=run_id, kind=kind, cursor=cursor, limit=limit, fts_syntax=fts
+        )
+    finally:
+        await client.close()
+
+
 async def _fetch_trace(
     *,
     id: str,
     daemon_url: str | None,
 ) -> tuple[list[dict[str, Any]], str]:
+    from agentmesh_cli.cache import ResponseCache, default_cache_dir
+    from agentmesh_cli.client import AgentmeshdClient
+
+    client = AgentmeshdClient(base_url=daemon_url, cache=ResponseCache(default_cache_dir()))
+    try:
+        await _require_daemon(client)
+        # The daemon resolves run, task and team run ids to complete runs.
+        trace = await client.get_trace(id)
+        if trace is None:
+            return [], id
+        run_ids: list[str] = trace.get("run_ids") or []
+        resolved_id = run_ids[0] if trace.get("match") != "team_run_id" and run_ids else id
+        return trace.get("events") or [], resolved_id
+    finally:
+        await client.close()
+
+
+async def _follow_trace(*, id: str, daemon_url: str | None, as_json: bool) -> None:
+    """Print the run's timeline, then stream new events until a final status.
+
+    Uses the daemon's SSE stream, which replays stored events before live
+    ones, so history and follow-up arrive on one connection without polling.
+    """
     from agentmesh_cli.client import AgentmeshdClient
 
     client = AgentmeshdClient(base_url=daemon_url)
     try:
-        if not await client.healthz():
-            raise DaemonUnavailableError(
-                "agentmeshd not running — trace requires daemon. Start with 'agentmeshd start'."
-            )
+        await _require_daemon(client)
+        run_id = await _resolve_run_id(client, id)
+        if not as_json:
+            console.print(f"[dim]Following {run_id} (Ctrl-C to stop)[/dim]")
 
-        # Try as run_id first
-        events = await client.get_events(run_id=id)
-        if events:
-            return events, id
-
-        # Try as task_id, then re-fetch by run_id for the complete set
-        events = await client.get_events(task_id=id)
-        if events:
-            run_id = events[0].get("run_id", "")
-            if run_id:
-                full_events = await client.get_events(run_id=run_id)
-                if full_events:
-                    return full_events, run_id
-            return events, id
-
-        return [], id
+        first: dict[str, Any] | None = None
+        last: dict[str, Any] | None = None
+        count = 0
+        stream = client.stream_events(run_id=run_id, after_id=0)
+        async with contextlib.aclosing(stream):
+            async for _, event in stream:
+                if as_json:
+                    typer.echo(json.dumps(event))
+                else:
+                    if first is None:
+                        print_trace_header(event, run_id)
+                    print_trace_event(event)
+                first = first or event
+                last = event
+                count += 1
+                if _is_final_status(event):
+                    break
+        if first is not None and last is not None and not as_json:
+            print_trace_summary(first, last, count)
     finally:
         await client.close()
+
+
+async def _require_daemon(client: AgentmeshdClient) -> None:
+    if not await client.healthz():
+        raise DaemonUnavailableError(
+            "agentmeshd not running — trace requires daemon. Start with 'agentmeshd start'."
+        )
+
+
+async def _resolve_run_id(client: AgentmeshdClient, id: str) -> str:
+    """Map a task id to its run id; anything else is taken as a (maybe future) run id."""
+    trace = await client.get_trace(id, limit=1)
+    if trace is None or trace.get("match") != "task_id" or not trace.get("run_ids"):
+        return id
+    return str(trace["run_ids"][0])
+
+
+def _is_final_status(event: dict[str, Any]) -> bool:
+    if event.get("kind") != "status":
+        return False
+    metadata: dict[str, Any] = event.get("metadata") or {}
+    payload: dict[str, Any] = event.get("payload") or {}
+    return metadata.get("final") is True or payload.get("state") in _TERMINAL_STATES
@@ -0,0 +1,66 @@
+"""Record events straight into the local agentmeshd store.
+
+When no daemon answers, ``agentmesh run`` opens
+:class:`agentmeshd.store.EventStore` on the data directory in-process (if the
+``agentmeshd`` package is installed), so the run is still traced, without
+the HTTP hop or a JSON round trip per batch. The store's writer lock keeps
+this safe: it is only opened while no daemon or other writer holds the data
+directory, and a daemon started during the run waits a bounded time for it
+to close.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+from pathlib import Path
+from typing import Any
+
+from agentmesh_cli.client import default_data_dir
+from agentmesh_cli.spool import to_event_v1
+
+
+def _load_agentmeshd() -> Any:
+    try:
+        return importlib.import_module("agentmeshd")
+    except ImportError:
+        return None
+
+
+class EmbeddedStore:
+    """Stands in for :class:`AgentmeshdClient` as an :class:`EventRecorder` sink."""
+
+    def __init__(self, agentmeshd: Any, store: Any, data_dir: Path) -> None:
+        self._agentmeshd = agentmeshd
+        self._store = store
+        self.data_dir = data_dir
+
+    async def healthz(self) -> bool:
+        return True
+
+    async def post_events(self, events: list[dict[str, Any]]) -> dict[str, Any]:
+        """Commit a batch on a worker thread; returns counts like the batch endpoint."""
+        batch = [self._agentmeshd.EventV1.from_dict(to_event_v1(event)) for event in events]
+        results = await asyncio.to_thread(self._store.ingest, batch)
+        created = sum(1 for result in results if result.created)
+        return {"created": created, "duplicates": len(results) - created, "failed": 0}
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._store.close)
+
+
+def open_embedded_store(data_dir: Path | None = None) -> EmbeddedStore | None:
+    """Open the data directory's store, or ``None`` if that is not possible.
+
+    Returns ``None`` when ``agentmeshd`` is not installed or another process
+    (usually the daemon) is writing to the directory.
+    """
+    agentmeshd = _load_agentmeshd()
+    if agentmeshd is None:
+        return None
+    resolved_dir = data_dir or default_data_dir()
+    try:
+        store = agentmeshd.EventStore(resolved_dir, writer=agentmeshd.EMBEDDED_WRITER)
+    except agentmeshd.StoreLockedError:
+        return None
+    return EmbeddedStore(agentmeshd, store, resolved_dir)
@@ -1,22 +1,63 @@
 from __future__ import annotations
 
+import asyncio
 import contextlib
+import uuid
 from datetime import UTC, datetime
 from typing import Any
 
 from agentmesh_cli.client import AgentmeshdClient
+from agentmesh_cli.embedded import EmbeddedStore
+from agentmesh_cli.ingest import IngestStream
+from agentmesh_cli.spool import SpoolWriter
+
+DEFAULT_MAX_QUEUE = 10_000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_TIMEOUT = 5.0
 
 
 class EventRecorder:
     """Best-effort event recording to agentmeshd.
 
-    On first use, checks daemon connectivity. If unavailable,
-    silently skips all subsequent recordings.
+    On first use, checks daemon connectivity. If unavailable, subsequent
+    recordings go to ``spool`` when one is given and are skipped otherwise.
+
+    ``record`` only appends to a bounded in-process queue; a background task
+    ships queued events to ``POST /api/events/batch`` (or commits them to an
+    :class:`~agentmesh_cli.embedded.EmbeddedStore`), so the caller's loop
+    never waits on the daemon. ``close`` flushes what is queued, giving up
+    after ``flush_timeout`` seconds. Events that fail to post or miss the
+    deadline are spooled if possible; those that overflow the queue or
+    cannot be spooled are counted in ``dropped``.
+
+    With ``websocket=True`` batches go over a WebSocket ingest stream opened
+    for the first batch's run; if it cannot be opened or fails, the recorder
+    falls back to the batch endpoint for the rest of the session, resending
+    the unacknowledged batch (the daemon drops it by ``event_id`` if it was
+    stored after all).
     """
 
-    def __init__(self, client: AgentmeshdClient | None = None) -> None:
+    def __init__(
+        self,
+        client: AgentmeshdClient | EmbeddedStore | None = None,
+        *,
+        spool: SpoolWriter | None = None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_timeout: float = DEFAULT_FLUSH_TIMEOUT,
+        websocket: bool = False,
+    ) -> None:
         self._client = client
         self._available: bool | None = None
+        self.spool = spool
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._flush_timeout = flush_timeout
+        self._sender: asyncio.Task[None] | None = None
+        self._in_flight: list[dict[str, Any]] = []
+        self._websocket = websocket
+        self._stream: IngestStream | None = None
+        self.dropped = 0
 
     async def try_connect(self) -> bool:
         if self._client is None:
@@ -37,11 +78,13 @@ class EventRecorder:
         step: str | None = None,
         metadata: dict[str, Any] | None = None,
     ) -> None:
-        if not await self.try_connect():
+        available = await self.try_connect()
+        if not available and self.spool is None:
             return
 
-        assert self._client is not None
+        # The event_id lets the daemon drop a resent batch or spooled replay.
         event: dict[str, Any] = {
+            "event_id": str(uuid.uuid4()),
             "ts": datetime.now(UTC).isoformat(),
             "run_id": run_id,
             "kind": kind,
@@ -53,5 +96,82 @@ class EventRecorder:
         if step is not None:
             event["step"] = step
 
-        with contextlib.suppress(Exception):
-            await self._client.post_event(event)
+        if not available:
+            self._set_aside([event])
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return
+        if self._sender is None:
+            self._sender = asyncio.create_task(self._send_batches())
+
+    async def close(self) -> None:
+        """Flush queued events within ``flush_timeout``, then stop the sender.
+
+        Whatever is still unsent at the deadline, including a batch whose
+        request was cut short, is spooled, then the spool segment is closed.
+        """
+        if self._sender is not None:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._queue.join(), self._flush_timeout)
+            self._sender.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sender
+            self._sender = None
+            unsent = self._in_flight
+            while not self._queue.empty():
+                unsent.append(self._queue.get_nowait())
+            self._in_flight = []
+            self._queue = asyncio.Queue(maxsize=self._queue.maxsize)
+            self._set_aside(unsent)
+        await self._drop_stream()
+        if self.spool is not None:
+            self.spool.close()
+
+    def _set_aside(self, events: list[dict[str, Any]]) -> None:
+        """Spool events the daemon did not take, or count them as dropped."""
+        if self.spool is None:
+            self.dropped += len(events)
+            return
+        try:
+            self.spool.write(events)
+        except OSError:
+            self.dropped += len(events)
+
+    async def _send_batches(self) -> None:
+        assert self._client is not None
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self._in_flight = batch
+            try:
+                result = await self._post(batch)
+                self.dropped += int(result.get("failed", 0))
+            except Exception:
+                self._set_aside(batch)
+            self._in_flight = []
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _post(self, batch: list[dict[str, Any]]) -> dict[str, Any]:
+        assert self._client is not None
+        if self._websocket and self._stream is None and isinstance(self._client, AgentmeshdClient):
+            self._stream = await self._client.open_ingest_stream(batch[0]["run_id"])
+            self._websocket = self._stream is not None
+        if self._stream is not None:
+            try:
+                return await self._stream.send(batch)
+            except Exception:
+                await self._drop_stream()
+        return await self._client.post_events(batch)
+
+    async def _drop_stream(self) -> None:
+        """Close the ingest stream and stay on the batch endpoint from now on."""
+        stream, self._stream = self._stream, None
+        self._websocket = False
+        if stream is not None:
+            with contextlib.suppress(Exception):
+                await stream.close()
@@ -0,0 +1,81 @@
+"""WebSocket ingest channel to agentmeshd.
+
+One :class:`IngestStream` carries one run's events over
+``/api/events/ingest?run_id=...``: each batch is a ``{"seq", "events"}``
+frame whose events omit that ``run_id``, and the daemon acknowledges the
+frame's ``seq`` once the events are committed. Needs ``websockets``
+(``pip install 'agentmesh-cli[ws]'``); without it :func:`open_ingest_stream`
+returns ``None`` and callers stay on ``POST /api/events/batch``.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+from typing import Any
+from urllib.parse import quote
+
+_OPEN_TIMEOUT = 5.0
+
+
+def _load_websockets() -> Any:
+    try:
+        return importlib.import_module("websockets.asyncio.client")
+    except ImportError:
+        return None
+
+
+_websockets = _load_websockets()
+
+
+class IngestStream:
+    """Sends event batches for ``run_id`` and waits for each acknowledgement."""
+
+    def __init__(self, connection: Any, run_id: str) -> None:
+        self._connection = connection
+        self.run_id = run_id
+        self._seq = 0
+
+    async def send(self, events: list[dict[str, Any]]) -> dict[str, Any]:
+        """Send one frame; returns the daemon's ``created``/``duplicates``/``failed`` ack.
+
+        Raises :class:`ConnectionError` if the reply acknowledges another
+        frame; errors of the underlying connection propagate. Either way the
+        batch may or may not be stored and is safe to resend by ``event_id``.
+        """
+        self._seq += 1
+        frame = {"seq": self._seq, "events": [self._compact(event) for event in events]}
+        await self._connection.send(json.dumps(frame))
+        ack: dict[str, Any] = json.loads(await self._connection.recv())
+        if ack.get("ack") != self._seq:
+            raise ConnectionError(f"expected ack {self._seq}, got {ack.get('ack')!r}")
+        return ack
+
+    async def close(self) -> None:
+        await self._connection.close()
+
+    def _compact(self, event: dict[str, Any]) -> dict[str, Any]:
+        if event.get("run_id") != self.run_id:
+            return event
+        return {key: value for key, value in event.items() if key != "run_id"}
+
+
+async def open_ingest_stream(
+    base_url: str, run_id: str, *, uds: str | None = None
+) -> IngestStream | None:
+    """Connect an ingest stream for ``run_id``, or return ``None`` if that fails.
+
+    With ``uds`` the connection goes over that Unix socket and ``base_url``
+    only supplies the request URL.
+    """
+    if _websockets is None:
+        return None
+    url = f"{base_url.replace('http', 'ws', 1)}/api/events/ingest?run_id={quote(run_id, safe='')}"
+    try:
+        if uds is not None:
+            connection = await _websockets.unix_connect(uds, url, open_timeout=_OPEN_TIMEOUT)
+        else:
+            connection = await _websockets.connect(url, open_timeout=_OPEN_TIMEOUT)
+    except Exception:
+        return None
+    return IngestStream(connection, run_id)
@@ -38,8 +38,15 @@ def print_trace_timeline(events: list[dict[str, Any]], run_id: str) -> None:
         console.print("[dim]No events found.[/dim]")
         return
 
-    first_ts = events[0].get("ts", "")
-    first_meta = events[0].get("metadata", {})
+    print_trace_header(events[0], run_id)
+    for event in events:
+        print_trace_event(event)
+    print_trace_summary(events[0], events[-1], len(events))
+
+
+def print_trace_header(first_event: dict[str, Any], run_id: str) -> None:
+    first_ts = first_event.get("ts", "")
+    first_meta = first_event.get("metadata", {})
     agent_name = (
         first_meta.get("agent_name", "")
         or first_meta.get("agent_url", "")
@@ -52,35 +59,63 @@ def print_trace_timeline(events: list[dict[str, Any]], run_id: str) -> None:
         f"[bold]Started:[/bold] {first_ts}\n"
     )
 
+
+def print_trace_event(event: dict[str, Any]) -> None:
+    ts = event.get("ts", "")
+    # Extract time portion (HH:MM:SS.mmm)
+    time_part = ts.split("T")[1][:12] if "T" in ts else ts[:12]
+    kind = event.get("kind", "?")
+    detail = _event_detail(event)
+    console.print(f"  {time_part}  [bold]{kind:<10}[/bold] {detail}")
+
+
+def print_search_results(events: list[dict[str, Any]], query: str) -> None:
+    table = Table(title=f"Events matching {query!r}")
+    table.add_column("Time", style="dim")
+    table.add_column("Run", style="cyan")
+    table.add_column("Kind", style="bold")
+    table.add_column("Detail")
+
     for event in events:
-        ts = event.get("ts", "")
-        # Extract time portion (HH:MM:SS.mmm)
-        time_part = ts.split("T")[1][:12] if "T" in ts else ts[:12]
-        kind = event.get("kind", "?")
-        payload = event.get("payload", {})
-
-        detail = ""
-        if kind == "message":
-            text = payload.get("text", "")
-            detail = f'"{text}"' if text else ""
-        elif kind == "status":
-            detail = payload.get("state", "") or event.get("metadata", {}).get("state", "")
-        elif kind == "artifact":
-            text = payload.get("text", "")
-            detail = f'"{text}"' if text else ""
-        elif kind == "tool":
-            name = payload.get("name", "")
-            phase = payload.get("phase", "")
-            detail = f"{name} ({phase})" if phase else name
-        elif kind == "error":
-            detail = payload.get("message", "")
-        else:
-            detail = str(payload)[:60] if payload else ""
-
-        console.print(f"  {time_part}  [bold]{kind:<10}[/bold] {detail}")
-
-    # Summary
-    last_ts = events[-1].get("ts", "")
+        table.add_row(
+            event.get("ts", ""),
+            event.get("run_id", ""),
+            event.get("kind", "?"),
+            _event_detail(event),
+        )
+
+    console.print(table)
+
+
+def _event_detail(event: dict[str, Any]) -> str:
+    kind = event.get("kind", "?")
+    payload = event.get("payload", {})
+
+    detail = ""
+    if kind == "message":
+        text = payload.get("text", "")
+        detail = f'"{text}"' if text else ""
+    elif kind == "status":
+        detail = payload.get("state", "") or event.get("metadata", {}).get("state", "")
+    elif kind == "artifact":
+        text = payload.get("text", "")
+        detail = f'"{text}"' if text else ""
+    elif kind == "tool":
+        name = payload.get("name", "")
+        phase = payload.get("phase", "")
+        detail = f"{name} ({phase})" if phase else name
+    elif kind == "error":
+        detail = payload.get("message", "")
+    else:
+        detail = str(payload)[:60] if payload else ""
+    return detail
+
+
+def print_trace_summary(
+    first_event: dict[str, Any], last_event: dict[str, Any], count: int
+) -> None:
+    first_ts = first_event.get("ts", "")
+    last_ts = last_event.get("ts", "")
     try:
         from datetime import datetime
 
@@ -88,10 +123,10 @@ def print_trace_timeline(events: list[dict[str, Any]], run_id: str) -> None:
         t1 = datetime.fromisoformat(last_ts.replace("Z", "+00:00")).replace(tzinfo=UTC)
         duration = (t1 - t0).total_seconds()
         console.print(
-            f"\n[bold]Duration:[/bold] {duration:.1f}s  [bold]Events:[/bold] {len(events)}"
+            f"\n[bold]Duration:[/bold] {duration:.1f}s  [bold]Events:[/bold] {count}"
         )
     except (ValueError, IndexError):
-        console.print(f"\n[bold]Events:[/bold] {len(events)}")
+        console.print(f"\n[bold]Events:[/bold] {count}")
 
 
 def print_invoke_event(event: InvokeEvent) -> None:
@@ -0,0 +1,169 @@
+"""Local spool for events that could not be sent to agentmeshd.
+
+Each recorder session appends EventV1 JSON lines to its own segment in
+``<data dir>/spool``, named ``<time_ns>-<pid>.part`` while it is being
+written and renamed to ``.jsonl`` on close. :func:`replay` uploads closed
+segments (and those left behind by dead processes) through
+``POST /api/events/batch``, recording the byte offset reached in a ``.sent``
+file after every batch, so an interrupted sync resumes where it stopped.
+Spooled events keep the recorder's ``event_id``, so a batch resent after a
+crash is recognised by the daemon as a duplicate.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from agentmesh_cli.client import AgentmeshdClient, default_data_dir
+
+SCHEMA_VERSION = "1"
+DEFAULT_SYNC_BATCH = 1000
+
+_OPEN_SUFFIX = ".part"
+_CLOSED_SUFFIX = ".jsonl"
+_OFFSET_SUFFIX = ".sent"
+
+
+def default_spool_dir() -> Path:
+    return default_data_dir() / "spool"
+
+
+def to_event_v1(event: dict[str, Any]) -> dict[str, Any]:
+    """Fill in the EventV1 fields a recorded event leaves out."""
+    data: dict[str, Any] = {
+        "schema_version": SCHEMA_VERSION,
+        "ts": event["ts"],
+        "run_id": event["run_id"],
+        "kind": event["kind"],
+        "task_id": event.get("task_id"),
+        "step": event.get("step"),
+        "payload": event.get("payload") or {},
+        "metadata": event.get("metadata") or {},
+        "team_run_id": event.get("team_run_id"),
+    }
+    if event.get("event_id") is not None:
+        data["event_id"] = event["event_id"]
+    return data
+
+
+class SpoolWriter:
+    """Append-only spool segment for one recorder session, created on first write."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.path: Path | None = None
+        self.count = 0
+        self._file: IO[str] | None = None
+
+    def write(self, events: list[dict[str, Any]]) -> None:
+        """Append ``events`` and sync them to disk."""
+        if not events:
+            return
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.path = self.directory / f"{time.time_ns()}-{os.getpid()}{_OPEN_SUFFIX}"
+            self._file = self.path.open("a", encoding="utf-8")
+        self._file.writelines(json.dumps(to_event_v1(event)) + "\n" for event in events)
+        # Each batch is on disk before the caller moves on, so a crashed
+        # session leaves its events for the next replay.
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.count += len(events)
+
+    def close(self) -> None:
+        """Close the segment and hand it to :func:`replay`."""
+        if self._file is None or self.path is None:
+            return
+        self._file.close()
+        self._file = None
+        self.path = self.path.rename(self.path.with_suffix(_CLOSED_SUFFIX))
+
+
+@dataclass(frozen=True)
+class SyncStats:
+    segments: int
+    uploaded: int
+    failed: int
+    duplicates: int = 0
+
+
+def pending_segments(directory: Path) -> list[Path]:
+    """Segments ready to upload, oldest first: closed ones and those of dead writers."""
+    if not directory.is_dir():
+        return []
+    segments = [
+        path
+        for path in directory.iterdir()
+        if path.suffix == _CLOSED_SUFFIX
+        or (path.suffix == _OPEN_SUFFIX and not _writer_alive(path))
+    ]
+    return sorted(segments, key=lambda path: path.stem)
+
+
+async def replay(
+    client: AgentmeshdClient, directory: Path, *, batch_size: int = DEFAULT_SYNC_BATCH
+) -> SyncStats:
+    """Upload every pending segment in batches and delete it once fully sent.
+
+    Lines that are not valid JSON (e.g. the torn last line of a crashed
+    writer) are skipped and counted as failed. HTTP errors propagate; the
+    offset of the last uploaded batch is kept for the next attempt.
+    """
+    segments = uploaded = failed = duplicates = 0
+    for segment in pending_segments(directory):
+        offset_file = segment.with_suffix(_OFFSET_SUFFIX)
+        offset = _read_offset(offset_file)
+        with segment.open("rb") as f:
+            f.seek(offset)
+            while lines := [line for line in (f.readline() for _ in range(batch_size)) if line]:
+                events: list[dict[str, Any]] = []
+                for line in lines:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        failed += 1
+                if events:
+                    result = await client.post_events(events)
+                    uploaded += int(result.get("created", 0))
+                    failed += int(result.get("failed", 0))
+                    duplicates += int(result.get("duplicates", 0))
+                offset += sum(len(line) for line in lines)
+                _write_offset(offset_file, offset)
+        segment.unlink()
+        offset_file.unlink(missing_ok=True)
+        segments += 1
+    return SyncStats(segments=segments, uploaded=uploaded, failed=failed, duplicates=duplicates)
+
+
+def _writer_alive(path: Path) -> bool:
+    try:
+        pid = int(path.stem.rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_offset(path: Path) -> int:
+    try:
+        return int(path.read_text())
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_offset(path: Path, offset: int) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(str(offset))
+    tmp.replace(path)
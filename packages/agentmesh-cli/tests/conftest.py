@@ -1 +1,13 @@
 from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep tests off the user's daemon socket, spool and response cache."""
+    monkeypatch.setenv("AGENTMESH_DATA_DIR", str(tmp_path / "agentmesh"))
+    monkeypatch.setenv("AGENTMESH_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("AGENTMESH_DAEMON_URL", raising=False)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from agentmesh_cli.cache import ResponseCache
+
+
+class TestResponseCache:
+    def test_roundtrip_and_miss(self, tmp_path: Path) -> None:
+        cache = ResponseCache(tmp_path / "cache")
+        assert cache.get("a") is None
+
+        cache.put("a", '"v1"', {"events": [1, 2]})
+        assert cache.get("a") == ('"v1"', {"events": [1, 2]})
+
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        cache = ResponseCache(tmp_path, max_entries=2)
+        for age, key in enumerate(["a", "b"], start=1):
+            cache.put(key, f'"{key}"', age)
+            path = next(p for p in tmp_path.glob("*.json") if p.stat().st_mtime > age)
+            os.utime(path, (age, age))
+        cache.get("a")  # a hit makes "b" the least recently used
+        cache.put("c", '"c"', 3)
+
+        assert cache.get("a") == ('"a"', 1)
+        assert cache.get("b") is None
+        assert cache.get("c") == ('"c"', 3)
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path: Path) -> None:
+        cache = ResponseCache(tmp_path)
+        cache.put("a", '"v1"', {})
+        next(tmp_path.glob("*.json")).write_text("{not json")
+
+        assert cache.get("a") is None
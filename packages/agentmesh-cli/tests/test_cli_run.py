@@ -70,6 +70,8 @@ class TestRunCommand:
         mock_recorder = MagicMock()
         mock_recorder.try_connect = AsyncMock(return_value=False)
         mock_recorder.record = AsyncMock()
+        mock_recorder.close = AsyncMock()
+        mock_recorder.dropped = 0
         mock_recorder_cls.return_value = mock_recorder
 
         result = runner.invoke(
@@ -79,6 +81,38 @@ class TestRunCommand:
         assert result.exit_code == 0
         assert "run_id:" in result.output
 
+    @patch("agentmesh_cli.embedded.open_embedded_store")
+    @patch("agentmesh_cli.a2a_invoke.invoke_agent")
+    @patch("agentmesh_cli.event_recorder.EventRecorder")
+    @patch("agentmesh_cli.client.AgentmeshdClient")
+    def test_run_falls_back_to_embedded_store(
+        self,
+        mock_client_cls: MagicMock,
+        mock_recorder_cls: MagicMock,
+        mock_invoke: MagicMock,
+        mock_open_embedded: MagicMock,
+    ) -> None:
+        mock_invoke.return_value = _MockInvokeIterator([])
+        mock_client_cls.return_value.close = AsyncMock()
+
+        store = MagicMock()
+        store.close = AsyncMock()
+        store.data_dir = "/data"
+        mock_open_embedded.return_value = store
+
+        mock_recorder = MagicMock()
+        mock_recorder.try_connect = AsyncMock(return_value=False)
+        mock_recorder.record = AsyncMock()
+        mock_recorder.close = AsyncMock()
+        mock_recorder.dropped = 0
+        mock_recorder_cls.return_value = mock_recorder
+
+        result = runner.invoke(app, ["run", "--agent", _URL, "hello"])
+        assert result.exit_code == 0
+        assert "recording to /data" in result.output
+        assert mock_recorder_cls.call_args.args == (store,)
+        store.close.assert_awaited_once()
+
     def test_run_daemon_required_by_default(self) -> None:
         result = runner.invoke(
             app,
@@ -115,6 +149,8 @@ class TestRunCommand:
         mock_recorder = MagicMock()
         mock_recorder.try_connect = AsyncMock(return_value=True)
         mock_recorder.record = AsyncMock()
+        mock_recorder.close = AsyncMock()
+        mock_recorder.dropped = 0
         mock_recorder_cls.return_value = mock_recorder
 
         result = runner.invoke(
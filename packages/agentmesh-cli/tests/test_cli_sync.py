@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+from agentmesh_cli.cli import app
+from agentmesh_cli.errors import ExitCode
+from agentmesh_cli.spool import SyncStats
+from typer.testing import CliRunner
+
+runner = CliRunner()
+
+
+class TestSyncCommand:
+    def test_reports_uploaded_events(self) -> None:
+        stats = SyncStats(segments=2, uploaded=40, failed=0)
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch("agentmesh_cli.spool.replay", AsyncMock(return_value=stats)),
+        ):
+            result = runner.invoke(app, ["sync"])
+        assert result.exit_code == 0
+        assert "Uploaded 40 event(s) from 2 spool file(s)" in result.output
+
+    def test_nothing_to_sync(self) -> None:
+        stats = SyncStats(segments=0, uploaded=0, failed=0)
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch("agentmesh_cli.spool.replay", AsyncMock(return_value=stats)),
+        ):
+            result = runner.invoke(app, ["sync"])
+        assert result.exit_code == 0
+        assert "Nothing to sync" in result.output
+
+    def test_requires_daemon(self) -> None:
+        result = runner.invoke(app, ["sync", "--daemon-url", "http://127.0.0.1:1"])
+        assert result.exit_code == ExitCode.DAEMON_UNAVAILABLE
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import json
+from collections.abc import AsyncGenerator
+from typing import Any
 from unittest.mock import AsyncMock, patch
 
+import pytest
 from agentmesh_cli.cli import app
+from agentmesh_cli.commands import trace as trace_command
 from agentmesh_cli.errors import ExitCode
+from agentmeshd import events as daemon_events
 from typer.testing import CliRunner
 
 runner = CliRunner()
@@ -62,9 +67,173 @@ class TestTraceCommand:
         result = runner.invoke(app, ["trace", "r1"])
         assert result.exit_code == ExitCode.GENERAL_ERROR
 
+    def test_trace_resolves_task_id_in_one_request(self) -> None:
+        trace = {"match": "task_id", "run_ids": ["r1"], "events": _SAMPLE_EVENTS}
+        get_trace = AsyncMock(return_value=trace)
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch("agentmesh_cli.client.AgentmeshdClient.get_trace", get_trace),
+        ):
+            result = runner.invoke(app, ["trace", "t1"])
+
+        assert result.exit_code == 0
+        assert "Run: r1" in result.output
+        get_trace.assert_awaited_once_with("t1")
+
+    def test_trace_unknown_id(self) -> None:
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch("agentmesh_cli.client.AgentmeshdClient.get_trace", AsyncMock(return_value=None)),
+        ):
+            result = runner.invoke(app, ["trace", "nope"])
+
+        assert result.exit_code == ExitCode.GENERAL_ERROR
+
     def test_trace_daemon_unavailable(self) -> None:
         result = runner.invoke(
             app,
             ["trace", "r1", "--daemon-url", "http://127.0.0.1:1"],
         )
         assert result.exit_code == ExitCode.DAEMON_UNAVAILABLE
+
+
+_FINAL = {
+    "ts": "2026-02-19T10:00:02.000+00:00",
+    "run_id": "r1",
+    "kind": "status",
+    "payload": {"state": "completed"},
+    "metadata": {"final": True},
+}
+_AFTER_FINAL = {**_FINAL, "kind": "message", "payload": {"text": "late"}}
+
+
+def _stream(*events: dict[str, Any]) -> Any:
+    calls: list[dict[str, Any]] = []
+
+    async def stream_events(
+        _self: object, **kwargs: Any
+    ) -> AsyncGenerator[tuple[int, dict[str, Any]]]:
+        calls.append(kwargs)
+        for i, event in enumerate(events, start=1):
+            yield i, event
+
+    stream_events.calls = calls  # type: ignore[attr-defined]
+    return stream_events
+
+
+class TestTraceFollow:
+    def test_follow_prints_until_final_status(self) -> None:
+        stream = _stream(*_SAMPLE_EVENTS, _FINAL, _AFTER_FINAL)
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch(
+                "agentmesh_cli.client.AgentmeshdClient.get_trace",
+                AsyncMock(return_value={"match": "run_id", "run_ids": ["r1"]}),
+            ),
+            patch("agentmesh_cli.client.AgentmeshdClient.stream_events", stream),
+        ):
+            result = runner.invoke(app, ["trace", "r1", "--follow"])
+
+        assert result.exit_code == 0
+        assert "completed" in result.output
+        assert "late" not in result.output
+        assert "Events: 4" in result.output
+        assert stream.calls == [{"run_id": "r1", "after_id": 0}]
+
+    def test_follow_resolves_task_id(self) -> None:
+        stream = _stream(_FINAL)
+        get_trace = AsyncMock(return_value={"match": "task_id", "run_ids": ["r1"]})
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch("agentmesh_cli.client.AgentmeshdClient.get_trace", get_trace),
+            patch("agentmesh_cli.client.AgentmeshdClient.stream_events", stream),
+        ):
+            result = runner.invoke(app, ["trace", "t1", "--follow", "--format", "json"])
+
+        assert result.exit_code == 0
+        assert [json.loads(line) for line in result.output.splitlines()] == [_FINAL]
+        assert stream.calls[0]["run_id"] == "r1"
+
+    def test_follow_daemon_unavailable(self) -> None:
+        result = runner.invoke(
+            app,
+            ["trace", "r1", "--follow", "--daemon-url", "http://127.0.0.1:1"],
+        )
+        assert result.exit_code == ExitCode.DAEMON_UNAVAILABLE
+
+
+class TestTraceSearch:
+    def test_search_prints_matches_and_cursor(self) -> None:
+        search = AsyncMock(return_value=([_SAMPLE_EVENTS[2]], "next-page"))
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch("agentmesh_cli.client.AgentmeshdClient.search_events", search),
+        ):
+            result = runner.invoke(app, ["trace", "search", "2", "--kind", "artifact"])
+
+        assert result.exit_code == 0
+        assert "r1" in result.output
+        assert "--cursor next-page" in result.output
+        search.assert_awaited_once_with(
+            "2", run_id=None, kind="artifact", cursor=None, limit=20, fts_syntax=False
+        )
+
+    def test_search_fts_flag(self) -> None:
+        search = AsyncMock(return_value=(_SAMPLE_EVENTS, None))
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch("agentmesh_cli.client.AgentmeshdClient.search_events", search),
+        ):
+            result = runner.invoke(app, ["trace", "search", "disk*", "--fts"])
+
+        assert result.exit_code == 0
+        assert search.await_args is not None
+        assert search.await_args.kwargs["fts_syntax"] is True
+
+    def test_search_json(self) -> None:
+        search = AsyncMock(return_value=(_SAMPLE_EVENTS, None))
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch("agentmesh_cli.client.AgentmeshdClient.search_events", search),
+        ):
+            result = runner.invoke(app, ["trace", "search", "x", "--format", "json"])
+
+        assert result.exit_code == 0
+        assert json.loads(result.output) == {"events": _SAMPLE_EVENTS, "next_cursor": None}
+
+    def test_search_no_matches(self) -> None:
+        with (
+            patch("agentmesh_cli.client.AgentmeshdClient.healthz", AsyncMock(return_value=True)),
+            patch(
+                "agentmesh_cli.client.AgentmeshdClient.search_events",
+                AsyncMock(return_value=([], None)),
+            ),
+        ):
+            result = runner.invoke(app, ["trace", "search", "nothing"])
+
+        assert result.exit_code == ExitCode.GENERAL_ERROR
+
+    def test_show_is_the_default_subcommand(self) -> None:
+        with patch("agentmesh_cli.commands.trace._fetch_trace") as mock_fetch:
+            mock_fetch.return_value = (_SAMPLE_EVENTS, "r1")
+            implicit = runner.invoke(app, ["trace", "--format", "json", "r1"])
+            explicit = runner.invoke(app, ["trace", "show", "r1", "--format", "json"])
+
+        assert implicit.exit_code == explicit.exit_code == 0
+        assert implicit.output == explicit.output
+
+
+class TestFinalStatus:
+    def test_terminal_states_match_daemon(self) -> None:
+        assert trace_command._TERMINAL_STATES == daemon_events.TERMINAL_STATES
+
+    @pytest.mark.parametrize("state", ["working", "input-required", *daemon_events.TERMINAL_STATES])
+    @pytest.mark.parametrize("final", [None, True])
+    def test_agrees_with_daemon(self, state: str, final: bool | None) -> None:
+        metadata = {} if final is None else {"final": final}
+        event = daemon_events.make_event(
+            run_id="r1", kind="status", payload={"state": state}, metadata=metadata
+        )
+        assert trace_command._is_final_status(event.to_dict()) == daemon_events.is_final_status(
+            event
+        )
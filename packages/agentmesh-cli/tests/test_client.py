@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import socket
+from pathlib import Path
+
 import pytest
 import respx
-from agentmesh_cli.client import AgentmeshdClient
+from agentmesh_cli.cache import ResponseCache
+from agentmesh_cli.client import (
+    DEFAULT_DAEMON_URL,
+    AgentmeshdClient,
+    default_socket_path,
+    resolve_daemon_url,
+)
 from httpx import Response
 
 
@@ -12,6 +23,52 @@ def mock_api() -> respx.MockRouter:
         yield router
 
 
+class TestDaemonUrl:
+    def test_defaults_to_tcp(self) -> None:
+        assert resolve_daemon_url() == DEFAULT_DAEMON_URL
+
+    def test_prefers_daemon_socket(self, tmp_path: Path) -> None:
+        path = default_socket_path()
+        path.parent.mkdir(parents=True)
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.bind(str(path))
+            sock.listen()
+            assert resolve_daemon_url() == f"unix://{path}"
+            assert resolve_daemon_url("http://127.0.0.1:9000") == "http://127.0.0.1:9000"
+
+    def test_ignores_socket_left_by_killed_daemon(self, tmp_path: Path) -> None:
+        path = default_socket_path()
+        path.parent.mkdir(parents=True)
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.bind(str(path))
+        assert path.is_socket()
+        assert resolve_daemon_url() == DEFAULT_DAEMON_URL
+
+    def test_env_url_wins(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("AGENTMESH_DAEMON_URL", "unix:///run/agentmeshd.sock")
+        assert resolve_daemon_url() == "unix:///run/agentmeshd.sock"
+
+    @pytest.mark.asyncio
+    async def test_requests_over_unix_socket(self, tmp_path: Path) -> None:
+        requests: list[bytes] = []
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            requests.append(await reader.readuntil(b"\r\n\r\n"))
+            writer.write(b'HTTP/1.1 200 OK\r\ncontent-length: 15\r\n\r\n{"status":"ok"}')
+            await writer.drain()
+            writer.close()
+
+        path = tmp_path / "d.sock"
+        server = await asyncio.start_unix_server(handle, path=str(path))
+        client = AgentmeshdClient(base_url=f"unix://{path}")
+        try:
+            assert await client.healthz() is True
+        finally:
+            await client.close()
+            server.close()
+        assert requests[0].startswith(b"GET /healthz HTTP/1.1")
+
+
 class TestAgentmeshdClient:
     @pytest.mark.asyncio
     async def test_healthz_ok(self, mock_api: respx.MockRouter) -> None:
@@ -49,6 +106,31 @@ class TestAgentmeshdClient:
         finally:
             await client.close()
 
+    @pytest.mark.asyncio
+    async def test_post_events(self, mock_api: respx.MockRouter) -> None:
+        events = [{"run_id": "r1", "kind": "status"}, {"run_id": "r1", "kind": "message"}]
+        route = mock_api.post("/api/events/batch").mock(
+            return_value=Response(
+                201,
+                json={
+                    "created": 2,
+                    "failed": 0,
+                    "results": [
+                        {"index": 0, "status": "created", "id": 1},
+                        {"index": 1, "status": "created", "id": 2},
+                    ],
+                },
+            )
+        )
+
+        client = AgentmeshdClient()
+        try:
+            result = await client.post_events(events)
+            assert result["created"] == 2
+            assert json.loads(route.calls.last.request.content) == events
+        finally:
+            await client.close()
+
     @pytest.mark.asyncio
     async def test_get_events(self, mock_api: respx.MockRouter) -> None:
         events = [{"run_id": "r1", "kind": "status", "ts": "t"}]
@@ -77,3 +159,152 @@ class TestAgentmeshdClient:
             assert "limit=50" in str(request.url)
         finally:
             await client.close()
+
+    @pytest.mark.asyncio
+    async def test_get_events_with_time_window(self, mock_api: respx.MockRouter) -> None:
+        route = mock_api.get("/api/events").mock(return_value=Response(200, json=[]))
+
+        client = AgentmeshdClient()
+        try:
+            await client.get_events(team_run_id="tr1", since="2026-01-01", until="2026-01-02")
+            params = route.calls.last.request.url.params
+            assert params["team_run_id"] == "tr1"
+            assert params["since"] == "2026-01-01"
+            assert params["until"] == "2026-01-02"
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_get_events_page_returns_cursor(self, mock_api: respx.MockRouter) -> None:
+        mock_api.get("/api/events").mock(
+            return_value=Response(200, json=[{"run_id": "r1"}], headers={"X-Next-Cursor": "42"})
+        )
+
+        client = AgentmeshdClient()
+        try:
+            events, cursor = await client.get_events_page(run_id="r1", limit=1)
+            assert len(events) == 1
+            assert cursor == 42
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_get_all_events_follows_cursor(self, mock_api: respx.MockRouter) -> None:
+        route = mock_api.get("/api/events").mock(
+            side_effect=[
+                Response(200, json=[{"i": 0}, {"i": 1}], headers={"X-Next-Cursor": "2"}),
+                Response(200, json=[{"i": 2}]),
+            ]
+        )
+
+        client = AgentmeshdClient()
+        try:
+            events = await client.get_all_events(run_id="r1", page_size=2)
+            assert [e["i"] for e in events] == [0, 1, 2]
+            assert "after_id=2" in str(route.calls.last.request.url)
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_iter_events_reads_ndjson(self, mock_api: respx.MockRouter) -> None:
+        body = b'{"i": 0}\n{"i": 1}\n\n{"i": 2}\n'
+        route = mock_api.get("/api/events").mock(
+            return_value=Response(
+                200, content=body, headers={"content-type": "application/x-ndjson"}
+            )
+        )
+
+        client = AgentmeshdClient()
+        try:
+            events = [e async for e in client.iter_events(run_id="r1", after_id=5)]
+            assert [e["i"] for e in events] == [0, 1, 2]
+            url = str(route.calls.last.request.url)
+            assert "format=ndjson" in url and "limit=0" in url and "after_id=5" in url
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_search_events(self, mock_api: respx.MockRouter) -> None:
+        route = mock_api.get("/api/events").mock(
+            side_effect=[
+                Response(200, json=[{"run_id": "r1"}], headers={"X-Next-Cursor": "abc"}),
+                Response(400, json={"error": "invalid search query: bad"}),
+            ]
+        )
+
+        client = AgentmeshdClient()
+        try:
+            events, cursor = await client.search_events("refused", kind="error", limit=1)
+            assert events == [{"run_id": "r1"}]
+            assert cursor == "abc"
+            url = str(route.calls.last.request.url)
+            assert "q=refused" in url and "kind=error" in url
+            assert "syntax" not in url
+            with pytest.raises(ValueError, match="bad"):
+                await client.search_events('"', fts_syntax=True)
+            assert "syntax=fts" in str(route.calls.last.request.url)
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_get_trace(self, mock_api: respx.MockRouter) -> None:
+        body = {"id": "t/1", "match": "task_id", "run_ids": ["r1"], "runs": [], "events": []}
+        route = mock_api.get("/api/trace/t%2F1").mock(return_value=Response(200, json=body))
+        mock_api.get("/api/trace/missing").mock(return_value=Response(404, json={}))
+
+        client = AgentmeshdClient()
+        try:
+            assert await client.get_trace("t/1", limit=1) == body
+            assert "limit=1" in str(route.calls.last.request.url)
+            assert await client.get_trace("missing") is None
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_get_trace_revalidates_cached_body(
+        self, mock_api: respx.MockRouter, tmp_path: Path
+    ) -> None:
+        body = {"id": "r1", "match": "run_id", "run_ids": ["r1"], "runs": [], "events": []}
+        route = mock_api.get("/api/trace/r1").mock(
+            side_effect=[
+                Response(200, json=body, headers={"ETag": '"v1"'}),
+                Response(304, headers={"ETag": '"v1"'}),
+            ]
+        )
+
+        client = AgentmeshdClient(cache=ResponseCache(tmp_path))
+        try:
+            assert await client.get_trace("r1") == body
+            assert await client.get_trace("r1") == body
+            assert "if-none-match" not in route.calls[0].request.headers
+            assert route.calls[1].request.headers["if-none-match"] == '"v1"'
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_stream_events_parses_and_resumes(self, mock_api: respx.MockRouter) -> None:
+        def sse(*items: tuple[int, dict[str, str]]) -> Response:
+            body = "".join(f"id: {i}\ndata: {json.dumps(e)}\n\n" for i, e in items)
+            return Response(200, text=": keepalive\n\n" + body)
+
+        route = mock_api.get("/api/events/stream").mock(
+            side_effect=[
+                sse((1, {"kind": "status"}), (2, {"kind": "message"})),
+                sse((3, {"kind": "artifact"})),
+            ]
+        )
+
+        client = AgentmeshdClient()
+        try:
+            received: list[tuple[int, str]] = []
+            async for event_id, event in client.stream_events(run_id="r1", after_id=0):
+                received.append((event_id, event["kind"]))
+                if len(received) == 3:
+                    break
+            assert received == [(1, "status"), (2, "message"), (3, "artifact")]
+            first, second = (call.request for call in route.calls)
+            assert first.url.params["run_id"] == "r1"
+            assert first.headers["Last-Event-ID"] == "0"
+            assert second.headers["Last-Event-ID"] == "2"
+        finally:
+            await client.close()
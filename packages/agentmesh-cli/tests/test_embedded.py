@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from agentmesh_cli import embedded
+from agentmesh_cli.embedded import open_embedded_store
+from agentmeshd.store import EventStore
+
+
+class TestEmbeddedStore:
+    @pytest.mark.asyncio
+    async def test_commits_recorded_events(self, tmp_path: Path) -> None:
+        store = open_embedded_store(tmp_path)
+        assert store is not None
+        event = {"event_id": "e-1", "ts": "2026-01-01T00:00:00Z", "run_id": "r1", "kind": "status"}
+        try:
+            first = await store.post_events([event, {**event, "event_id": "e-2"}])
+            again = await store.post_events([event])
+        finally:
+            await store.close()
+
+        assert first == {"created": 2, "duplicates": 0, "failed": 0}
+        assert again == {"created": 0, "duplicates": 1, "failed": 0}
+        reader = EventStore(tmp_path)
+        events = reader.query(run_id="r1")
+        reader.close()
+        assert [e.event_id for e in events] == ["e-1", "e-2"]
+
+    @pytest.mark.asyncio
+    async def test_unavailable_while_another_writer_runs(self, tmp_path: Path) -> None:
+        daemon_store = EventStore(tmp_path)
+        try:
+            assert open_embedded_store(tmp_path) is None
+        finally:
+            daemon_store.close()
+
+    def test_unavailable_without_agentmeshd(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(embedded, "_load_agentmeshd", lambda: None)
+        assert open_embedded_store(tmp_path) is None
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 import respx
 from agentmesh_cli.client import AgentmeshdClient
 from agentmesh_cli.event_recorder import EventRecorder
+from agentmesh_cli.ingest import IngestStream
+from agentmesh_cli.spool import SpoolWriter, pending_segments
 from httpx import Response
 
 
@@ -14,13 +20,21 @@ class TestEventRecorder:
     async def test_record_when_daemon_available(self) -> None:
         with respx.mock(base_url="http://127.0.0.1:8321") as mock_api:
             mock_api.get("/healthz").mock(return_value=Response(200, json={"status": "ok"}))
-            post_route = mock_api.post("/api/events").mock(return_value=Response(201, json={}))
+            post_route = mock_api.post("/api/events/batch").mock(
+                return_value=Response(201, json={"created": 2, "failed": 0})
+            )
 
             client = AgentmeshdClient()
             recorder = EventRecorder(client)
             try:
                 await recorder.record(run_id="r1", kind="status", payload={"state": "working"})
-                assert post_route.called
+                await recorder.record(run_id="r1", kind="message")
+                await recorder.close()
+                assert post_route.call_count == 1
+                sent = json.loads(post_route.calls.last.request.content)
+                assert [e["kind"] for e in sent] == ["status", "message"]
+                assert len({e["event_id"] for e in sent}) == 2
+                assert recorder.dropped == 0
             finally:
                 await client.close()
 
@@ -67,13 +81,15 @@ class TestEventRecorder:
     async def test_record_swallows_post_errors(self) -> None:
         with respx.mock(base_url="http://127.0.0.1:8321") as mock_api:
             mock_api.get("/healthz").mock(return_value=Response(200, json={"status": "ok"}))
-            mock_api.post("/api/events").mock(return_value=Response(500))
+            mock_api.post("/api/events/batch").mock(return_value=Response(500))
 
             client = AgentmeshdClient()
             recorder = EventRecorder(client)
             try:
                 # Should not raise despite 500
                 await recorder.record(run_id="r1", kind="error")
+                await recorder.close()
+                assert recorder.dropped == 1
             finally:
                 await client.close()
 
@@ -81,7 +97,9 @@ class TestEventRecorder:
     async def test_record_includes_optional_fields(self) -> None:
         with respx.mock(base_url="http://127.0.0.1:8321") as mock_api:
             mock_api.get("/healthz").mock(return_value=Response(200, json={"status": "ok"}))
-            post_route = mock_api.post("/api/events").mock(return_value=Response(201, json={}))
+            post_route = mock_api.post("/api/events/batch").mock(
+                return_value=Response(201, json={"created": 1, "failed": 0})
+            )
 
             client = AgentmeshdClient()
             recorder = EventRecorder(client)
@@ -94,11 +112,141 @@ class TestEventRecorder:
                     payload={"name": "exec"},
                     metadata={"agent_name": "Test"},
                 )
+                await recorder.close()
                 body = post_route.calls.last.request.content
-                data = json.loads(body)
+                [data] = json.loads(body)
                 assert data["task_id"] == "t1"
                 assert data["step"] == "analyze"
                 assert data["payload"]["name"] == "exec"
                 assert data["metadata"]["agent_name"] == "Test"
             finally:
                 await client.close()
+
+
+class TestBatching:
+    @staticmethod
+    def _client() -> MagicMock:
+        client = MagicMock(spec=AgentmeshdClient)
+        client.healthz = AsyncMock(return_value=True)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_record_does_not_wait_for_the_daemon(self) -> None:
+        client = self._client()
+        release = asyncio.Event()
+        sent: list[list[dict[str, Any]]] = []
+
+        async def post_events(events: list[dict[str, Any]]) -> dict[str, Any]:
+            sent.append(events)
+            await release.wait()
+            return {"created": len(events), "failed": 0}
+
+        client.post_events = post_events
+        recorder = EventRecorder(client, batch_size=3)
+        for i in range(7):
+            await recorder.record(run_id="r1", kind="message", payload={"i": i})
+        assert sent == []  # queued, nothing posted yet
+        release.set()
+        await recorder.close()
+
+        assert [[e["payload"]["i"] for e in batch] for batch in sent] == [[0, 1, 2], [3, 4, 5], [6]]
+        assert recorder.dropped == 0
+
+    @pytest.mark.asyncio
+    async def test_counts_overflow_and_flush_deadline(self) -> None:
+        client = self._client()
+
+        async def post_events(events: list[dict[str, Any]]) -> dict[str, Any]:
+            await asyncio.Event().wait()
+            return {}
+
+        client.post_events = post_events
+        recorder = EventRecorder(client, max_queue=2, flush_timeout=0.05)
+        for _ in range(5):
+            await recorder.record(run_id="r1", kind="message")
+        await recorder.close()
+
+        assert recorder.dropped == 5
+
+
+class TestSpooling:
+    @pytest.mark.asyncio
+    async def test_spools_without_a_daemon(self, tmp_path: Path) -> None:
+        recorder = EventRecorder(None, spool=SpoolWriter(tmp_path))
+        await recorder.record(run_id="r1", kind="message", payload={"text": "hi"})
+        await recorder.record(run_id="r1", kind="status", task_id="t1")
+        await recorder.close()
+
+        [segment] = pending_segments(tmp_path)
+        lines = [json.loads(line) for line in segment.read_text().splitlines()]
+        assert [(e["kind"], e["task_id"]) for e in lines] == [("message", None), ("status", "t1")]
+        assert all(e["event_id"] for e in lines)
+        assert recorder.dropped == 0
+
+    @pytest.mark.asyncio
+    async def test_spools_batches_the_daemon_rejects(self, tmp_path: Path) -> None:
+        client = MagicMock(spec=AgentmeshdClient)
+        client.healthz = AsyncMock(return_value=True)
+        client.post_events = AsyncMock(side_effect=OSError("connection reset"))
+        spool = SpoolWriter(tmp_path)
+        recorder = EventRecorder(client, spool=spool)
+        for _ in range(3):
+            await recorder.record(run_id="r1", kind="message")
+        await recorder.close()
+
+        assert spool.count == 3
+        assert recorder.dropped == 0
+
+
+class TestWebSocket:
+    @pytest.mark.asyncio
+    async def test_sends_batches_over_the_stream(self) -> None:
+        stream = MagicMock(spec=IngestStream)
+        stream.send = AsyncMock(return_value={"ack": 1, "created": 2, "failed": 0})
+        client = MagicMock(spec=AgentmeshdClient)
+        client.healthz = AsyncMock(return_value=True)
+        client.open_ingest_stream = AsyncMock(return_value=stream)
+        recorder = EventRecorder(client, websocket=True)
+        await recorder.record(run_id="r1", kind="status")
+        await recorder.record(run_id="r1", kind="message")
+        await recorder.close()
+
+        client.open_ingest_stream.assert_awaited_once_with("r1")
+        [sent] = stream.send.await_args_list[0].args
+        assert [e["kind"] for e in sent] == ["status", "message"]
+        client.post_events.assert_not_called()
+        stream.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_batch_post(self) -> None:
+        stream = MagicMock(spec=IngestStream)
+        stream.send = AsyncMock(side_effect=ConnectionError("closed"))
+        client = MagicMock(spec=AgentmeshdClient)
+        client.healthz = AsyncMock(return_value=True)
+        client.open_ingest_stream = AsyncMock(return_value=stream)
+        client.post_events = AsyncMock(return_value={"created": 1, "failed": 0})
+        recorder = EventRecorder(client, websocket=True)
+        await recorder.record(run_id="r1", kind="status")
+        await asyncio.sleep(0)
+        await recorder.record(run_id="r1", kind="message")
+        await recorder.close()
+
+        assert stream.send.await_count == 1
+        assert client.post_events.await_count == 2
+        stream.close.assert_awaited_once()
+        assert recorder.dropped == 0
+
+    @pytest.mark.asyncio
+    async def test_stays_on_http_when_stream_unavailable(self) -> None:
+        client = MagicMock(spec=AgentmeshdClient)
+        client.healthz = AsyncMock(return_value=True)
+        client.open_ingest_stream = AsyncMock(return_value=None)
+        client.post_events = AsyncMock(return_value={"created": 1, "failed": 0})
+        recorder = EventRecorder(client, websocket=True)
+        await recorder.record(run_id="r1", kind="status")
+        await asyncio.sleep(0)
+        await recorder.record(run_id="r1", kind="message")
+        await recorder.close()
+
+        client.open_ingest_stream.assert_awaited_once()
+        assert client.post_events.await_count == 2
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from agentmesh_cli import ingest
+from agentmesh_cli.ingest import IngestStream, open_ingest_stream
+
+
+class _FakeConnection:
+    def __init__(self, acks: list[int]) -> None:
+        self.sent: list[dict[str, object]] = []
+        self._acks = acks
+        self.closed = False
+
+    async def send(self, data: str) -> None:
+        self.sent.append(json.loads(data))
+
+    async def recv(self) -> str:
+        return json.dumps({"ack": self._acks.pop(0), "created": 1, "duplicates": 0, "failed": 0})
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class TestIngestStream:
+    @pytest.mark.asyncio
+    async def test_frames_omit_the_stream_run_id(self) -> None:
+        connection = _FakeConnection(acks=[1, 2])
+        stream = IngestStream(connection, "r1")
+
+        await stream.send([{"run_id": "r1", "kind": "status"}])
+        ack = await stream.send([{"run_id": "r2", "kind": "tool"}])
+        await stream.close()
+
+        assert connection.sent == [
+            {"seq": 1, "events": [{"kind": "status"}]},
+            {"seq": 2, "events": [{"run_id": "r2", "kind": "tool"}]},
+        ]
+        assert ack["created"] == 1
+        assert connection.closed
+
+    @pytest.mark.asyncio
+    async def test_rejects_ack_for_another_frame(self) -> None:
+        stream = IngestStream(_FakeConnection(acks=[7]), "r1")
+        with pytest.raises(ConnectionError):
+            await stream.send([{"run_id": "r1", "kind": "status"}])
+
+    @pytest.mark.asyncio
+    async def test_unavailable_without_websockets(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(ingest, "_websockets", None)
+        assert await open_ingest_stream("http://127.0.0.1:8321", "r1") is None
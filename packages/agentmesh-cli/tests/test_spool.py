@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+import respx
+from agentmesh_cli.client import AgentmeshdClient
+from agentmesh_cli.spool import SpoolWriter, pending_segments, replay
+from httpx import Response
+
+
+def _event(i: int) -> dict[str, object]:
+    return {"ts": f"2026-01-01T00:00:{i:02d}+00:00", "run_id": "r1", "kind": "message"}
+
+
+def _spool(directory: Path, count: int) -> Path:
+    writer = SpoolWriter(directory)
+    writer.write([_event(i) for i in range(count)])
+    writer.close()
+    assert writer.path is not None
+    return writer.path
+
+
+def _created(request: object) -> Response:
+    events = json.loads(request.content)  # type: ignore[attr-defined]
+    return Response(201, json={"created": len(events), "failed": 0})
+
+
+class TestSpoolWriter:
+    def test_writes_event_v1_lines(self, tmp_path: Path) -> None:
+        writer = SpoolWriter(tmp_path)
+        writer.write([{**_event(0), "task_id": "t1"}])
+        assert writer.path is not None and writer.path.suffix == ".part"
+        assert pending_segments(tmp_path) == []  # still being written by this process
+        writer.close()
+
+        [segment] = pending_segments(tmp_path)
+        [line] = segment.read_text().splitlines()
+        assert json.loads(line) == {
+            "schema_version": "1",
+            "ts": "2026-01-01T00:00:00+00:00",
+            "run_id": "r1",
+            "kind": "message",
+            "task_id": "t1",
+            "step": None,
+            "payload": {},
+            "metadata": {},
+            "team_run_id": None,
+        }
+
+    def test_each_batch_reaches_disk_before_close(self, tmp_path: Path) -> None:
+        writer = SpoolWriter(tmp_path)
+        writer.write([_event(0), _event(1)])
+        assert writer.path is not None
+        assert len(writer.path.read_text().splitlines()) == 2
+        writer.write([_event(2)])
+        assert len(writer.path.read_text().splitlines()) == 3
+        writer.close()
+
+    def test_no_file_until_first_write(self, tmp_path: Path) -> None:
+        writer = SpoolWriter(tmp_path / "spool")
+        writer.close()
+        assert not (tmp_path / "spool").exists()
+
+
+class TestReplay:
+    @pytest.mark.asyncio
+    async def test_uploads_in_batches_and_removes_segments(self, tmp_path: Path) -> None:
+        _spool(tmp_path, 5)
+        with respx.mock(base_url="http://127.0.0.1:8321") as mock_api:
+            route = mock_api.post("/api/events/batch").mock(side_effect=_created)
+            client = AgentmeshdClient()
+            try:
+                stats = await replay(client, tmp_path, batch_size=2)
+            finally:
+                await client.close()
+
+        assert [len(json.loads(c.request.content)) for c in route.calls] == [2, 2, 1]
+        assert (stats.segments, stats.uploaded, stats.failed) == (1, 5, 0)
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_failure_without_resending(self, tmp_path: Path) -> None:
+        _spool(tmp_path, 5)
+        with respx.mock(base_url="http://127.0.0.1:8321") as mock_api:
+            route = mock_api.post("/api/events/batch").mock(side_effect=[_created, Response(503)])
+            client = AgentmeshdClient()
+            try:
+                with pytest.raises(Exception, match="503"):
+                    await replay(client, tmp_path, batch_size=2)
+                route.side_effect = _created
+                stats = await replay(client, tmp_path, batch_size=2)
+            finally:
+                await client.close()
+
+        sent = [e["ts"][-8:-6] for c in route.calls[2:] for e in json.loads(c.request.content)]
+        assert sent == ["02", "03", "04"]
+        assert stats.uploaded == 3
+
+    @pytest.mark.asyncio
+    async def test_skips_torn_lines_of_dead_writers(self, tmp_path: Path) -> None:
+        lines = [json.dumps(_event(0)), '{"ts": "2026']
+        (tmp_path / "1-999999999.part").write_text("\n".join(lines))
+        with respx.mock(base_url="http://127.0.0.1:8321") as mock_api:
+            mock_api.post("/api/events/batch").mock(side_effect=_created)
+            client = AgentmeshdClient()
+            try:
+                stats = await replay(client, tmp_path)
+            finally:
+                await client.close()
+
+        assert (stats.segments, stats.uploaded, stats.failed) == (1, 1, 1)
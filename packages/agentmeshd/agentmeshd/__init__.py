@@ -1,10 +1,29 @@
 from agentmeshd.events import SCHEMA_VERSION, VALID_KINDS, EventV1, make_event
-from agentmeshd.store import EventStore
+from agentmeshd.runs import RunPage, RunSummary
+from agentmeshd.store import (
+    EMBEDDED_WRITER,
+    AppendResult,
+    EventPage,
+    EventStore,
+    RawEventPage,
+    RawSearchPage,
+    RunTrace,
+    StoreLockedError,
+)
 
 __all__ = [
+    "AppendResult",
+    "EMBEDDED_WRITER",
+    "EventPage",
     "EventV1",
     "EventStore",
+    "RawEventPage",
+    "RawSearchPage",
+    "RunPage",
+    "RunSummary",
+    "RunTrace",
     "SCHEMA_VERSION",
+    "StoreLockedError",
     "VALID_KINDS",
     "make_event",
 ]
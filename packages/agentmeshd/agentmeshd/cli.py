@@ -6,6 +6,8 @@ from typing import Annotated
 import typer
 
 from agentmeshd.daemon import DEFAULT_HOST, DEFAULT_PORT
+from agentmeshd.segments import COMPRESSIONS, DEFAULT_SEGMENT_AGE, DEFAULT_SEGMENT_BYTES
+from agentmeshd.store import DEFAULT_COMMIT_BATCH, DEFAULT_COMMIT_DELAY, DEFAULT_READERS
 
 app = typer.Typer(name="agentmeshd", help="AgentMesh control plane daemon.")
 
@@ -24,13 +26,99 @@ def start(
         typer.Option("--background", "-b", help="Run in background."),
     ] = False,
     data_dir: DataDirOption = None,
+    uds: Annotated[
+        Path | None,
+        typer.Option(help="Unix socket to serve on as well (default: <data-dir>/agentmeshd.sock)."),
+    ] = None,
+    no_uds: Annotated[
+        bool,
+        typer.Option("--no-uds", help="Serve on TCP only."),
+    ] = False,
+    commit_batch: Annotated[
+        int,
+        typer.Option(help="Maximum number of events per group commit."),
+    ] = DEFAULT_COMMIT_BATCH,
+    commit_delay_ms: Annotated[
+        float,
+        typer.Option(help="Time to wait for more events before committing a batch."),
+    ] = DEFAULT_COMMIT_DELAY * 1000,
+    readers: Annotated[
+        int,
+        typer.Option(help="Maximum number of read-only SQLite connections."),
+    ] = DEFAULT_READERS,
+    segment_size_mb: Annotated[
+        float,
+        typer.Option(help="Rotate the JSONL log once a segment reaches this size."),
+    ] = DEFAULT_SEGMENT_BYTES / (1024 * 1024),
+    segment_age_hours: Annotated[
+        float,
+        typer.Option(help="Rotate the JSONL log once a segment is this old."),
+    ] = DEFAULT_SEGMENT_AGE / 3600,
+    compression: Annotated[
+        str,
+        typer.Option(help=f"Compression for sealed segments: {', '.join(COMPRESSIONS)}."),
+    ] = "gzip",
+    retain_max_age: Annotated[
+        str | None,
+        typer.Option(help="Delete events older than this (e.g. 30d, 12h)."),
+    ] = None,
+    retain_max_size: Annotated[
+        str | None,
+        typer.Option(help="Keep total storage under this size (e.g. 10GB)."),
+    ] = None,
+    retain_kind: Annotated[
+        list[str] | None,
+        typer.Option(help="Per-kind max age, KIND=DURATION (e.g. reasoning=1d). Repeatable."),
+    ] = None,
+    retention_interval: Annotated[
+        str,
+        typer.Option(help="How often retention runs (e.g. 5m)."),
+    ] = "5m",
 ) -> None:
     """Start the agentmeshd daemon."""
+    from agentmeshd.daemon import StoreOptions
     from agentmeshd.daemon import start as _start
-
+    from agentmeshd.retention import (
+        RetentionPolicy,
+        parse_duration,
+        parse_kind_max_age,
+        parse_size,
+    )
+
+    if compression not in COMPRESSIONS:
+        typer.echo(f"Unknown compression '{compression}'.", err=True)
+        raise typer.Exit(code=2)
+    try:
+        retention = RetentionPolicy(
+            max_age=parse_duration(retain_max_age) if retain_max_age else None,
+            max_bytes=parse_size(retain_max_size) if retain_max_size else None,
+            kind_max_age=parse_kind_max_age(retain_kind or []),
+            interval=parse_duration(retention_interval),
+        )
+    except ValueError as e:
+        typer.echo(f"Invalid retention option: {e}", err=True)
+        raise typer.Exit(code=2) from None
+
+    options = StoreOptions(
+        commit_batch=commit_batch,
+        commit_delay=commit_delay_ms / 1000,
+        readers=readers,
+        segment_bytes=int(segment_size_mb * 1024 * 1024),
+        segment_age=segment_age_hours * 3600,
+        compression=compression,
+        retention=retention,
+    )
     if not background:
         typer.echo(f"Starting agentmeshd on {host}:{port}")
-    _start(host=host, port=port, data_dir=data_dir, background=background)
+    _start(
+        host=host,
+        port=port,
+        data_dir=data_dir,
+        background=background,
+        options=options,
+        uds=uds,
+        unix_socket=not no_uds,
+    )
 
 
 @app.command()
@@ -54,5 +142,48 @@ def status(data_dir: DataDirOption = None) -> None:
     typer.echo(f"agentmeshd: {result}")
 
 
+@app.command()
+def reindex(
+    data_dir: DataDirOption = None,
+    workers: Annotated[
+        int | None,
+        typer.Option(help="Parser processes (default: number of CPUs)."),
+    ] = None,
+) -> None:
+    """Rebuild events.db from the JSONL log. The daemon must be stopped."""
+    from agentmeshd.daemon import reindex as _reindex
+
+    try:
+        stats = _reindex(data_dir=data_dir, workers=workers)
+    except RuntimeError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from None
+    notes = ""
+    if stats.skipped:
+        notes += f", skipped {stats.skipped} unparsable lines"
+    if stats.duplicates:
+        notes += f", dropped {stats.duplicates} duplicate events"
+    typer.echo(
+        f"Reindexed {stats.events} events from {stats.segments} segments "
+        f"in {stats.seconds:.1f}s{notes}."
+    )
+
+
+@app.command()
+def vacuum(data_dir: DataDirOption = None) -> None:
+    """Let retention return freed space to the disk (rewrites events.db). Daemon must be stopped."""
+    from agentmeshd.daemon import vacuum as _vacuum
+
+    try:
+        converted = _vacuum(data_dir=data_dir)
+    except RuntimeError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1) from None
+    if converted:
+        typer.echo("events.db now uses incremental auto-vacuum.")
+    else:
+        typer.echo("events.db already uses incremental auto-vacuum.")
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,79 @@
+"""JSON codec shared by events, the store and the HTTP layer.
+
+Uses ``orjson`` when it is installed (``pip install 'agentmeshd[fast]'``) and
+the stdlib ``json`` module otherwise. Both backends emit compact UTF-8 JSON
+(no spaces, non-ASCII unescaped) and produce the same bytes for event data,
+except that floats with negative exponents are spelled ``1e-7`` by orjson and
+``1e-07`` by the stdlib, and that orjson writes NaN and Infinity as ``null``.
+Values orjson rejects, such as integers wider than 64 bits, are encoded by
+the stdlib.
+
+Set ``AGENTMESH_JSON=stdlib`` to force the stdlib backend.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import importlib
+import json
+import os
+from typing import Any
+
+_SEPARATORS = (",", ":")
+
+
+def _load_orjson() -> Any:
+    if os.environ.get("AGENTMESH_JSON", "").lower() == "stdlib":
+        return None
+    try:
+        return importlib.import_module("orjson")
+    except ImportError:
+        return None
+
+
+_orjson = _load_orjson()
+BACKEND = "orjson" if _orjson is not None else "stdlib"
+
+
+def dumps(obj: Any) -> str:
+    """Encode ``obj`` as a compact JSON string."""
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(obj, option=_orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=_SEPARATORS)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON bytes."""
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(obj, option=_orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=_SEPARATORS).encode()
+
+
+def loads(data: str | bytes) -> Any:
+    """Decode JSON text; raises :class:`json.JSONDecodeError` on invalid input."""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Pack keyset values into an opaque, URL-safe pagination cursor."""
+    return base64.urlsafe_b64encode(dumps_bytes(values)).decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """Unpack :func:`encode_cursor`; raises :class:`ValueError` if malformed."""
+    try:
+        values: object = loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values  # type: ignore[return-value]
@@ -3,18 +3,83 @@ from __future__ import annotations
 import os
 import shutil
 import signal
+import socket
 import subprocess
 import sys
 import time
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
+import typer
 import uvicorn
+from starlette.applications import Starlette
 
+from agentmeshd.pubsub import EventBroker
+from agentmeshd.reindex import ReindexStats, log_bytes
+from agentmeshd.reindex import reindex as _reindex
+from agentmeshd.retention import RetentionPolicy, RetentionWorker
+from agentmeshd.segments import DEFAULT_SEGMENT_AGE, DEFAULT_SEGMENT_BYTES
 from agentmeshd.server import create_app
-from agentmeshd.store import EventStore
+from agentmeshd.store import (
+    DEFAULT_COMMIT_BATCH,
+    DEFAULT_COMMIT_DELAY,
+    DEFAULT_READERS,
+    EMBEDDED_WRITER,
+    VACUUM_WRITER,
+    EventStore,
+    StoreLockedError,
+    writer_lock,
+)
 
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 8321
+# How long ``start`` waits for an embedded ``agentmesh run`` to release the store.
+EMBEDDED_WAIT = 60.0
+# Seconds uvicorn lets in-flight requests finish on shutdown before cancelling them.
+GRACEFUL_SHUTDOWN = 5
+
+
+@dataclass(frozen=True)
+class StoreOptions:
+    """EventStore tuning knobs, as set on the ``agentmeshd start`` command line."""
+
+    commit_batch: int = DEFAULT_COMMIT_BATCH
+    commit_delay: float = DEFAULT_COMMIT_DELAY
+    readers: int = DEFAULT_READERS
+    segment_bytes: int = DEFAULT_SEGMENT_BYTES
+    segment_age: float = DEFAULT_SEGMENT_AGE
+    compression: str = "gzip"
+    retention: RetentionPolicy = field(default_factory=RetentionPolicy)
+
+    def store_kwargs(self) -> dict[str, Any]:
+        return {
+            "max_batch": self.commit_batch,
+            "max_delay": self.commit_delay,
+            "readers": self.readers,
+            "segment_bytes": self.segment_bytes,
+            "segment_age": self.segment_age,
+            "compression": self.compression,
+        }
+
+    def cli_args(self) -> list[str]:
+        """Arguments that reproduce these options when re-invoking ``agentmeshd start``."""
+        args = [
+            "--commit-batch", str(self.commit_batch),
+            "--commit-delay-ms", str(self.commit_delay * 1000),
+            "--readers", str(self.readers),
+            "--segment-size-mb", str(self.segment_bytes / (1024 * 1024)),
+            "--segment-age-hours", str(self.segment_age / 3600),
+            "--compression", self.compression,
+            "--retention-interval", str(self.retention.interval),
+        ]
+        if self.retention.max_age:
+            args += ["--retain-max-age", str(self.retention.max_age)]
+        if self.retention.max_bytes:
+            args += ["--retain-max-size", str(self.retention.max_bytes)]
+        for kind, max_age in self.retention.kind_max_age.items():
+            args += ["--retain-kind", f"{kind}={max_age}"]
+        return args
 
 
 def _pid_file(data_dir: Path) -> Path:
@@ -25,6 +90,27 @@ def _log_file(data_dir: Path) -> Path:
     return data_dir / "agentmeshd.log"
 
 
+def socket_file(data_dir: Path) -> Path:
+    """Default Unix socket the daemon serves on alongside TCP."""
+    return data_dir / "agentmeshd.sock"
+
+
+def _socket_record(data_dir: Path) -> Path:
+    """Where the running daemon records the Unix socket it bound, for ``stop``."""
+    return data_dir / "agentmeshd.sock.path"
+
+
+def _remove_socket(data_dir: Path) -> None:
+    """Remove the recorded socket (or the default one, if none was recorded)."""
+    record = _socket_record(data_dir)
+    try:
+        path = Path(record.read_text().strip())
+    except FileNotFoundError:
+        path = socket_file(data_dir)
+    path.unlink(missing_ok=True)
+    record.unlink(missing_ok=True)
+
+
 def _read_running_pid(pid_path: Path) -> int | None:
     """Read a PID file and check if that process is alive.
 
@@ -53,34 +139,119 @@ def start(
     port: int = DEFAULT_PORT,
     data_dir: Path | None = None,
     background: bool = False,
+    options: StoreOptions | None = None,
+    uds: Path | None = None,
+    unix_socket: bool = True,
 ) -> None:
-    """Start the agentmeshd HTTP server and write a PID file."""
+    """Start the agentmeshd HTTP server and write a PID file.
+
+    Besides ``host:port`` the server listens on the Unix socket ``uds``
+    (default ``<data_dir>/agentmeshd.sock``) unless ``unix_socket`` is false.
+    """
     resolved_dir = data_dir or _default_data_dir()
     resolved_dir.mkdir(parents=True, exist_ok=True)
+    resolved_options = options or StoreOptions()
+    socket_path = (uds or socket_file(resolved_dir)) if unix_socket else None
 
     if background:
-        _start_background(host=host, port=port, data_dir=resolved_dir)
+        _start_background(
+            host=host,
+            port=port,
+            data_dir=resolved_dir,
+            options=resolved_options,
+            uds=socket_path,
+        )
         return
 
+    # Take the store's writer lock before claiming the PID file, so a second
+    # daemon fails without pointing ``status``/``stop`` at itself.
+    try:
+        store = _open_store(resolved_dir, resolved_options)
+    except StoreLockedError as e:
+        print(f"agentmeshd cannot start: {e}", file=sys.stderr)
+        raise SystemExit(1) from None
+
+    # No other daemon serves this data directory while we hold its lock, so
+    # sockets left by one that was killed would only misdirect clients.
+    _remove_socket(resolved_dir)
+    socket_file(resolved_dir).unlink(missing_ok=True)
+
     pid_path = _pid_file(resolved_dir)
     pid_path.write_text(str(os.getpid()))
+    if socket_path is not None:
+        _socket_record(resolved_dir).write_text(str(socket_path.absolute()))
 
-    store = EventStore(resolved_dir)
     app = create_app(store)
+    retention: RetentionWorker | None = None
+    if resolved_options.retention.enabled:
+        retention = RetentionWorker(store, resolved_options.retention)
+        retention.start()
 
     try:
-        uvicorn.run(app, host=host, port=port, log_level="info")
+        _serve(app, host=host, port=port, uds=socket_path)
     finally:
+        if retention is not None:
+            retention.stop()
         store.close()
+        if socket_path is not None:
+            _remove_socket(resolved_dir)
         if pid_path.exists():
             pid_path.unlink()
 
 
+def _open_store(data_dir: Path, options: StoreOptions) -> EventStore:
+    """Open the store, waiting briefly only for an embedded ``agentmesh run`` to finish."""
+    try:
+        return EventStore(data_dir, **options.store_kwargs())
+    except StoreLockedError as e:
+        if e.writer != EMBEDDED_WRITER:
+            raise
+        print(f"Waiting up to {EMBEDDED_WAIT:.0f}s for agentmesh run (pid {e.pid}) to finish...")
+        return EventStore(data_dir, lock_timeout=EMBEDDED_WAIT, **options.store_kwargs())
+
+
+class _DaemonServer(uvicorn.Server):
+    """uvicorn server that ends open event streams when shutdown begins.
+
+    uvicorn waits for in-flight responses before running the lifespan
+    shutdown, so an ``/api/events/stream`` client would otherwise keep the
+    process alive forever; the broker is closed first instead.
+    """
+
+    def __init__(self, config: uvicorn.Config, broker: EventBroker) -> None:
+        super().__init__(config)
+        self._broker = broker
+
+    async def shutdown(self, sockets: list[socket.socket] | None = None) -> None:
+        self._broker.close()
+        await super().shutdown(sockets)
+
+
+def _serve(app: Starlette, *, host: str, port: int, uds: Path | None) -> None:
+    """Run one uvicorn server on the TCP address and, if given, the Unix socket."""
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        log_level="info",
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN,
+    )
+    sockets = [config.bind_socket()]
+    if uds is not None:
+        # A socket file left by a daemon that was killed would fail the bind.
+        uds.unlink(missing_ok=True)
+        sockets.append(uvicorn.Config(app, uds=str(uds), log_level="info").bind_socket())
+        uds.chmod(0o600)
+    _DaemonServer(config, app.state.broker).run(sockets=sockets)
+
+
 def _start_background(
     *,
     host: str,
     port: int,
     data_dir: Path,
+    options: StoreOptions,
+    uds: Path | None,
 ) -> None:
     """Spawn agentmeshd as a detached background process."""
     pid_path = _pid_file(data_dir)
@@ -107,6 +278,8 @@ def _start_background(
         "--host", host,
         "--port", str(port),
         "--data-dir", str(data_dir),
+        *(["--uds", str(uds)] if uds is not None else ["--no-uds"]),
+        *options.cli_args(),
     ]
 
     proc = subprocess.Popen(
@@ -149,7 +322,13 @@ def stop(*, data_dir: Path | None = None) -> bool:
         pid = int(pid_path.read_text().strip())
         os.kill(pid, signal.SIGTERM)
         pid_path.unlink(missing_ok=True)
-    except (ValueError, ProcessLookupError, PermissionError):
+        _remove_socket(resolved_dir)
+    except ProcessLookupError:
+        # The daemon died without cleaning up after itself.
+        pid_path.unlink(missing_ok=True)
+        _remove_socket(resolved_dir)
+        return False
+    except (ValueError, PermissionError):
         pid_path.unlink(missing_ok=True)
         return False
     else:
@@ -168,6 +347,39 @@ def status(*, data_dir: Path | None = None) -> str:
     return f"running (pid {pid})"
 
 
+def reindex(*, data_dir: Path | None = None, workers: int | None = None) -> ReindexStats:
+    """Rebuild ``events.db`` from the JSONL log, refusing while anything writes to it."""
+    resolved_dir = data_dir or _default_data_dir()
+    pid = _read_running_pid(_pid_file(resolved_dir))
+    if pid is not None:
+        raise RuntimeError(f"agentmeshd is running (pid {pid}); stop it before reindexing")
+    total = log_bytes(resolved_dir)
+    with (
+        writer_lock(resolved_dir),
+        typer.progressbar(length=total, label="Reindexing", file=sys.stderr) as bar,
+    ):
+        return _reindex(resolved_dir, workers=workers, progress=bar.update)
+
+
+def vacuum(*, data_dir: Path | None = None) -> bool:
+    """Switch ``events.db`` to incremental auto-vacuum, refusing while anything writes to it.
+
+    Returns ``False`` if it already used it.
+    """
+    resolved_dir = data_dir or _default_data_dir()
+    pid = _read_running_pid(_pid_file(resolved_dir))
+    if pid is not None:
+        raise RuntimeError(f"agentmeshd is running (pid {pid}); stop it before vacuuming")
+    store = EventStore(resolved_dir, writer=VACUUM_WRITER)
+    try:
+        if store.incremental_vacuum_enabled():
+            return False
+        store.enable_incremental_vacuum()
+        return True
+    finally:
+        store.close()
+
+
 def _default_data_dir() -> Path:
     raw = os.environ.get("AGENTMESH_DATA_DIR", "~/.agentmesh")
     return Path(raw).expanduser()
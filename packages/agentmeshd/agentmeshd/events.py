@@ -1,18 +1,28 @@
 from __future__ import annotations
 
-import json
+import uuid
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Any
 
+from agentmeshd import codec
+
 VALID_KINDS = frozenset({"status", "message", "artifact", "tool", "reasoning", "error"})
 
 SCHEMA_VERSION = "1"
 
+# A2A task states after which a run produces no further status updates.
+TERMINAL_STATES = frozenset({"completed", "failed", "canceled", "rejected"})
+
 
 @dataclass(frozen=True)
 class EventV1:
-    """Canonical event record for AgentMesh (schema version 1)."""
+    """Canonical event record for AgentMesh (schema version 1).
+
+    ``event_id`` is an optional client-generated unique id. The store keeps
+    the first event with a given id and treats later ones as retries, so
+    producers can resend without double-counting.
+    """
 
     schema_version: str
     ts: str
@@ -23,9 +33,10 @@ class EventV1:
     payload: dict[str, Any]
     metadata: dict[str, Any]
     team_run_id: str | None
+    event_id: str | None = None
 
     def to_dict(self) -> dict[str, Any]:
-        return {
+        data: dict[str, Any] = {
             "schema_version": self.schema_version,
             "ts": self.ts,
             "run_id": self.run_id,
@@ -36,9 +47,12 @@ class EventV1:
             "metadata": self.metadata,
             "team_run_id": self.team_run_id,
         }
+        if self.event_id is not None:
+            data["event_id"] = self.event_id
+        return data
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict(), ensure_ascii=False)
+        return codec.dumps(self.to_dict())
 
     @staticmethod
     def from_dict(data: dict[str, Any]) -> EventV1:
@@ -74,11 +88,12 @@ class EventV1:
             payload=payload,
             metadata=_as_dict(data.get("metadata")),
             team_run_id=_opt_str(data.get("team_run_id")),
+            event_id=_opt_str(data.get("event_id")),
         )
 
     @staticmethod
-    def from_json(line: str) -> EventV1:
-        return EventV1.from_dict(json.loads(line))
+    def from_json(line: str | bytes) -> EventV1:
+        return EventV1.from_dict(codec.loads(line))
 
 
 def make_event(
@@ -90,8 +105,9 @@ def make_event(
     step: str | None = None,
     metadata: dict[str, Any] | None = None,
     team_run_id: str | None = None,
+    event_id: str | None = None,
 ) -> EventV1:
-    """Convenience factory that fills in schema_version and timestamp."""
+    """Convenience factory that fills in schema_version, timestamp and a fresh event_id."""
     return EventV1(
         schema_version=SCHEMA_VERSION,
         ts=datetime.now(UTC).isoformat(),
@@ -102,9 +118,29 @@ def make_event(
         payload=payload or {},
         metadata=metadata or {},
         team_run_id=team_run_id,
+        event_id=event_id or new_event_id(),
     )
 
 
+def new_event_id() -> str:
+    return str(uuid.uuid4())
+
+
+def status_state(event: EventV1) -> str | None:
+    """The task state carried by a ``status`` event, if any."""
+    if event.kind != "status":
+        return None
+    state = event.payload.get("state")
+    return state if isinstance(state, str) else None
+
+
+def is_final_status(event: EventV1) -> bool:
+    """Whether ``event`` is a status update that ends its run."""
+    if event.kind != "status":
+        return False
+    return event.metadata.get("final") is True or status_state(event) in TERMINAL_STATES
+
+
 def _opt_str(value: Any) -> str | None:
     if value is None:
         return None
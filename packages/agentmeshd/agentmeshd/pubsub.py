@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+from agentmeshd.events import EventV1
+from agentmeshd.store import StoredEvent
+
+DEFAULT_QUEUE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """Equality filters on the correlation fields; ``None`` matches anything."""
+
+    run_id: str | None = None
+    task_id: str | None = None
+    kind: str | None = None
+    team_run_id: str | None = None
+
+    def matches(self, event: EventV1) -> bool:
+        return (
+            (self.run_id is None or event.run_id == self.run_id)
+            and (self.task_id is None or event.task_id == self.task_id)
+            and (self.kind is None or event.kind == self.kind)
+            and (self.team_run_id is None or event.team_run_id == self.team_run_id)
+        )
+
+
+class Subscription:
+    """A subscriber's bounded buffer of matching events, drained on its event loop.
+
+    If more than ``max_queue`` events are waiting, the subscription is marked
+    ``overflowed`` and stops receiving; the consumer is expected to end its
+    stream so the client reconnects and catches up from the store.
+    """
+
+    def __init__(
+        self,
+        broker: EventBroker,
+        event_filter: EventFilter,
+        loop: asyncio.AbstractEventLoop,
+        max_queue: int,
+    ) -> None:
+        self._broker = broker
+        self.filter = event_filter
+        self._loop = loop
+        self._max_queue = max_queue
+        self._buffer: deque[StoredEvent] = deque()
+        self._ready = asyncio.Event()
+        self.overflowed = False
+        self.closed = False
+
+    async def get(self) -> list[StoredEvent]:
+        """Wait for events and return everything buffered; ``[]`` once closed."""
+        while not self._buffer and not self.closed and not self.overflowed:
+            self._ready.clear()
+            await self._ready.wait()
+        events = list(self._buffer)
+        self._buffer.clear()
+        return events
+
+    def close(self) -> None:
+        """Stop receiving; call from the subscriber's event loop."""
+        self._broker.unsubscribe(self)
+        self.closed = True
+        self._ready.set()
+
+    def offer(self, events: list[StoredEvent]) -> None:
+        """Queue ``events``; safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, events)
+        except RuntimeError:  # the subscriber's loop is gone
+            self._broker.unsubscribe(self)
+
+    def _deliver(self, events: list[StoredEvent]) -> None:
+        if self.overflowed or self.closed:
+            return
+        if len(self._buffer) + len(events) > self._max_queue:
+            self.overflowed = True
+            self._buffer.clear()
+            self._broker.unsubscribe(self)
+        else:
+            self._buffer.extend(events)
+        self._ready.set()
+
+
+class EventBroker:
+    """In-memory fan-out of committed events to live subscribers.
+
+    Register :meth:`publish` with :meth:`EventStore.add_listener`; it runs on
+    the store's writer thread and hands each subscriber the events matching
+    its filter, without blocking on slow consumers.
+    """
+
+    def __init__(self, *, max_queue: int = DEFAULT_QUEUE_SIZE) -> None:
+        self._max_queue = max_queue
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def subscribe(self, event_filter: EventFilter) -> Subscription:
+        """Subscribe from a coroutine; events are delivered on its running loop."""
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(self, event_filter, loop, self._max_queue)
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._subscriptions.add(subscription)
+        if closed:
+            subscription.close()
+        return subscription
+
+    def close(self) -> None:
+        """Close every subscription, and any made later, so their streams end.
+
+        Call from the subscribers' event loop, e.g. when the server shuts down.
+        """
+        with self._lock:
+            self._closed = True
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.close()
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+    def publish(self, events: list[StoredEvent]) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            matched = [e for e in events if subscription.filter.matches(e.event)]
+            if matched:
+                subscription.offer(matched)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import mmap
+import os
+import sqlite3
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, cast
+
+from agentmeshd import codec
+from agentmeshd.events import EventV1
+from agentmeshd.segments import SegmentInfo, decompress, read_manifest
+from agentmeshd.store import (
+    create_indexes,
+    create_tables,
+    drop_duplicate_events,
+    event_to_row,
+    rebuild_derived,
+)
+
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+
+# A line repeating an id (left by a crash between the log write and the
+# commit) is superseded by the later one, which is what was committed.
+_INSERT_WITH_ID = """
+INSERT OR REPLACE INTO events (
+    id, schema_version, ts, run_id, kind, task_id, step, payload, metadata, team_run_id, raw,
+    event_id
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@dataclass(frozen=True)
+class ReindexStats:
+    """Outcome of a :func:`reindex` run."""
+
+    events: int
+    skipped: int
+    duplicates: int
+    segments: int
+    seconds: float
+
+
+@dataclass(frozen=True)
+class _Source:
+    path: Path
+    compression: str
+    first_id: int | None
+
+
+def reindex(
+    data_dir: Path,
+    *,
+    workers: int | None = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    progress: Callable[[int], None] | None = None,
+) -> ReindexStats:
+    """Rebuild ``events.db`` from the JSONL log.
+
+    Lines are read in ``chunk_bytes`` chunks (memory-mapped for uncompressed
+    segments) and parsed into events in a pool of
+    ``workers`` processes; ``workers=1`` parses in this process. Rows keep the
+    id written on each log line; lines written before ids were (and the
+    legacy ``events.jsonl``) are numbered by position from the segment's
+    ``first_id``, counting unparsable lines. Rows are bulk-loaded into a fresh
+    database with indexes built afterwards, and the run summaries and search
+    index are recomputed from the loaded events; the result then replaces
+    ``events.db``.
+    Lines that fail to parse are counted in ``skipped``; lines dropped as
+    repeats of a row id or ``event_id`` already loaded, in ``duplicates``.
+
+    ``progress`` is called with the number of on-disk bytes consumed as the
+    log is read. Must not run while agentmeshd has the store open.
+    """
+    started = time.monotonic()
+    sources = _sources(data_dir)
+    db_path = data_dir / "events.db"
+    tmp_path = data_dir / "events.db.reindex"
+    tmp_path.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(str(tmp_path))
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    create_tables(conn)
+
+    loaded = 0
+    bad_lines = 0
+    try:
+        with _Parser(workers) as parser:
+            next_id = 1
+            for source in sources:
+                if source.first_id is not None:
+                    next_id = source.first_id
+                chunks = _read_chunks(source, chunk_bytes, progress)
+                for rows, lines, bad in parser.parse(chunks):
+                    batch = [
+                        (row_id if row_id is not None else next_id + index, *row)
+                        for row_id, index, row in rows
+                    ]
+                    conn.executemany(_INSERT_WITH_ID, batch)
+                    next_id = max(next_id + lines, batch[-1][0] + 1 if batch else 0)
+                    loaded += len(batch)
+                    bad_lines += bad
+        drop_duplicate_events(conn)
+        events: int = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        create_indexes(conn)
+        rebuild_derived(conn)
+        conn.commit()
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+
+    with tmp_path.open("rb") as f:
+        os.fsync(f.fileno())
+    # A WAL left by the old database must not be replayed onto the new one.
+    for suffix in ("-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    os.replace(tmp_path, db_path)
+    return ReindexStats(
+        events=events,
+        skipped=bad_lines,
+        duplicates=loaded - events,
+        segments=len(sources),
+        seconds=time.monotonic() - started,
+    )
+
+
+def log_bytes(data_dir: Path) -> int:
+    """Total on-disk size of the JSONL sources :func:`reindex` would read."""
+    return sum(source.path.stat().st_size for source in _sources(data_dir))
+
+
+def _sources(data_dir: Path) -> list[_Source]:
+    log_dir = data_dir / "log"
+    segments: list[SegmentInfo] = read_manifest(log_dir)
+    sources: list[_Source] = []
+    legacy = data_dir / "events.jsonl"
+    if legacy.exists() and not any(s.segment == 0 for s in segments):
+        # Not yet adopted into the segmented log by a store.
+        sources.append(_Source(legacy, "none", None))
+    for info in segments:
+        path = log_dir / info.file
+        if path.exists():
+            sources.append(_Source(path, info.compression, info.first_id))
+    return sources
+
+
+def _read_chunks(
+    source: _Source, chunk_bytes: int, progress: Callable[[int], None] | None
+) -> Iterator[bytes]:
+    """Yield chunks of whole lines from one source."""
+    if source.compression == "none":
+        yield from _read_mapped(source.path, chunk_bytes, progress)
+        return
+    with source.path.open("rb") as raw, decompress(raw, source.compression) as stream:
+        consumed = 0
+        tail = b""
+        while block := stream.read(chunk_bytes):
+            data = tail + block
+            cut = data.rfind(b"\n") + 1
+            tail = data[cut:]
+            if cut:
+                yield data[:cut]
+            if progress is not None:
+                position = raw.tell()
+                progress(position - consumed)
+                consumed = position
+        if tail:
+            yield tail
+
+
+def _read_mapped(
+    path: Path, chunk_bytes: int, progress: Callable[[int], None] | None
+) -> Iterator[bytes]:
+    size = path.stat().st_size
+    if size == 0:
+        return
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", min(start + chunk_bytes, size) - 1)
+            end = size if end < 0 else end + 1
+            yield mm[start:end]
+            if progress is not None:
+                progress(end - start)
+            start = end
+
+
+_ParsedChunk = tuple[list[tuple[int | None, int, tuple[Any, ...]]], int, int]
+
+
+def _parse_chunk(chunk: bytes) -> _ParsedChunk:
+    """Parse one chunk of JSONL into insert rows; runs in a worker process.
+
+    Returns ``(rows, lines, bad)``: each row is ``(id, index, values)`` with
+    the id from the line (``None`` if it has none) and the line's index among
+    the chunk's ``lines`` non-blank lines, of which ``bad`` failed to parse.
+    """
+    rows: list[tuple[int | None, int, tuple[Any, ...]]] = []
+    lines = 0
+    bad = 0
+    for line in chunk.splitlines():
+        if not line.strip():
+            continue
+        index = lines
+        lines += 1
+        try:
+            parsed = codec.loads(line)
+            if not isinstance(parsed, dict):
+                raise ValueError("not a JSON object")
+            data = cast(dict[str, Any], parsed)
+            event = EventV1.from_dict(data)
+        except (ValueError, TypeError, AttributeError):
+            bad += 1
+            continue
+        row_id = data.get("id")
+        rows.append((row_id if isinstance(row_id, int) else None, index, event_to_row(event)))
+    return rows, lines, bad
+
+
+class _Parser:
+    """Parse chunks in order, in a process pool with a bounded number in flight."""
+
+    def __init__(self, workers: int | None) -> None:
+        self._workers = workers or os.cpu_count() or 1
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> _Parser:
+        if self._workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    def parse(self, chunks: Iterator[bytes]) -> Iterator[_ParsedChunk]:
+        if self._pool is None:
+            yield from map(_parse_chunk, chunks)
+            return
+        in_flight: deque[Future[_ParsedChunk]] = deque()
+        for chunk in chunks:
+            in_flight.append(self._pool.submit(_parse_chunk, chunk))
+            if len(in_flight) >= 2 * self._workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
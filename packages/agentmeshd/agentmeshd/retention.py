@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from agentmeshd.segments import SegmentInfo
+from agentmeshd.store import EventStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 300.0
+DEFAULT_CHUNK = 1000
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_SIZE_UNITS = {"": 1, "b": 1, "kb": 1024, "mb": 1024**2, "gb": 1024**3, "tb": 1024**4}
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How long agentmeshd keeps events.
+
+    ``max_age`` (seconds) and ``max_bytes`` apply to both the SQLite index and
+    the JSONL log; ``kind_max_age`` maps an event kind to a shorter lifetime
+    and applies to the SQLite index only, since sealed JSONL segments are not
+    rewritten.
+    """
+
+    max_age: float | None = None
+    max_bytes: int | None = None
+    kind_max_age: dict[str, float] = field(default_factory=lambda: dict[str, float]())
+    interval: float = DEFAULT_INTERVAL
+    chunk_size: int = DEFAULT_CHUNK
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_age or self.max_bytes or self.kind_max_age)
+
+
+def parse_duration(text: str) -> float:
+    """Parse ``"90s"``, ``"30m"``, ``"12h"``, ``"7d"``, ``"2w"`` or plain seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", text.lower())
+    if match is None:
+        raise ValueError(f"invalid duration {text!r}")
+    value, unit = match.groups()
+    return float(value) * _DURATION_UNITS.get(unit, 1)
+
+
+def parse_size(text: str) -> int:
+    """Parse ``"500MB"``, ``"10GB"`` or plain bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?b?)\s*", text.lower())
+    if match is None:
+        raise ValueError(f"invalid size {text!r}")
+    value, unit = match.groups()
+    if unit and not unit.endswith("b"):
+        unit += "b"
+    return int(float(value) * _SIZE_UNITS[unit])
+
+
+def parse_kind_max_age(values: list[str]) -> dict[str, float]:
+    """Parse ``["reasoning=1d", "tool=12h"]`` into a kind → seconds mapping."""
+    result: dict[str, float] = {}
+    for value in values:
+        kind, sep, duration = value.partition("=")
+        if not sep or not kind.strip():
+            raise ValueError(f"expected KIND=DURATION, got {value!r}")
+        result[kind.strip()] = parse_duration(duration)
+    return result
+
+
+def enforce(store: EventStore, policy: RetentionPolicy, *, now: datetime | None = None) -> int:
+    """Run one retention pass and return the number of events deleted.
+
+    Work is split into ``policy.chunk_size`` deletes, each its own short
+    writer transaction, so ingestion interleaves with a large purge. The
+    summaries of the runs touched are recomputed once, at the end of the pass.
+    """
+    try:
+        return _enforce(store, policy, now or datetime.now(UTC))
+    finally:
+        store.refresh_runs()
+
+
+def _enforce(store: EventStore, policy: RetentionPolicy, current: datetime) -> int:
+    deleted = 0
+    if policy.max_age:
+        cutoff = _cutoff(current, policy.max_age)
+        deleted += _purge_all(store, policy, before=cutoff)
+        for info in store.log_segments():
+            if info.sealed and info.last_ts is not None and info.last_ts < cutoff:
+                store.drop_segment(info)
+
+    for kind, max_age in policy.kind_max_age.items():
+        deleted += _purge_all(store, policy, before=_cutoff(current, max_age), kind=kind)
+
+    if policy.max_bytes:
+        deleted += _enforce_size(store, policy, policy.max_bytes)
+
+    return deleted
+
+
+class RetentionWorker:
+    """Background thread that enforces a :class:`RetentionPolicy` periodically."""
+
+    def __init__(self, store: EventStore, policy: RetentionPolicy) -> None:
+        self._store = store
+        self._policy = policy
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="agentmeshd-retention", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        try:
+            if not self._store.incremental_vacuum_enabled():
+                logger.warning(
+                    "events.db predates auto_vacuum=incremental: purged space is reused "
+                    "but not returned to the disk until `agentmeshd vacuum` is run "
+                    "with the daemon stopped"
+                )
+        except Exception:
+            logger.exception("could not read the auto_vacuum mode of events.db")
+        while not self._stop.is_set():
+            try:
+                deleted = enforce(self._store, self._policy)
+            except Exception:
+                logger.exception("retention pass failed")
+            else:
+                if deleted:
+                    logger.info("retention removed %d events", deleted)
+            self._stop.wait(self._policy.interval)
+
+
+def _cutoff(now: datetime, max_age: float) -> str:
+    return (now - timedelta(seconds=max_age)).isoformat()
+
+
+def _purge_all(
+    store: EventStore,
+    policy: RetentionPolicy,
+    *,
+    before: str | None = None,
+    kind: str | None = None,
+    upto_id: int | None = None,
+) -> int:
+    total = 0
+    while True:
+        n = store.purge(before=before, kind=kind, upto_id=upto_id, limit=policy.chunk_size)
+        total += n
+        if n < policy.chunk_size:
+            return total
+
+
+def _enforce_size(store: EventStore, policy: RetentionPolicy, max_bytes: int) -> int:
+    """Drop the oldest sealed segments, and their events, until under ``max_bytes``."""
+    deleted = 0
+    while True:
+        segments = store.log_segments()
+        total = store.db_bytes() + sum(s.bytes for s in segments)
+        if total <= max_bytes:
+            return deleted
+        sealed = [s for s in segments if s.sealed]
+        if not sealed:
+            # Only the active segment is left; it becomes eligible once rotated.
+            return deleted
+        oldest = sealed[0]
+        last_id = _last_id(oldest, segments)
+        if last_id is None:
+            # Nothing is logged after an adopted legacy segment yet, so its
+            # events cannot be told apart from ones being written.
+            return deleted
+        deleted += _purge_all(store, policy, upto_id=last_id)
+        store.drop_segment(oldest)
+
+
+def _last_id(info: SegmentInfo, segments: list[SegmentInfo]) -> int | None:
+    """``info.last_id``, or for a legacy segment (no ids) the id before the next one's."""
+    if info.last_id is not None:
+        return info.last_id
+    later = [s.first_id for s in segments if s.segment > info.segment and s.first_id is not None]
+    return later[0] - 1 if later else None
@@ -0,0 +1,437 @@
+"""Per-run summaries kept in the ``runs`` table next to ``events``.
+
+The writer folds every committed batch into its runs inside the same
+transaction (:func:`update_runs`), so listing runs never scans events.
+:func:`rebuild_runs` recomputes summaries from ``events`` in SQL; it is used
+to backfill an existing database and by reindex. Purges only record the runs
+they touched in ``stale_runs`` (:func:`mark_stale`), and
+:func:`rebuild_stale` recomputes each of them once after the pass.
+
+The ``run_ids`` table maps every run, task and team run id seen in events to
+the runs it belongs to, so :func:`resolve_id` turns any id into runs with a
+single primary-key probe.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from agentmeshd import codec
+from agentmeshd.events import TERMINAL_STATES, EventV1, is_final_status, status_state
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    team_run_id TEXT,
+    agent_url TEXT,
+    first_id INTEGER NOT NULL,
+    last_id INTEGER NOT NULL,
+    first_ts TEXT NOT NULL,
+    last_ts TEXT NOT NULL,
+    event_count INTEGER NOT NULL,
+    kind_counts TEXT NOT NULL,
+    task_ids TEXT NOT NULL,
+    state TEXT,
+    final INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Every sort key ends in ``run_id`` so keyset pages are stable on ties.
+_CREATE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_runs_first_ts ON runs(first_ts, run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_last_ts ON runs(last_ts, run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_event_count ON runs(event_count, run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_team_run_id ON runs(team_run_id, first_ts, run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_state ON runs(state, first_ts, run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_agent_url ON runs(agent_url, first_ts, run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_final ON runs(final, first_ts, run_id)",
+]
+
+_CREATE_ID_TABLE = """
+CREATE TABLE IF NOT EXISTS run_ids (
+    id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    PRIMARY KEY (id, kind, run_id)
+) WITHOUT ROWID
+"""
+
+# Runs whose events a purge deleted and whose summary is not yet recomputed.
+_CREATE_STALE_TABLE = (
+    "CREATE TABLE IF NOT EXISTS stale_runs (run_id TEXT PRIMARY KEY) WITHOUT ROWID"
+)
+
+_CREATE_ID_INDEX = "CREATE INDEX IF NOT EXISTS idx_run_ids_run_id ON run_ids(run_id)"
+
+# Event columns an id may be found in, in the order resolve_id() prefers them.
+ID_KINDS = ("run_id", "task_id", "team_run_id")
+
+_INSERT_ID = "INSERT OR IGNORE INTO run_ids (id, kind, run_id) VALUES (?, ?, ?)"
+
+_COLUMNS = (
+    "run_id, team_run_id, agent_url, first_id, last_id, first_ts, last_ts, "
+    "event_count, kind_counts, task_ids, state, final"
+)
+
+_UPSERT = f"INSERT OR REPLACE INTO runs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+_TERMINAL_SQL = ", ".join(f"'{state}'" for state in sorted(TERMINAL_STATES))
+
+# Same rules as RunSummary.add(), expressed over the stored rows of each run.
+_REBUILD = f"""
+INSERT INTO runs ({_COLUMNS})
+SELECT
+    r.run_id,
+    (SELECT team_run_id FROM events
+        WHERE run_id = r.run_id AND team_run_id IS NOT NULL ORDER BY id LIMIT 1),
+    (SELECT json_extract(metadata, '$.agent_url') FROM events
+        WHERE run_id = r.run_id AND json_type(metadata, '$.agent_url') = 'text'
+        ORDER BY id LIMIT 1),
+    r.first_id, r.last_id, r.first_ts, r.last_ts, r.event_count,
+    (SELECT json_group_object(kind, n) FROM (
+        SELECT kind, count(*) AS n FROM events WHERE run_id = r.run_id
+        GROUP BY kind ORDER BY min(id))),
+    (SELECT json_group_array(task_id) FROM (
+        SELECT task_id FROM events WHERE run_id = r.run_id AND task_id IS NOT NULL
+        GROUP BY task_id ORDER BY min(id))),
+    (SELECT json_extract(payload, '$.state') FROM events
+        WHERE run_id = r.run_id AND kind = 'status' AND json_type(payload, '$.state') = 'text'
+        ORDER BY id DESC LIMIT 1),
+    EXISTS (SELECT 1 FROM events
+        WHERE run_id = r.run_id AND kind = 'status' AND (
+            json_type(metadata, '$.final') = 'true'
+            OR (json_type(payload, '$.state') = 'text'
+                AND json_extract(payload, '$.state') IN ({_TERMINAL_SQL}))))
+FROM (
+    SELECT run_id, min(id) AS first_id, max(id) AS last_id, min(ts) AS first_ts,
+        max(ts) AS last_ts, count(*) AS event_count
+    FROM events{{where}} GROUP BY run_id
+) AS r
+"""
+
+SORT_COLUMNS = ("first_ts", "last_ts", "event_count")
+
+# Keeps ``IN (...)`` lists well under SQLite's bound-parameter limit.
+_CHUNK = 500
+
+
+@dataclass
+class RunSummary:
+    """Aggregate view of one run, as stored in the ``runs`` table."""
+
+    run_id: str
+    first_id: int
+    last_id: int
+    first_ts: str
+    last_ts: str
+    event_count: int = 0
+    kind_counts: dict[str, int] = field(default_factory=lambda: dict[str, int]())
+    task_ids: list[str] = field(default_factory=lambda: list[str]())
+    team_run_id: str | None = None
+    agent_url: str | None = None
+    state: str | None = None
+    final: bool = False
+
+    @staticmethod
+    def start(event_id: int, event: EventV1) -> RunSummary:
+        """An empty summary positioned at ``event``; call :meth:`add` next."""
+        return RunSummary(
+            run_id=event.run_id,
+            first_id=event_id,
+            last_id=event_id,
+            first_ts=event.ts,
+            last_ts=event.ts,
+        )
+
+    def add(self, event_id: int, event: EventV1) -> None:
+        """Fold one event, committed after the ones already counted, into the summary."""
+        self.first_id = min(self.first_id, event_id)
+        self.last_id = max(self.last_id, event_id)
+        self.first_ts = min(self.first_ts, event.ts)
+        self.last_ts = max(self.last_ts, event.ts)
+        self.event_count += 1
+        self.kind_counts[event.kind] = self.kind_counts.get(event.kind, 0) + 1
+        if event.task_id is not None and event.task_id not in self.task_ids:
+            self.task_ids.append(event.task_id)
+        if self.team_run_id is None:
+            self.team_run_id = event.team_run_id
+        if self.agent_url is None:
+            agent_url = event.metadata.get("agent_url")
+            if isinstance(agent_url, str):
+                self.agent_url = agent_url
+        state = status_state(event)
+        if state is not None:
+            self.state = state
+        if is_final_status(event):
+            self.final = True
+
+    @property
+    def duration(self) -> float | None:
+        """Seconds between the first and last event, if both timestamps parse."""
+        try:
+            start = datetime.fromisoformat(self.first_ts)
+            end = datetime.fromisoformat(self.last_ts)
+            return (end - start).total_seconds()
+        except (ValueError, TypeError):
+            return None
+
+    def to_row(self) -> tuple[Any, ...]:
+        return (
+            self.run_id,
+            self.team_run_id,
+            self.agent_url,
+            self.first_id,
+            self.last_id,
+            self.first_ts,
+            self.last_ts,
+            self.event_count,
+            codec.dumps(self.kind_counts),
+            codec.dumps(self.task_ids),
+            self.state,
+            int(self.final),
+        )
+
+    @staticmethod
+    def from_row(row: tuple[Any, ...]) -> RunSummary:
+        return RunSummary(
+            run_id=row[0],
+            team_run_id=row[1],
+            agent_url=row[2],
+            first_id=row[3],
+            last_id=row[4],
+            first_ts=row[5],
+            last_ts=row[6],
+            event_count=row[7],
+            kind_counts=codec.loads(row[8]),
+            task_ids=codec.loads(row[9]),
+            state=row[10],
+            final=bool(row[11]),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "team_run_id": self.team_run_id,
+            "agent_url": self.agent_url,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "duration": self.duration,
+            "event_count": self.event_count,
+            "kind_counts": self.kind_counts,
+            "task_ids": self.task_ids,
+            "state": self.state,
+            "final": self.final,
+            "first_id": self.first_id,
+            "last_id": self.last_id,
+        }
+
+
+@dataclass(frozen=True)
+class RunPage:
+    """One page of :func:`query_runs`; pass ``next_cursor`` back as ``cursor``."""
+
+    runs: list[RunSummary]
+    next_cursor: str | None
+
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(_CREATE_TABLE)
+    conn.execute(_CREATE_ID_TABLE)
+    conn.execute(_CREATE_STALE_TABLE)
+
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    for idx in _CREATE_INDEXES:
+        conn.execute(idx)
+    conn.execute(_CREATE_ID_INDEX)
+
+
+def update_runs(conn: sqlite3.Connection, events: Iterable[tuple[int, EventV1]]) -> None:
+    """Fold newly inserted ``(id, event)`` pairs into ``runs`` and ``run_ids``.
+
+    Runs in the caller's transaction.
+    """
+    summaries: dict[str, RunSummary] = {}
+    aliases: set[tuple[str, str, str]] = set()
+    batch = list(events)
+    run_ids = list({event.run_id for _, event in batch})
+    for start in range(0, len(run_ids), _CHUNK):
+        chunk = run_ids[start : start + _CHUNK]
+        marks = ", ".join("?" * len(chunk))
+        sql = f"SELECT {_COLUMNS} FROM runs WHERE run_id IN ({marks})"
+        for row in conn.execute(sql, chunk):
+            summaries[row[0]] = RunSummary.from_row(row)
+    for event_id, event in batch:
+        summary = summaries.get(event.run_id)
+        if summary is None:
+            summary = summaries[event.run_id] = RunSummary.start(event_id, event)
+        summary.add(event_id, event)
+        aliases.add((event.run_id, "run_id", event.run_id))
+        if event.task_id is not None:
+            aliases.add((event.task_id, "task_id", event.run_id))
+        if event.team_run_id is not None:
+            aliases.add((event.team_run_id, "team_run_id", event.run_id))
+    conn.executemany(_UPSERT, [s.to_row() for s in summaries.values()])
+    conn.executemany(_INSERT_ID, sorted(aliases))
+
+
+def rebuild_runs(conn: sqlite3.Connection, run_ids: Iterable[str] | None = None) -> None:
+    """Recompute ``runs`` and ``run_ids`` from ``events`` for ``run_ids`` (all if ``None``).
+
+    Runs left without events are removed. Runs in the caller's transaction.
+    """
+    if run_ids is None:
+        conn.execute("DELETE FROM runs")
+        conn.execute("DELETE FROM run_ids")
+        conn.execute("DELETE FROM stale_runs")
+        conn.execute(_REBUILD.format(where=""))
+        _rebuild_ids(conn, "", [])
+        return
+    ids = list(set(run_ids))
+    for start in range(0, len(ids), _CHUNK):
+        chunk = ids[start : start + _CHUNK]
+        marks = ", ".join("?" * len(chunk))
+        conn.execute(f"DELETE FROM runs WHERE run_id IN ({marks})", chunk)
+        conn.execute(f"DELETE FROM run_ids WHERE run_id IN ({marks})", chunk)
+        conn.execute(f"DELETE FROM stale_runs WHERE run_id IN ({marks})", chunk)
+        conn.execute(_REBUILD.format(where=f" WHERE run_id IN ({marks})"), chunk)
+        _rebuild_ids(conn, f" AND run_id IN ({marks})", chunk)
+
+
+def mark_stale(conn: sqlite3.Connection, run_ids: Iterable[str]) -> None:
+    """Record runs whose events were deleted, for :func:`rebuild_stale`."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO stale_runs (run_id) VALUES (?)", [(r,) for r in run_ids]
+    )
+
+
+def stale_run_ids(conn: sqlite3.Connection, run_ids: list[str]) -> set[str]:
+    """Those of ``run_ids`` marked stale and not yet rebuilt."""
+    stale: set[str] = set()
+    for start in range(0, len(run_ids), _CHUNK):
+        chunk = run_ids[start : start + _CHUNK]
+        marks = ", ".join("?" * len(chunk))
+        sql = f"SELECT run_id FROM stale_runs WHERE run_id IN ({marks})"
+        stale.update(row[0] for row in conn.execute(sql, chunk))
+    return stale
+
+
+def rebuild_stale(conn: sqlite3.Connection, limit: int | None = None) -> int:
+    """Rebuild up to ``limit`` runs (all if ``None``) marked stale; return how many."""
+    sql = "SELECT run_id FROM stale_runs"
+    params: list[int] = []
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    run_ids = [row[0] for row in conn.execute(sql, params)]
+    if run_ids:
+        rebuild_runs(conn, run_ids)
+    return len(run_ids)
+
+
+def _rebuild_ids(conn: sqlite3.Connection, where: str, params: list[str]) -> None:
+    for column in ID_KINDS:
+        conn.execute(
+            f"INSERT OR IGNORE INTO run_ids (id, kind, run_id) "
+            f"SELECT DISTINCT {column}, '{column}', run_id FROM events "
+            f"WHERE {column} IS NOT NULL{where}",
+            params,
+        )
+
+
+def resolve_id(conn: sqlite3.Connection, id: str) -> tuple[str, list[str]] | None:
+    """Find the runs ``id`` names, as ``(kind, run_ids)``, or ``None`` if unknown.
+
+    ``kind`` is the event column the id was found in; when an id appears in
+    several columns, run ids win over task ids, and task ids over team run ids.
+    """
+    rows = conn.execute("SELECT kind, run_id FROM run_ids WHERE id = ?", (id,)).fetchall()
+    for kind in ID_KINDS:
+        run_ids = [run_id for k, run_id in rows if k == kind]
+        if run_ids:
+            return kind, run_ids
+    return None
+
+
+def get_runs(conn: sqlite3.Connection, run_ids: list[str]) -> list[RunSummary]:
+    """Summaries for ``run_ids``, oldest run first; unknown ids are skipped."""
+    summaries: list[RunSummary] = []
+    for start in range(0, len(run_ids), _CHUNK):
+        chunk = run_ids[start : start + _CHUNK]
+        marks = ", ".join("?" * len(chunk))
+        sql = f"SELECT {_COLUMNS} FROM runs WHERE run_id IN ({marks})"
+        summaries.extend(RunSummary.from_row(row) for row in conn.execute(sql, chunk))
+    return sorted(summaries, key=lambda s: s.first_id)
+
+
+def query_runs(
+    conn: sqlite3.Connection,
+    *,
+    team_run_id: str | None = None,
+    agent_url: str | None = None,
+    state: str | None = None,
+    final: bool | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    sort: str = "first_ts",
+    descending: bool = True,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> RunPage:
+    """One page of run summaries, ordered by ``sort`` then ``run_id``.
+
+    ``since`` (inclusive) and ``until`` (exclusive) bound the run's
+    ``first_ts``. Pages are keyset-paginated on ``(sort, run_id)``; raises
+    :class:`ValueError` for an unknown ``sort`` or a malformed ``cursor``.
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"unknown sort column: {sort}")
+    clauses: list[str] = []
+    params: list[Any] = []
+    if team_run_id is not None:
+        clauses.append("team_run_id = ?")
+        params.append(team_run_id)
+    if agent_url is not None:
+        clauses.append("agent_url = ?")
+        params.append(agent_url)
+    if state is not None:
+        clauses.append("state = ?")
+        params.append(state)
+    if final is not None:
+        clauses.append("final = ?")
+        params.append(int(final))
+    if since is not None:
+        clauses.append("first_ts >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("first_ts < ?")
+        params.append(until)
+    if cursor is not None:
+        value, run_id = _decode_cursor(cursor)
+        clauses.append(f"({sort}, run_id) {'<' if descending else '>'} (?, ?)")
+        params.extend([value, run_id])
+
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    direction = "DESC" if descending else "ASC"
+    sql = f"SELECT {_COLUMNS} FROM runs{where} ORDER BY {sort} {direction}, run_id {direction}"
+    if limit > 0:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    runs = [RunSummary.from_row(row) for row in conn.execute(sql, params)]
+    next_cursor = None
+    if limit > 0 and len(runs) == limit:
+        last = runs[-1]
+        next_cursor = codec.encode_cursor([getattr(last, sort), last.run_id])
+    return RunPage(runs=runs, next_cursor=next_cursor)
+
+
+def _decode_cursor(cursor: str) -> tuple[str | int, str]:
+    values = codec.decode_cursor(cursor)
+    if len(values) != 2 or not isinstance(values[1], str) or not isinstance(values[0], str | int):
+        raise ValueError("invalid cursor")
+    return values[0], values[1]
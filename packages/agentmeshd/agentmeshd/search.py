@@ -0,0 +1,116 @@
+"""Full-text index over event payloads, backed by SQLite FTS5.
+
+``events_fts`` is a contentless FTS5 table keyed by event id. Each row indexes
+the string values found anywhere in the event's payload, so error messages,
+message text and artifact text are all searchable without storing a second
+copy of them. Rows are added in the writer transaction that inserts the
+events and removed with FTS5 ``delete`` commands before events are purged;
+both derive the indexed text from the stored payload with the same SQL.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any
+
+from agentmeshd import codec
+
+_CREATE_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+    body, content='', tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+# Every string value in the payload, in document order.
+_TEXT = "(SELECT group_concat(value, ' ') FROM json_tree(events.payload) WHERE type = 'text')"
+
+# Keeps ``IN (...)`` lists well under SQLite's bound-parameter limit.
+_CHUNK = 500
+
+
+def create_table(conn: sqlite3.Connection) -> None:
+    conn.execute(_CREATE_TABLE)
+
+
+def index_range(conn: sqlite3.Connection, first_id: int, last_id: int) -> None:
+    """Index events ``first_id..last_id`` (inclusive), in the caller's transaction."""
+    conn.execute(
+        f"INSERT INTO events_fts (rowid, body) SELECT id, {_TEXT} FROM events "
+        "WHERE id BETWEEN ? AND ?",
+        (first_id, last_id),
+    )
+
+
+def unindex(conn: sqlite3.Connection, ids: list[int]) -> None:
+    """Remove events from the index; call before deleting them from ``events``."""
+    for start in range(0, len(ids), _CHUNK):
+        chunk = ids[start : start + _CHUNK]
+        marks = ", ".join("?" * len(chunk))
+        conn.execute(
+            f"INSERT INTO events_fts (events_fts, rowid, body) "
+            f"SELECT 'delete', id, {_TEXT} FROM events WHERE id IN ({marks})",
+            chunk,
+        )
+
+
+def rebuild(conn: sqlite3.Connection) -> None:
+    """Re-index every event from scratch, in the caller's transaction."""
+    conn.execute("INSERT INTO events_fts (events_fts) VALUES ('delete-all')")
+    conn.execute(f"INSERT INTO events_fts (rowid, body) SELECT id, {_TEXT} FROM events")
+
+
+def literal_query(text: str) -> str:
+    """Turn user text into an FTS5 query that matches its words literally.
+
+    Each whitespace-separated token becomes an FTS5 string, so pasted text
+    such as ``127.0.0.1:8080`` or ``KeyError: 'user-id'`` is searched for
+    as written instead of being parsed as operators, columns or ``-``/``:``.
+    """
+    return " ".join('"' + token.replace('"', '""') + '"' for token in text.split())
+
+
+def search(
+    conn: sqlite3.Connection,
+    query: str,
+    *,
+    columns: str,
+    clauses: list[str],
+    params: list[Any],
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[tuple[Any, ...]], str | None]:
+    """Run ``SELECT id, <columns>`` over events matching an FTS5 ``query``.
+
+    Rows come back best match first (BM25), ties broken by id; ``clauses``
+    are extra filters on ``events``. Pages are keyset-paginated on
+    ``(rank, id)``, so a cursor stays valid while events are appended,
+    although new matches can shift the scores of later pages.
+
+    Raises :class:`ValueError` for a malformed query or cursor.
+    """
+    where = ["events_fts MATCH ?", *clauses]
+    args: list[Any] = [query, *params]
+    if cursor is not None:
+        values = codec.decode_cursor(cursor)
+        if len(values) != 2 or not isinstance(values[0], float | int):
+            raise ValueError("invalid cursor")
+        where.append("(events_fts.rank > ? OR (events_fts.rank = ? AND events.id > ?))")
+        args.extend([values[0], values[0], values[1]])
+
+    sql = (
+        f"SELECT events.id, events_fts.rank, {columns} "
+        "FROM events_fts JOIN events ON events.id = events_fts.rowid "
+        f"WHERE {' AND '.join(where)} ORDER BY events_fts.rank, events.id"
+    )
+    if limit > 0:
+        sql += " LIMIT ?"
+        args.append(limit)
+    try:
+        rows = conn.execute(sql, args).fetchall()
+    except sqlite3.OperationalError as exc:
+        raise ValueError(f"invalid search query: {exc}") from exc
+
+    next_cursor = None
+    if limit > 0 and len(rows) == limit:
+        next_cursor = codec.encode_cursor([rows[-1][1], rows[-1][0]])
+    return [(row[0], *row[2:]) for row in rows], next_cursor
@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import gzip
+import importlib
+import io
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Any
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_SEGMENT_AGE = 24 * 3600.0
+COMPRESSIONS = ("gzip", "zstd", "none")
+
+MANIFEST_NAME = "manifest.json"
+_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+
+
+@dataclass
+class SegmentInfo:
+    """Manifest entry for one JSONL segment.
+
+    ``first_id``/``last_id`` are the SQLite row ids of the first and last event
+    in the segment and ``first_ts``/``last_ts`` their timestamps. The ``last_*``
+    fields are ``None`` while the segment is still being written, and all four
+    are ``None`` for a legacy ``events.jsonl`` adopted as segment 0.
+    ``bytes`` is the size on disk, i.e. compressed once the segment is.
+    """
+
+    segment: int
+    file: str
+    created: float
+    first_id: int | None = None
+    last_id: int | None = None
+    first_ts: str | None = None
+    last_ts: str | None = None
+    events: int = 0
+    bytes: int = 0
+    sealed: bool = False
+    compression: str = "none"
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> SegmentInfo:
+        return SegmentInfo(**data)
+
+    def overlaps(
+        self,
+        *,
+        after_id: int | None = None,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> bool:
+        """Whether the segment may hold events in the given id/time range."""
+        if after_id is not None and self.last_id is not None and self.last_id <= after_id:
+            return False
+        if since is not None and self.last_ts is not None and self.last_ts < since:
+            return False
+        return not (until is not None and self.first_ts is not None and self.first_ts >= until)
+
+
+class SegmentedLog:
+    """Append-only JSONL log split into size- or age-bounded segments.
+
+    Segments live in ``log_dir`` as ``events-000001.jsonl``. Once a segment
+    reaches ``max_bytes`` or is older than ``max_age`` seconds it is sealed and
+    compressed in the background; ``manifest.json`` records each segment's id
+    and time range so readers can skip segments they do not need.
+    """
+
+    def __init__(
+        self,
+        log_dir: Path,
+        *,
+        max_bytes: int = DEFAULT_SEGMENT_BYTES,
+        max_age: float = DEFAULT_SEGMENT_AGE,
+        compression: str = "gzip",
+        legacy_jsonl: Path | None = None,
+    ) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"unknown compression {compression!r}")
+        if compression == "zstd":
+            _zstd()
+        self._dir = log_dir
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        self._compression = compression
+        self._lock = threading.Lock()
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._segments = read_manifest(log_dir)
+        if legacy_jsonl is not None:
+            self._adopt_legacy_jsonl(legacy_jsonl)
+        self._active: IO[bytes] | None = None
+        self._undo: tuple[SegmentInfo, int, int, int | None, str | None] | None = None
+        self._reopen_active()
+
+        self._pending: queue.Queue[SegmentInfo | None] = queue.Queue()
+        self._compressor = threading.Thread(
+            target=self._compress_loop, name="agentmeshd-compress", daemon=True
+        )
+        self._compressor.start()
+        for info in self._segments:
+            if info.sealed and info.compression == "none":
+                self._schedule_compression(info)
+
+    @property
+    def segments(self) -> list[SegmentInfo]:
+        with self._lock:
+            return list(self._segments)
+
+    def write(
+        self,
+        lines: list[str],
+        *,
+        first_id: int,
+        first_ts: str,
+        last_ts: str,
+    ) -> None:
+        """Append lines for consecutive ids starting at ``first_id``, then fsync."""
+        if not lines:
+            return
+        data = "".join(f"{line}\n" for line in lines).encode("utf-8")
+        # Until this write's own position is recorded, an undo cuts nothing.
+        self._undo = None
+        info = self._current_segment()
+        if info is None or self._should_rotate(info):
+            if info is not None:
+                self._seal(info)
+            info = self._start_segment(first_id=first_id, first_ts=first_ts)
+
+        assert self._active is not None
+        self._undo = (info, info.events, info.bytes, info.last_id, info.last_ts)
+        self._active.write(data)
+        self._active.flush()
+        os.fsync(self._active.fileno())
+        info.events += len(lines)
+        info.bytes += len(data)
+        info.last_id = first_id + len(lines) - 1
+        info.last_ts = last_ts
+
+    def undo_write(self) -> None:
+        """Cut the last :meth:`write` back off the active segment.
+
+        Called when the transaction the lines belong to rolls back, so the
+        log never holds events under ids the next batch will reuse. Safe to
+        call whether that write failed partway or before writing anything.
+        """
+        undo, self._undo = self._undo, None
+        if undo is None or self._active is None or self._current_segment() is not undo[0]:
+            return
+        info, info.events, info.bytes, info.last_id, info.last_ts = undo
+        self._active.truncate(info.bytes)
+        os.fsync(self._active.fileno())
+
+    def remove(self, info: SegmentInfo) -> None:
+        """Delete a sealed segment and drop it from the manifest."""
+        if not info.sealed:
+            raise ValueError("cannot remove the active segment")
+        with self._lock:
+            if info not in self._segments:
+                return
+            self._segments.remove(info)
+            self._save_manifest()
+        (self._dir / info.file).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+            with self._lock:
+                self._save_manifest()
+        self._pending.put(None)
+        self._compressor.join()
+
+    def _current_segment(self) -> SegmentInfo | None:
+        if self._active is None:
+            return None
+        return self._segments[-1]
+
+    def _should_rotate(self, info: SegmentInfo) -> bool:
+        if info.bytes >= self._max_bytes:
+            return True
+        return time.time() - info.created >= self._max_age
+
+    def _start_segment(self, *, first_id: int, first_ts: str) -> SegmentInfo:
+        number = self._segments[-1].segment + 1 if self._segments else 1
+        info = SegmentInfo(
+            segment=number,
+            file=f"events-{number:06d}.jsonl",
+            created=time.time(),
+            first_id=first_id,
+            first_ts=first_ts,
+        )
+        self._active = (self._dir / info.file).open("ab")
+        with self._lock:
+            self._segments.append(info)
+            self._save_manifest()
+        return info
+
+    def _seal(self, info: SegmentInfo) -> None:
+        assert self._active is not None
+        self._active.close()
+        self._active = None
+        with self._lock:
+            info.sealed = True
+            self._save_manifest()
+        self._schedule_compression(info)
+
+    def _reopen_active(self) -> None:
+        """Continue the last unsealed segment left by a previous process."""
+        if not self._segments or self._segments[-1].sealed:
+            return
+        info = self._segments[-1]
+        path = self._dir / info.file
+        count = 0
+        last_line = b""
+        if path.exists():
+            with path.open("rb") as f:
+                for line in f:
+                    if line.strip():
+                        count += 1
+                        last_line = line
+        info.events = count
+        info.bytes = path.stat().st_size if path.exists() else 0
+        if count and info.first_id is not None:
+            info.last_id = _line_id(last_line) or info.first_id + count - 1
+            info.last_ts = _line_ts(last_line)
+        self._active = path.open("ab")
+
+    def _adopt_legacy_jsonl(self, legacy: Path) -> None:
+        """Move a pre-segmentation ``events.jsonl`` into the log as segment 0."""
+        if not legacy.exists() or any(s.segment == 0 for s in self._segments):
+            return
+        info = SegmentInfo(
+            segment=0,
+            file="events-000000.jsonl",
+            created=legacy.stat().st_mtime,
+            bytes=legacy.stat().st_size,
+            sealed=True,
+        )
+        os.replace(legacy, self._dir / info.file)
+        with self._lock:
+            self._segments.insert(0, info)
+            self._save_manifest()
+
+    def _schedule_compression(self, info: SegmentInfo) -> None:
+        if self._compression != "none":
+            self._pending.put(info)
+
+    def _compress_loop(self) -> None:
+        while True:
+            info = self._pending.get()
+            if info is None:
+                return
+            self._compress(info)
+
+    def _compress(self, info: SegmentInfo) -> None:
+        src = self._dir / info.file
+        with self._lock:
+            if info not in self._segments or not src.exists():
+                return  # removed by retention before we got to it
+        name = f"{info.file}{_SUFFIXES[self._compression]}"
+        tmp = self._dir / f"{name}.tmp"
+        with src.open("rb") as fin, _open_write(tmp, self._compression) as fout:
+            while chunk := fin.read(1024 * 1024):
+                fout.write(chunk)
+        with tmp.open("rb") as f:
+            os.fsync(f.fileno())
+        with self._lock:
+            if info not in self._segments:
+                tmp.unlink(missing_ok=True)
+                return
+            os.replace(tmp, self._dir / name)
+            info.file = name
+            info.compression = self._compression
+            info.bytes = (self._dir / name).stat().st_size
+            self._save_manifest()
+        src.unlink(missing_ok=True)
+
+    def _save_manifest(self) -> None:
+        """Atomically rewrite the manifest. Caller holds ``self._lock``."""
+        path = self._dir / MANIFEST_NAME
+        tmp = path.with_suffix(".json.tmp")
+        data = {"version": 1, "segments": [asdict(s) for s in self._segments]}
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+def read_manifest(log_dir: Path) -> list[SegmentInfo]:
+    """Load the segment manifest, or an empty list if there is none yet."""
+    path = log_dir / MANIFEST_NAME
+    if not path.exists():
+        return []
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [SegmentInfo.from_dict(s) for s in data.get("segments", [])]
+
+
+def open_segment(log_dir: Path, info: SegmentInfo) -> io.BufferedIOBase:
+    """Open a segment for binary reading, decompressing if needed."""
+    path = log_dir / info.file
+    if info.compression == "gzip":
+        return gzip.open(path, "rb")
+    if info.compression == "zstd":
+        return _zstd().open(path, "rb")
+    return path.open("rb")
+
+
+def decompress(raw: IO[bytes], compression: str) -> io.BufferedIOBase:
+    """Wrap an open compressed segment in a reader; the caller still closes ``raw``."""
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if compression == "zstd":
+        return _zstd().open(raw, "rb", closefd=False)
+    raise ValueError(f"unknown compression {compression!r}")
+
+
+def iter_lines(
+    log_dir: Path,
+    *,
+    after_id: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> Iterator[bytes]:
+    """Yield raw JSONL lines from the segments that may match the range.
+
+    Segments are chosen from the manifest; lines within a chosen segment are
+    not filtered, so callers still check each event.
+    """
+    for info in read_manifest(log_dir):
+        if not info.overlaps(after_id=after_id, since=since, until=until):
+            continue
+        with open_segment(log_dir, info) as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def _open_write(path: Path, compression: str) -> io.BufferedIOBase:
+    if compression == "zstd":
+        return _zstd().open(path, "wb")
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+def _zstd() -> Any:
+    try:
+        return importlib.import_module("zstandard")
+    except ImportError:
+        raise ValueError(
+            "zstd compression requires the 'zstandard' package (pip install 'agentmeshd[zstd]')"
+        ) from None
+
+
+def _line_field(line: bytes, key: str) -> object:
+    try:
+        data: object = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(data, dict):
+        return data.get(key)  # type: ignore[union-attr]
+    return None
+
+
+def _line_ts(line: bytes) -> str | None:
+    ts = _line_field(line, "ts")
+    return ts if isinstance(ts, str) else None
+
+
+def _line_id(line: bytes) -> int | None:
+    row_id = _line_field(line, "id")
+    return row_id if isinstance(row_id, int) else None
@@ -1,60 +1,570 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+from collections.abc import AsyncIterator, Callable
+from datetime import UTC, datetime
 from typing import Any
 
 from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
-from starlette.routing import Route
+from starlette.responses import JSONResponse as _JSONResponse
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.status import WS_1007_INVALID_FRAME_PAYLOAD_DATA
+from starlette.websockets import WebSocket
 
+from agentmeshd import codec
 from agentmeshd.events import SCHEMA_VERSION, EventV1
-from agentmeshd.store import EventStore
+from agentmeshd.pubsub import EventBroker, EventFilter, Subscription
+from agentmeshd.runs import RunSummary
+from agentmeshd.store import EXTRACTED_FIELDS, EventStore, RawEventPage, RawSearchPage
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+SSE_HEARTBEAT = 15.0
+GZIP_MIN_SIZE = 1024
+_REPLAY_PAGE = 1000
+_STREAM_PAGE = 1000
+
+_NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+
+class JSONResponse(_JSONResponse):
+    """``JSONResponse`` rendered with :mod:`agentmeshd.codec`."""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumps_bytes(content)
 
 
 def create_app(store: EventStore) -> Starlette:
-    """Create the Starlette ASGI application with event API routes."""
+    """Create the Starlette ASGI application with event API routes.
+
+    ``EventStore`` is synchronous, so every store call is dispatched to the
+    worker thread pool; handlers never block the event loop on SQLite.
+    Committed events are fanned out to ``/api/events/stream`` subscribers
+    through an :class:`~agentmeshd.pubsub.EventBroker`.
+    """
+    broker = EventBroker()
+    store.add_listener(broker.publish)
 
     async def healthz(_request: Request) -> JSONResponse:
         return JSONResponse({"status": "ok"})
 
-    async def get_events(request: Request) -> JSONResponse:
+    async def get_events(request: Request) -> Response:
         run_id = request.query_params.get("run_id")
         task_id = request.query_params.get("task_id")
         kind = request.query_params.get("kind")
+        team_run_id = request.query_params.get("team_run_id")
+        fields = {
+            f.param: request.query_params[f.param]
+            for f in EXTRACTED_FIELDS
+            if f.param in request.query_params
+        }
+        try:
+            since = _parse_ts(request.query_params.get("since"))
+            until = _parse_ts(request.query_params.get("until"))
+        except ValueError:
+            return JSONResponse({"error": "invalid since/until timestamp"}, status_code=400)
         limit_raw = request.query_params.get("limit", "200")
         try:
             limit = int(limit_raw)
         except ValueError:
             return JSONResponse({"error": "invalid limit"}, status_code=400)
+        after_id_raw = request.query_params.get("after_id")
+        try:
+            after_id = int(after_id_raw) if after_id_raw else None
+        except ValueError:
+            return JSONResponse({"error": "invalid after_id"}, status_code=400)
+
+        # NDJSON streams every matching event (up to ``limit``) page by page.
+        ndjson = _wants_ndjson(request)
+        page_size = limit
+        if ndjson:
+            page_size = min(_STREAM_PAGE, limit) if limit > 0 else _STREAM_PAGE
+
+        headers: dict[str, str] = {}
+        q = request.query_params.get("q")
+        if q:
+            # ``syntax=fts`` opts into FTS5 operators; by default words match literally.
+            syntax = request.query_params.get("syntax", "text")
+            if syntax not in ("text", "fts"):
+                return JSONResponse({"error": "invalid syntax"}, status_code=400)
+
+            # Ranked full-text search; pages continue from an opaque cursor.
+            def search_page(cursor: str | None, size: int) -> RawSearchPage:
+                return store.search_raw_page(
+                    q,
+                    run_id=run_id,
+                    task_id=task_id,
+                    kind=kind,
+                    team_run_id=team_run_id,
+                    since=since,
+                    until=until,
+                    fields=fields,
+                    cursor=cursor,
+                    limit=size,
+                    fts_syntax=syntax == "fts",
+                )
+
+            try:
+                hits = await run_in_threadpool(
+                    search_page, request.query_params.get("cursor"), page_size
+                )
+            except ValueError as exc:
+                return JSONResponse({"error": str(exc)}, status_code=400)
+            if ndjson:
+                return _ndjson_response(search_page, hits, limit)
+            if hits.next_cursor is not None:
+                headers[NEXT_CURSOR_HEADER] = hits.next_cursor
+            return Response(hits.json_array(), media_type="application/json", headers=headers)
 
-        events = store.query(run_id=run_id, task_id=task_id, kind=kind, limit=limit)
-        return JSONResponse([e.to_dict() for e in events])
+        def events_page(after: int | None, size: int) -> RawEventPage:
+            return store.query_raw_page(
+                run_id=run_id,
+                task_id=task_id,
+                kind=kind,
+                team_run_id=team_run_id,
+                since=since,
+                until=until,
+                fields=fields,
+                after_id=after,
+                limit=size,
+            )
+
+        # A finished run's events can be revalidated without querying them.
+        etag: str | None = None
+        if run_id is not None and not ndjson:
+            resolved = await run_in_threadpool(store.resolve, run_id)
+            if resolved is not None and resolved[0] == "run_id":
+                etag = _finished_etag(request, resolved[1])
+            if etag is not None:
+                if _not_modified(request, etag):
+                    return Response(status_code=304, headers={"ETag": etag})
+                headers["ETag"] = etag
+
+        # Stored event JSON goes into the body as is, never decoded.
+        page = await run_in_threadpool(events_page, after_id, page_size)
+        if ndjson:
+            return _ndjson_response(events_page, page, limit)
+        if page.next_cursor is not None:
+            headers[NEXT_CURSOR_HEADER] = str(page.next_cursor)
+        return Response(page.json_array(), media_type="application/json", headers=headers)
+
+    async def get_runs(request: Request) -> JSONResponse:
+        """List run summaries from the ``runs`` table, newest first by default.
+
+        ``sort`` is one of ``first_ts``, ``last_ts`` or ``event_count`` and
+        ``order`` is ``asc`` or ``desc``; ``since``/``until`` bound the run's
+        start. Pages continue from the ``X-Next-Cursor`` value passed back as
+        ``cursor``.
+        """
+        params = request.query_params
+        try:
+            since = _parse_ts(params.get("since"))
+            until = _parse_ts(params.get("until"))
+        except ValueError:
+            return JSONResponse({"error": "invalid since/until timestamp"}, status_code=400)
+        try:
+            limit = int(params.get("limit", "100"))
+        except ValueError:
+            return JSONResponse({"error": "invalid limit"}, status_code=400)
+        order = params.get("order", "desc")
+        if order not in ("asc", "desc"):
+            return JSONResponse({"error": "invalid order"}, status_code=400)
+        final_raw = params.get("final")
+        if final_raw not in (None, "true", "false"):
+            return JSONResponse({"error": "invalid final"}, status_code=400)
+
+        try:
+            page = await run_in_threadpool(
+                store.query_runs,
+                team_run_id=params.get("team_run_id"),
+                agent_url=params.get("agent_url"),
+                state=params.get("state"),
+                final=None if final_raw is None else final_raw == "true",
+                since=since,
+                until=until,
+                sort=params.get("sort", "first_ts"),
+                descending=order == "desc",
+                cursor=params.get("cursor"),
+                limit=limit,
+            )
+        except ValueError as exc:
+            return JSONResponse({"error": str(exc)}, status_code=400)
+        headers: dict[str, str] = {}
+        if page.next_cursor is not None:
+            headers[NEXT_CURSOR_HEADER] = page.next_cursor
+        return JSONResponse([run.to_dict() for run in page.runs], headers=headers)
+
+    async def get_trace(request: Request) -> Response:
+        """Resolve a run, task or team run id and return its runs with their events.
+
+        The body is ``{"id", "match", "run_ids", "runs", "events"}``, where
+        ``events`` holds the stored event JSON spliced in undecoded. All
+        events are returned unless ``limit`` is given, in which case pages
+        continue from ``after_id`` like ``GET /api/events``. Once every run
+        is final the response carries an ``ETag`` and ``If-None-Match``
+        gets a 304 without reading any events.
+        """
+        try:
+            limit = int(request.query_params.get("limit", "0"))
+        except ValueError:
+            return JSONResponse({"error": "invalid limit"}, status_code=400)
+        after_id_raw = request.query_params.get("after_id")
+        try:
+            after_id = int(after_id_raw) if after_id_raw else None
+        except ValueError:
+            return JSONResponse({"error": "invalid after_id"}, status_code=400)
+
+        id: str = request.path_params["id"]
+        resolved = await run_in_threadpool(store.resolve, id)
+        if resolved is None:
+            return JSONResponse({"error": f"unknown id: {id}"}, status_code=404)
+        etag = _finished_etag(request, resolved[1])
+        if etag is not None and _not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        trace = await run_in_threadpool(store.trace_raw, id, after_id=after_id, limit=limit)
+        if trace is None:
+            return JSONResponse({"error": f"unknown id: {id}"}, status_code=404)
+        head = codec.dumps_bytes(
+            {
+                "id": trace.id,
+                "match": trace.match,
+                "run_ids": [run.run_id for run in trace.runs],
+                "runs": [run.to_dict() for run in trace.runs],
+            }
+        )
+        body = b"".join([head[:-1], b',"events":', trace.events.json_array(), b"}"])
+        headers: dict[str, str] = {}
+        if trace.events.next_cursor is not None:
+            headers[NEXT_CURSOR_HEADER] = str(trace.events.next_cursor)
+        if etag is not None:
+            headers["ETag"] = etag
+        return Response(body, media_type="application/json", headers=headers)
 
     async def post_event(request: Request) -> JSONResponse:
         try:
-            body: object = await request.json()
+            body: object = codec.loads(await request.body())
         except json.JSONDecodeError:
             return JSONResponse({"error": "invalid JSON"}, status_code=400)
 
         if not isinstance(body, dict):
             return JSONResponse({"error": "expected JSON object"}, status_code=400)
 
-        data: dict[str, Any] = dict(body)  # type: ignore[arg-type]
-        if not data.get("ts"):
-            from datetime import UTC, datetime
+        try:
+            event = _to_event(body)  # type: ignore[arg-type]
+        except (ValueError, TypeError) as exc:
+            return JSONResponse({"error": str(exc)}, status_code=400)
+        [result] = await run_in_threadpool(store.ingest, [event])
+        # A resent event_id is acknowledged without storing the event again.
+        return JSONResponse(event.to_dict(), status_code=201 if result.created else 200)
+
+    async def post_events_batch(request: Request) -> JSONResponse:
+        """Ingest a JSON array or NDJSON body of events in one commit.
+
+        Responds 201 when every item was accepted, 207 when some items were
+        rejected; ``results`` holds one entry per item, in input order. An
+        item whose ``event_id`` is already stored is accepted as
+        ``"duplicate"`` with the stored event's id and not written again.
+        """
+        raw = await request.body()
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+        items: list[object]
+        if content_type in _NDJSON_TYPES:
+            items = [_parse_line(line) for line in raw.splitlines() if line.strip()]
+        else:
+            try:
+                body: object = codec.loads(raw)
+            except json.JSONDecodeError:
+                return JSONResponse({"error": "invalid JSON"}, status_code=400)
+            if not isinstance(body, list):
+                return JSONResponse({"error": "expected JSON array"}, status_code=400)
+            items = list(body)  # type: ignore[arg-type]
 
-            data["ts"] = datetime.now(UTC).isoformat()
-        if not data.get("schema_version"):
-            data["schema_version"] = SCHEMA_VERSION
-        event = EventV1.from_dict(data)
-        store.append(event)
-        return JSONResponse(event.to_dict(), status_code=201)
+        body = await _ingest_items(store, items)
+        return JSONResponse(body, status_code=207 if body["failed"] else 201)
+
+    async def ingest_stream(websocket: WebSocket) -> None:
+        """Long-lived ingest channel for one run.
+
+        Each text or binary frame is ``{"seq": n, "events": [...]}``; events
+        may leave out ``run_id``, which defaults to the ``run_id`` query
+        parameter. Frames are committed in order and each is answered with
+        ``{"ack": n, "created", "duplicates", "failed"}`` once its events are
+        durable, so a client resends (by ``event_id``) only unacked frames.
+        A malformed frame closes the channel with 1007.
+        """
+        run_id = websocket.query_params.get("run_id")
+        await websocket.accept()
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            frame = _parse_frame(message.get("text") or message.get("bytes") or b"")
+            if frame is None:
+                await websocket.close(code=WS_1007_INVALID_FRAME_PAYLOAD_DATA)
+                return
+            seq, items = frame
+            if run_id:
+                for item in items:
+                    if isinstance(item, dict) and "run_id" not in item:
+                        item["run_id"] = run_id
+            body = await _ingest_items(store, items)
+            await websocket.send_text(
+                codec.dumps(
+                    {
+                        "ack": seq,
+                        "created": body["created"],
+                        "duplicates": body["duplicates"],
+                        "failed": body["failed"],
+                    }
+                )
+            )
+
+    async def stream_events(request: Request) -> Response:
+        """Server-Sent Events tail of committed events.
+
+        Filters are those of ``GET /api/events``. With a ``Last-Event-ID``
+        header (or ``after_id``), stored events after that id are replayed
+        before live ones, so a reconnecting client misses nothing. A
+        subscriber that falls more than the broker's queue size behind is
+        disconnected and resumes from the store on reconnect.
+        """
+        event_filter = EventFilter(
+            run_id=request.query_params.get("run_id"),
+            task_id=request.query_params.get("task_id"),
+            kind=request.query_params.get("kind"),
+            team_run_id=request.query_params.get("team_run_id"),
+        )
+        last_id_raw = request.headers.get("last-event-id") or request.query_params.get("after_id")
+        try:
+            last_id = int(last_id_raw) if last_id_raw else None
+        except ValueError:
+            return JSONResponse({"error": "invalid Last-Event-ID"}, status_code=400)
+
+        # Subscribe before replaying so events committed meanwhile are buffered.
+        subscription = broker.subscribe(event_filter)
+        return StreamingResponse(
+            _sse_stream(store, subscription, last_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     routes = [
         Route("/healthz", healthz, methods=["GET"]),
         Route("/api/events", get_events, methods=["GET"]),
+        Route("/api/events/stream", stream_events, methods=["GET"]),
         Route("/api/events", post_event, methods=["POST"]),
+        Route("/api/events/batch", post_events_batch, methods=["POST"]),
+        WebSocketRoute("/api/events/ingest", ingest_stream),
+        Route("/api/runs", get_runs, methods=["GET"]),
+        Route("/api/trace/{id:path}", get_trace, methods=["GET"]),
+    ]
+
+    # Trace JSON is repetitive; SSE is left uncompressed by GZipMiddleware.
+    middleware = [Middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)]
+    app = Starlette(routes=routes, middleware=middleware)
+    app.state.broker = broker
+    return app
+
+
+async def _sse_stream(
+    store: EventStore, subscription: Subscription, last_id: int | None
+) -> AsyncIterator[str]:
+    f = subscription.filter
+    try:
+        if last_id is not None:
+            while True:
+                page = await run_in_threadpool(
+                    store.query_raw_page,
+                    run_id=f.run_id,
+                    task_id=f.task_id,
+                    kind=f.kind,
+                    team_run_id=f.team_run_id,
+                    after_id=last_id,
+                    limit=_REPLAY_PAGE,
+                )
+                if page.ids:
+                    yield "".join(
+                        _sse_message(i, data) for i, data in zip(page.ids, page.events, strict=True)
+                    )
+                    last_id = page.ids[-1]
+                if page.next_cursor is None:
+                    break
+        while True:
+            try:
+                batch = await asyncio.wait_for(subscription.get(), SSE_HEARTBEAT)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if not batch:  # overflowed or closed
+                return
+            fresh = [e for e in batch if last_id is None or e.id > last_id]
+            if fresh:
+                yield "".join(_sse_message(e.id, e.json) for e in fresh)
+                last_id = fresh[-1].id
+    finally:
+        subscription.close()
+
+
+def _finished_etag(request: Request, summaries: list[RunSummary]) -> str | None:
+    """Return a weak ETag for a response drawn only from finished runs.
+
+    Event ids are never reused, so a run's ``(first_id, last_id,
+    event_count)`` changes whenever an event is added to or purged from it.
+    Hashed with the request URL, that identifies the response content. Runs
+    purged from but not yet refreshed are not final here, so their outdated
+    summaries never produce a tag. The tag is weak because ``GZipMiddleware``
+    may send the same content gzipped or not, and those representations are
+    not byte-for-byte equal.
+    """
+    if not summaries or not all(run.final for run in summaries):
+        return None
+    key = [
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        [[run.run_id, run.first_id, run.last_id, run.event_count] for run in summaries],
     ]
+    return f'W/"{hashlib.blake2b(codec.dumps_bytes(key), digest_size=16).hexdigest()}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _wants_ndjson(request: Request) -> bool:
+    if request.query_params.get("format") == "ndjson":
+        return True
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in _NDJSON_TYPES)
+
+
+def _ndjson_response(
+    fetch: Callable[[Any, int], RawEventPage | RawSearchPage],
+    first: RawEventPage | RawSearchPage,
+    limit: int,
+) -> StreamingResponse:
+    return StreamingResponse(_ndjson_stream(fetch, first, limit), media_type="application/x-ndjson")
+
+
+async def _ndjson_stream(
+    fetch: Callable[[Any, int], RawEventPage | RawSearchPage],
+    page: RawEventPage | RawSearchPage,
+    limit: int,
+) -> AsyncIterator[bytes]:
+    """Yield pages as NDJSON lines, fetching the next page once one is sent.
+
+    Each page is a short keyset query, so memory stays at one page and no
+    read transaction is held open while a slow client drains the stream.
+    """
+    sent = 0
+    while True:
+        if page.events:
+            yield ("\n".join(page.events) + "\n").encode()
+            sent += len(page.events)
+        remaining = limit - sent if limit > 0 else _STREAM_PAGE
+        if page.next_cursor is None or remaining <= 0:
+            return
+        page = await run_in_threadpool(fetch, page.next_cursor, min(_STREAM_PAGE, remaining))
+
+
+def _sse_message(event_id: int, data: str) -> str:
+    return f"id: {event_id}\ndata: {data}\n\n"
+
+
+class _InvalidLine:
+    """Placeholder for an NDJSON line that failed to parse."""
+
+
+def _parse_line(line: bytes) -> object:
+    try:
+        return codec.loads(line)
+    except json.JSONDecodeError:
+        return _InvalidLine()
+
+
+def _parse_frame(data: str | bytes) -> tuple[int, list[object]] | None:
+    """Split an ingest frame into its sequence number and event items."""
+    try:
+        frame: object = codec.loads(data)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(frame, dict):
+        return None
+    seq: object = frame.get("seq")  # type: ignore[union-attr]
+    events: object = frame.get("events")  # type: ignore[union-attr]
+    if not isinstance(seq, int) or not isinstance(events, list):
+        return None
+    return seq, list(events)  # type: ignore[arg-type]
+
+
+async def _ingest_items(store: EventStore, items: list[object]) -> dict[str, Any]:
+    """Store the valid items in one commit and describe the outcome per item."""
+    results: list[dict[str, Any]] = []
+    events: list[EventV1] = []
+    for index, item in enumerate(items):
+        if isinstance(item, _InvalidLine):
+            results.append({"index": index, "status": "error", "error": "invalid JSON"})
+        elif not isinstance(item, dict):
+            results.append({"index": index, "status": "error", "error": "expected JSON object"})
+        else:
+            try:
+                events.append(_to_event(item))  # type: ignore[arg-type]
+            except (ValueError, TypeError) as exc:
+                results.append({"index": index, "status": "error", "error": str(exc)})
+                continue
+            results.append({"index": index, "status": "created"})
+
+    appended = iter(await run_in_threadpool(store.ingest, events))
+    duplicates = 0
+    for result in results:
+        if result["status"] == "created":
+            stored = next(appended)
+            result["id"] = stored.id
+            if not stored.created:
+                result["status"] = "duplicate"
+                duplicates += 1
+
+    return {
+        "created": len(events) - duplicates,
+        "duplicates": duplicates,
+        "failed": len(results) - len(events),
+        "results": results,
+    }
+
+
+def _parse_ts(value: str | None) -> str | None:
+    """Normalize an ISO-8601 query bound to the UTC format events are stored in."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC).isoformat()
+
+
+def _to_event(body: dict[str, Any]) -> EventV1:
+    """Build an event from a request body, filling in ts and schema_version.
 
-    return Starlette(routes=routes)
+    Raises :class:`ValueError` for a ``ts`` that is not a string.
+    """
+    data: dict[str, Any] = dict(body)
+    if not data.get("ts"):
+        data["ts"] = datetime.now(UTC).isoformat()
+    elif not isinstance(data["ts"], str):
+        raise ValueError("ts must be a string")
+    if not data.get("schema_version"):
+        data["schema_version"] = SCHEMA_VERSION
+    return EventV1.from_dict(data)
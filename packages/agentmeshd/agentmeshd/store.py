@@ -1,11 +1,44 @@
 from __future__ import annotations
 
-import json
+import fcntl
+import logging
+import os
+import queue
 import sqlite3
+import threading
+import time
+from collections.abc import Callable, Generator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
+from agentmeshd import codec, runs, search
 from agentmeshd.events import EventV1
+from agentmeshd.runs import RunPage, RunSummary
+from agentmeshd.segments import (
+    DEFAULT_SEGMENT_AGE,
+    DEFAULT_SEGMENT_BYTES,
+    SegmentedLog,
+    SegmentInfo,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMMIT_BATCH = 256
+DEFAULT_COMMIT_DELAY = 0.0
+DEFAULT_READERS = 4
+
+LOCK_NAME = "writer.lock"
+# Writer names recorded in the lock file next to the holder's pid.
+DAEMON_WRITER = "agentmeshd"
+EMBEDDED_WRITER = "agentmesh run"
+REINDEX_WRITER = "reindex"
+VACUUM_WRITER = "vacuum"
+_LOCK_POLL = 0.1
+
+# Keeps ``IN (...)`` lists well under SQLite's bound-parameter limit.
+_ID_CHUNK = 500
 
 _CREATE_TABLE = """
 CREATE TABLE IF NOT EXISTS events (
@@ -18,57 +51,438 @@ CREATE TABLE IF NOT EXISTS events (
     step TEXT,
     payload TEXT NOT NULL,
     metadata TEXT NOT NULL,
-    team_run_id TEXT
+    team_run_id TEXT,
+    raw TEXT,
+    event_id TEXT
 )
 """
 
+# Composite indexes end in ``id`` (or ``ts``) so filtered scans come back in
+# ``ORDER BY id`` order, or bounded by a time window, straight from the index.
 _CREATE_INDEXES = [
-    "CREATE INDEX IF NOT EXISTS idx_events_run_id ON events(run_id)",
-    "CREATE INDEX IF NOT EXISTS idx_events_task_id ON events(task_id)",
-    "CREATE INDEX IF NOT EXISTS idx_events_kind ON events(kind)",
+    "CREATE INDEX IF NOT EXISTS idx_events_run_id_id ON events(run_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_events_task_id_id ON events(task_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_events_team_run_id_id ON events(team_run_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_events_kind_ts ON events(kind, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts)",
+    # Client-generated ids: the store keeps one event per id.
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_events_event_id ON events(event_id) "
+    "WHERE event_id IS NOT NULL",
+]
+
+
+@dataclass(frozen=True)
+class ExtractedField:
+    """A JSON field copied out of ``payload``/``metadata`` into an indexed column.
+
+    ``param`` is the filter name (the ``GET /api/events`` query parameter);
+    the column is a VIRTUAL generated column, so it costs no storage and only
+    its partial index holds values.
+    """
+
+    param: str
+    column: str
+    source: str
+    path: str
+
+    @property
+    def definition(self) -> str:
+        return (
+            f"{self.column} TEXT GENERATED ALWAYS AS "
+            f"(json_extract({self.source}, '{self.path}')) VIRTUAL"
+        )
+
+    @property
+    def index(self) -> str:
+        return (
+            f"CREATE INDEX IF NOT EXISTS idx_events_{self.column}_id "
+            f"ON events({self.column}, id) WHERE {self.column} IS NOT NULL"
+        )
+
+
+EXTRACTED_FIELDS = (
+    ExtractedField("state", "payload_state", "payload", "$.state"),
+    ExtractedField("name", "payload_name", "payload", "$.name"),
+    ExtractedField("agent_url", "meta_agent_url", "metadata", "$.agent_url"),
+    ExtractedField("from", "meta_from", "metadata", "$.from"),
+)
+
+_FIELDS_BY_PARAM = {f.param: f for f in EXTRACTED_FIELDS}
+
+# Single-column indexes superseded by the composite ones above.
+_DROP_INDEXES = [
+    "DROP INDEX IF EXISTS idx_events_run_id",
+    "DROP INDEX IF EXISTS idx_events_task_id",
+    "DROP INDEX IF EXISTS idx_events_kind",
 ]
 
 _INSERT = """
-INSERT INTO events (schema_version, ts, run_id, kind, task_id, step, payload, metadata, team_run_id)
-VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+INSERT INTO events (
+    schema_version, ts, run_id, kind, task_id, step, payload, metadata, team_run_id, raw,
+    event_id
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# ``raw`` holds the event's canonical JSON. Rows written before the column
+# existed have it NULL and are serialized by SQLite instead, in to_dict() order.
+_RAW_JSON = """coalesce(raw, json_object(
+    'schema_version', schema_version, 'ts', ts, 'run_id', run_id, 'kind', kind,
+    'task_id', task_id, 'step', step, 'payload', json(payload),
+    'metadata', json(metadata), 'team_run_id', team_run_id
+))"""
+
+_EVENT_COLUMNS = (
+    "schema_version, ts, run_id, kind, task_id, step, payload, metadata, team_run_id, event_id"
+)
+
+# With AUTOINCREMENT and the write lock held, a batch gets consecutive ids from here.
+_NEXT_ID = """
+SELECT max(
+    coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'events'), 0),
+    coalesce((SELECT max(id) FROM events), 0)
+) + 1
 """
 
 
+def create_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(_CREATE_TABLE)
+    # table_xinfo, unlike table_info, lists generated columns.
+    columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(events)")}
+    for f in EXTRACTED_FIELDS:
+        if f.column not in columns:
+            conn.execute(f"ALTER TABLE events ADD COLUMN {f.definition}")
+    runs.create_tables(conn)
+    search.create_table(conn)
+
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """Create the ``events`` and ``runs`` indexes; also used by reindex after a bulk load."""
+    for idx in _CREATE_INDEXES:
+        conn.execute(idx)
+    for f in EXTRACTED_FIELDS:
+        conn.execute(f.index)
+    runs.create_indexes(conn)
+
+
+def rebuild_derived(conn: sqlite3.Connection) -> None:
+    """Recompute the run summaries, id index and full-text index from ``events``."""
+    runs.rebuild_runs(conn)
+    search.rebuild(conn)
+
+
+def _stored_event_ids(conn: sqlite3.Connection, events: list[EventV1]) -> dict[str, int]:
+    """Map the ``event_id`` of each event already in ``events`` to its row id."""
+    event_ids = list({e.event_id for e in events if e.event_id is not None})
+    stored: dict[str, int] = {}
+    for start in range(0, len(event_ids), _ID_CHUNK):
+        chunk = event_ids[start : start + _ID_CHUNK]
+        marks = ", ".join("?" * len(chunk))
+        sql = f"SELECT event_id, id FROM events WHERE event_id IN ({marks})"
+        stored.update(conn.execute(sql, chunk).fetchall())
+    return stored
+
+
+def drop_duplicate_events(conn: sqlite3.Connection) -> int:
+    """Delete all but the first event for each ``event_id``; return the count.
+
+    A crash between the JSONL write and the SQLite commit can leave an event
+    in the log that a client then resends, so a rebuild from the log runs
+    this before creating the unique index.
+    """
+    cursor = conn.execute(
+        "DELETE FROM events WHERE event_id IS NOT NULL AND id NOT IN "
+        "(SELECT min(id) FROM events WHERE event_id IS NOT NULL GROUP BY event_id)"
+    )
+    return cursor.rowcount
+
+
+class StoreLockedError(RuntimeError):
+    """Another process is writing to the data directory."""
+
+    def __init__(self, data_dir: Path, pid: int | None, writer: str | None) -> None:
+        holder = f"pid {pid if pid is not None else '?'}"
+        if writer:
+            holder += f", {writer}"
+        super().__init__(f"store in {data_dir} is locked by {holder}")
+        self.pid = pid
+        self.writer = writer
+
+
+@contextmanager
+def writer_lock(
+    data_dir: Path, *, timeout: float | None = 0.0, writer: str = REINDEX_WRITER
+) -> Generator[None]:
+    """Hold the data directory's exclusive writer lock.
+
+    The log and ``events.db`` take one writer at a time, whether that is the
+    daemon, an embedded CLI store or a reindex; any number of processes may
+    read. Waits up to ``timeout`` seconds (``None``: indefinitely) for the
+    current writer, whose pid and ``writer`` name are kept in the lock file,
+    then raises :class:`StoreLockedError`.
+    """
+    f = _acquire_lock(data_dir, timeout, writer)
+    try:
+        yield
+    finally:
+        f.close()
+
+
+def _acquire_lock(data_dir: Path, timeout: float | None, writer: str) -> IO[str]:
+    f = (data_dir / LOCK_NAME).open("a+", encoding="utf-8")
+    deadline = None if timeout is None else time.monotonic() + timeout
+    waiting = False
+    while True:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            f.seek(0)
+            pid, holder = _lock_holder(f.read())
+            if deadline is not None and time.monotonic() >= deadline:
+                f.close()
+                raise StoreLockedError(data_dir, pid, holder) from None
+            if not waiting:
+                logger.info("waiting for pid %s (%s) to release %s", pid, holder, data_dir)
+                waiting = True
+            time.sleep(_LOCK_POLL)
+    f.seek(0)
+    f.truncate()
+    f.write(f"{os.getpid()} {writer}\n")
+    f.flush()
+    return f
+
+
+def _lock_holder(content: str) -> tuple[int | None, str | None]:
+    pid, _, writer = content.strip().partition(" ")
+    try:
+        return int(pid), writer or None
+    except ValueError:
+        return None, None
+
+
+def log_line(row_id: int, raw: str) -> str:
+    """The JSONL log line for an event: its canonical JSON led by the row id.
+
+    ``reindex`` restores rows under these ids, so ids survive gaps left by
+    purges, rolled-back batches and unparsable lines.
+    """
+    return f'{{"id":{row_id},{raw[1:]}'
+
+
+# Position of the canonical JSON in an ``event_to_row`` tuple.
+_RAW_INDEX = 9
+
+
+def event_to_row(event: EventV1) -> tuple[Any, ...]:
+    """Column values for ``_INSERT``, in order."""
+    return (
+        event.schema_version,
+        event.ts,
+        event.run_id,
+        event.kind,
+        event.task_id,
+        event.step,
+        codec.dumps(event.payload),
+        codec.dumps(event.metadata),
+        event.team_run_id,
+        event.to_json(),
+        event.event_id,
+    )
+
+
+@dataclass(frozen=True)
+class AppendResult:
+    """Where an appended event is stored; ``created`` is false for a duplicate."""
+
+    id: int
+    created: bool
+
+
+@dataclass(frozen=True)
+class StoredEvent:
+    """A committed event with its row id and canonical JSON."""
+
+    id: int
+    event: EventV1
+    json: str
+
+
+@dataclass(frozen=True)
+class EventPage:
+    """One page of a keyset-paginated query."""
+
+    events: list[EventV1]
+    next_cursor: int | None
+
+
+@dataclass(frozen=True)
+class RawEventPage:
+    """A page of events as their stored JSON documents, one string per event."""
+
+    events: list[str]
+    next_cursor: int | None
+    ids: list[int] = field(default_factory=lambda: list[int]())
+
+    def json_array(self) -> bytes:
+        """The page as a UTF-8 JSON array, built without decoding any event."""
+        return f"[{','.join(self.events)}]".encode()
+
+
+@dataclass(frozen=True)
+class RawSearchPage:
+    """A page of full-text search hits as stored JSON, best match first."""
+
+    events: list[str]
+    next_cursor: str | None
+    ids: list[int] = field(default_factory=lambda: list[int]())
+
+    def json_array(self) -> bytes:
+        return f"[{','.join(self.events)}]".encode()
+
+
+@dataclass(frozen=True)
+class RunTrace:
+    """The runs an id resolved to and their events, as stored JSON.
+
+    ``match`` is the event column the id was found in: ``run_id``,
+    ``task_id`` or ``team_run_id``.
+    """
+
+    id: str
+    match: str
+    runs: list[RunSummary]
+    events: RawEventPage
+
+
+@dataclass
+class _WriterJob:
+    """Maintenance work run on the writer thread, between commits."""
+
+    fn: Callable[[sqlite3.Connection], Any]
+    done: threading.Event = field(default_factory=threading.Event)
+    error: BaseException | None = None
+    result: Any = None
+
+
+@dataclass
+class _PendingWrite:
+    """Events submitted by one caller, waiting for the writer to make them durable."""
+
+    events: list[EventV1]
+    done: threading.Event = field(default_factory=threading.Event)
+    error: BaseException | None = None
+    ids: list[int] = field(default_factory=lambda: list[int]())
+    created: list[bool] = field(default_factory=lambda: list[bool]())
+
+
 class EventStore:
-    """Dual-write event store: append-only JSONL + SQLite index."""
+    """Dual-write event store: append-only segmented JSONL + SQLite index.
+
+    The JSONL side is a :class:`~agentmeshd.segments.SegmentedLog` in
+    ``<data_dir>/log``: segments rotate at ``segment_bytes`` or
+    ``segment_age`` seconds and are compressed with ``compression`` once sealed.
+
+    Writes go through a single writer thread that group-commits: appends that
+    arrive while a commit is in flight are gathered into the next batch, which
+    costs one JSONL flush + fsync and one SQLite transaction. ``max_batch`` caps
+    the number of events per commit; ``max_delay`` (seconds) lets the writer
+    wait briefly for more appends before committing a batch.
 
-    def __init__(self, data_dir: Path) -> None:
+    The database runs in WAL mode: the writer thread owns the only read-write
+    connection, and queries check out one of at most ``readers`` read-only
+    connections, so they run in parallel with each other and with ingestion.
+
+    Only one process may write to ``data_dir`` at a time: the store holds its
+    :func:`writer_lock` until closed, recorded under the ``writer`` name, and
+    waits up to ``lock_timeout`` seconds (``None``: indefinitely) for another
+    writer to close first.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        *,
+        max_batch: int = DEFAULT_COMMIT_BATCH,
+        max_delay: float = DEFAULT_COMMIT_DELAY,
+        readers: int = DEFAULT_READERS,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        segment_age: float = DEFAULT_SEGMENT_AGE,
+        compression: str = "gzip",
+        lock_timeout: float | None = 0.0,
+        writer: str = DAEMON_WRITER,
+    ) -> None:
         self._data_dir = data_dir
-        self._jsonl_path = data_dir / "events.jsonl"
+        self._log_dir = data_dir / "log"
         self._db_path = data_dir / "events.db"
-        self._conn: sqlite3.Connection | None = None
+        self._max_batch = max(1, max_batch)
+        self._max_delay = max(0.0, max_delay)
+        self._max_readers = max(1, readers)
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._readers_created = 0
+        self._readers_lock = threading.Lock()
         self._ensure_dir()
+        self._lock_file = _acquire_lock(data_dir, lock_timeout, writer)
+        self._conn = self._open_writer()
         self._init_db()
-
-    def append(self, event: EventV1) -> None:
-        """Append an event to both JSONL and SQLite."""
-        # JSONL
-        with self._jsonl_path.open("a", encoding="utf-8") as f:
-            f.write(event.to_json())
-            f.write("\n")
-
-        # SQLite
-        conn = self._get_conn()
-        conn.execute(
-            _INSERT,
-            (
-                event.schema_version,
-                event.ts,
-                event.run_id,
-                event.kind,
-                event.task_id,
-                event.step,
-                json.dumps(event.payload, ensure_ascii=False),
-                json.dumps(event.metadata, ensure_ascii=False),
-                event.team_run_id,
-            ),
+        self._log = SegmentedLog(
+            self._log_dir,
+            max_bytes=segment_bytes,
+            max_age=segment_age,
+            compression=compression,
+            legacy_jsonl=data_dir / "events.jsonl",
         )
-        conn.commit()
+        self._queue: queue.Queue[_PendingWrite | _WriterJob | None] = queue.Queue()
+        self._listeners: list[Callable[[list[StoredEvent]], None]] = []
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="agentmeshd-writer", daemon=True
+        )
+        self._writer.start()
+
+    def add_listener(self, listener: Callable[[list[StoredEvent]], None]) -> None:
+        """Call ``listener`` with every committed batch, on the writer thread.
+
+        Listeners run after the commit and must return quickly; exceptions
+        are logged and do not affect the write.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[list[StoredEvent]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def append(self, event: EventV1) -> int:
+        """Append an event to both JSONL and SQLite and return its row id.
+
+        Blocks until the batch holding the event has been flushed to JSONL and
+        committed to SQLite.
+        """
+        return self.append_many([event])[0]
+
+    def append_many(self, events: list[EventV1]) -> list[int]:
+        """Append several events in one commit and return their row ids, in order.
+
+        An event whose ``event_id`` is already stored is not written again;
+        its entry is the id of the stored event.
+        """
+        return [result.id for result in self.ingest(events)]
+
+    def ingest(self, events: list[EventV1]) -> list[AppendResult]:
+        """Like :meth:`append_many`, also reporting which events were new."""
+        if self._closed:
+            raise RuntimeError("EventStore is closed")
+        if not events:
+            return []
+        pending = _PendingWrite(list(events))
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return [
+            AppendResult(id, created)
+            for id, created in zip(pending.ids, pending.created, strict=True)
+        ]
 
     def query(
         self,
@@ -76,52 +490,644 @@ class EventStore:
         run_id: str | None = None,
         task_id: str | None = None,
         kind: str | None = None,
+        team_run_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        fields: Mapping[str, str] | None = None,
+        after_id: int | None = None,
         limit: int = 200,
     ) -> list[EventV1]:
         """Query events from SQLite with optional filters."""
+        return self.query_page(
+            run_id=run_id,
+            task_id=task_id,
+            kind=kind,
+            team_run_id=team_run_id,
+            since=since,
+            until=until,
+            fields=fields,
+            after_id=after_id,
+            limit=limit,
+        ).events
+
+    def query_page(
+        self,
+        *,
+        run_id: str | None = None,
+        task_id: str | None = None,
+        kind: str | None = None,
+        team_run_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        fields: Mapping[str, str] | None = None,
+        after_id: int | None = None,
+        limit: int = 200,
+    ) -> EventPage:
+        """Query one page of events ordered by id, starting after ``after_id``.
+
+        Pages are located with ``WHERE id > ?`` on the primary key, so every
+        page costs the same regardless of how deep into the result set it is.
+        ``next_cursor`` is set when the page is full and more rows may follow.
+
+        ``since`` (inclusive) and ``until`` (exclusive) bound ``ts``; they are
+        compared as ISO-8601 strings, like the stored timestamps. ``fields``
+        maps :data:`EXTRACTED_FIELDS` names (``state``, ``name``, ``agent_url``,
+        ``from``) to required values and is answered from their indexes;
+        unknown names raise :class:`ValueError`.
+        """
+        rows, next_cursor = self._select(
+            _EVENT_COLUMNS,
+            run_id=run_id,
+            task_id=task_id,
+            kind=kind,
+            team_run_id=team_run_id,
+            since=since,
+            until=until,
+            fields=fields,
+            after_id=after_id,
+            limit=limit,
+        )
+        return EventPage(
+            events=[self._row_to_event(row[1:]) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    def query_raw_page(
+        self,
+        *,
+        run_id: str | None = None,
+        task_id: str | None = None,
+        kind: str | None = None,
+        team_run_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        fields: Mapping[str, str] | None = None,
+        after_id: int | None = None,
+        limit: int = 200,
+    ) -> RawEventPage:
+        """Like :meth:`query_page`, but return each event's stored JSON as is.
+
+        No event objects are built, which makes this the cheap path for
+        handing query results straight to an HTTP response.
+        """
+        rows, next_cursor = self._select(
+            _RAW_JSON,
+            run_id=run_id,
+            task_id=task_id,
+            kind=kind,
+            team_run_id=team_run_id,
+            since=since,
+            until=until,
+            fields=fields,
+            after_id=after_id,
+            limit=limit,
+        )
+        return RawEventPage(
+            events=[row[1] for row in rows],
+            next_cursor=next_cursor,
+            ids=[row[0] for row in rows],
+        )
+
+    def search_raw_page(
+        self,
+        query: str,
+        *,
+        run_id: str | None = None,
+        task_id: str | None = None,
+        kind: str | None = None,
+        team_run_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        fields: Mapping[str, str] | None = None,
+        cursor: str | None = None,
+        limit: int = 200,
+        fts_syntax: bool = False,
+    ) -> RawSearchPage:
+        """Full-text search over payload text, ranked by relevance.
+
+        ``query`` matches events containing all of its words, taken literally;
+        with ``fts_syntax`` it is an FTS5 query instead (``"phrases"``,
+        ``AND``/``OR``/``NOT``, ``prefix*``). The other filters are those of
+        :meth:`query_page`. Pass ``next_cursor`` back as ``cursor`` for the
+        next page. Raises :class:`ValueError` for a malformed query or cursor.
+        """
+        clauses, params = self._filters(
+            run_id=run_id,
+            task_id=task_id,
+            kind=kind,
+            team_run_id=team_run_id,
+            since=since,
+            until=until,
+            fields=fields,
+            after_id=None,
+        )
+        with self._reader() as conn:
+            rows, next_cursor = search.search(
+                conn,
+                query if fts_syntax else search.literal_query(query),
+                columns=_RAW_JSON,
+                clauses=clauses,
+                params=params,
+                cursor=cursor,
+                limit=limit,
+            )
+        return RawSearchPage(
+            events=[row[1] for row in rows],
+            next_cursor=next_cursor,
+            ids=[row[0] for row in rows],
+        )
+
+    def query_runs(
+        self,
+        *,
+        team_run_id: str | None = None,
+        agent_url: str | None = None,
+        state: str | None = None,
+        final: bool | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        sort: str = "first_ts",
+        descending: bool = True,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> RunPage:
+        """Query one page of run summaries; see :func:`agentmeshd.runs.query_runs`.
+
+        Summaries are maintained at append time, so this is an indexed read of
+        the ``runs`` table and never touches ``events``.
+        """
+        with self._reader() as conn:
+            return runs.query_runs(
+                conn,
+                team_run_id=team_run_id,
+                agent_url=agent_url,
+                state=state,
+                final=final,
+                since=since,
+                until=until,
+                sort=sort,
+                descending=descending,
+                cursor=cursor,
+                limit=limit,
+            )
+
+    def resolve(self, id: str) -> tuple[str, list[RunSummary]] | None:
+        """Return how ``id`` matched (``run_id``, ``task_id`` or ``team_run_id``) and its runs.
+
+        A run purged from but not yet refreshed (see :meth:`refresh_runs`)
+        is reported as not final: its summary no longer describes its events.
+        """
+        with self._reader() as conn:
+            resolved = self._resolve(conn, id)
+            if resolved is None:
+                return None
+            match, summaries = resolved
+            stale = runs.stale_run_ids(conn, [summary.run_id for summary in summaries])
+        if stale:
+            summaries = [
+                replace(summary, final=False) if summary.run_id in stale else summary
+                for summary in summaries
+            ]
+        return match, summaries
+
+    @staticmethod
+    def _resolve(conn: sqlite3.Connection, id: str) -> tuple[str, list[RunSummary]] | None:
+        resolved = runs.resolve_id(conn, id)
+        if resolved is None:
+            return None
+        match, run_ids = resolved
+        return match, runs.get_runs(conn, run_ids)
+
+    def trace_raw(self, id: str, *, after_id: int | None = None, limit: int = 0) -> RunTrace | None:
+        """Resolve a run, task or team run id and return every event of its runs.
+
+        The id is looked up in the ``run_ids`` table, so a task id costs the
+        same single index probe as a run id. Events come back in id order,
+        ``limit`` at a time when positive; ``None`` means the id is unknown.
+        """
+        with self._reader() as conn:
+            resolved = self._resolve(conn, id)
+            if resolved is None:
+                return None
+            match, summaries = resolved
+            run_ids = [summary.run_id for summary in summaries]
+            if match == "team_run_id":
+                clauses = ["team_run_id = ?"]
+                params: list[Any] = [id]
+            else:
+                clauses = [f"run_id IN ({', '.join('?' * len(run_ids))})"]
+                params = list(run_ids)
+            if after_id is not None:
+                clauses.append("id > ?")
+                params.append(after_id)
+            sql = f"SELECT id, {_RAW_JSON} FROM events WHERE {' AND '.join(clauses)} ORDER BY id"
+            if limit > 0:
+                sql += " LIMIT ?"
+                params.append(limit)
+            rows = conn.execute(sql, params).fetchall()
+        next_cursor = rows[-1][0] if limit > 0 and len(rows) == limit else None
+        page = RawEventPage(
+            events=[row[1] for row in rows],
+            next_cursor=next_cursor,
+            ids=[row[0] for row in rows],
+        )
+        return RunTrace(id=id, match=match, runs=summaries, events=page)
+
+    def purge(
+        self,
+        *,
+        before: str | None = None,
+        kind: str | None = None,
+        upto_id: int | None = None,
+        limit: int = 1000,
+    ) -> int:
+        """Delete at most ``limit`` of the oldest matching events; return the count.
+
+        Each call is one short transaction on the writer thread, followed by an
+        incremental vacuum step, so callers purge large ranges in chunks without
+        holding the write lock for long. The summaries of the runs the events
+        belonged to are only marked stale; call :meth:`refresh_runs` once the
+        chunks are done.
+        """
         clauses: list[str] = []
         params: list[Any] = []
-
-        if run_id is not None:
-            clauses.append("run_id = ?")
-            params.append(run_id)
-        if task_id is not None:
-            clauses.append("task_id = ?")
-            params.append(task_id)
+        if before is not None:
+            clauses.append("ts < ?")
+            params.append(before)
         if kind is not None:
             clauses.append("kind = ?")
             params.append(kind)
+        if upto_id is not None:
+            clauses.append("id <= ?")
+            params.append(upto_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        select = f"SELECT id FROM events{where} ORDER BY id LIMIT ?"
+        params.append(limit)
+
+        def job(conn: sqlite3.Connection) -> int:
+            with conn:
+                ids = [row[0] for row in conn.execute(select, params)]
+                self._delete_ids(conn, ids)
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+            return len(ids)
+
+        return self._run_in_writer(job)
+
+    def refresh_runs(self) -> int:
+        """Recompute the run summaries left stale by :meth:`purge`; return how many.
+
+        Each run is rebuilt in its own writer transaction, so ingestion
+        interleaves with a large refresh as it does with a purge.
+        """
+        refreshed = 0
+        while n := self._run_in_writer(self._rebuild_stale_run):
+            refreshed += n
+        return refreshed
+
+    @staticmethod
+    def _rebuild_stale_run(conn: sqlite3.Connection) -> int:
+        with conn:
+            return runs.rebuild_stale(conn, limit=1)
+
+    def db_bytes(self) -> int:
+        """Size of the SQLite database in use (pages in the main file, excluding free pages)."""
+        with self._reader() as conn:
+            page_size: int = conn.execute("PRAGMA page_size").fetchone()[0]
+            pages: int = conn.execute("PRAGMA page_count").fetchone()[0]
+            free: int = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - free) * page_size
+
+    def log_segments(self) -> list[SegmentInfo]:
+        """Manifest entries for the JSONL log, oldest first."""
+        return self._log.segments
+
+    def drop_segment(self, info: SegmentInfo) -> None:
+        """Delete a sealed JSONL segment (retention)."""
+        self._run_in_writer(lambda _conn: self._log.remove(info))
+
+    def incremental_vacuum_enabled(self) -> bool:
+        # Asked on the writer: pooled readers can report a stale header value.
+        def job(conn: sqlite3.Connection) -> bool:
+            return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+        return self._run_in_writer(job)
 
+    def enable_incremental_vacuum(self) -> None:
+        """Switch an existing database to ``auto_vacuum=incremental``.
+
+        This rewrites the whole file with ``VACUUM`` once, holding the writer
+        for as long as that takes, so it is only run offline (``agentmeshd
+        vacuum``); new and reindexed databases are created in incremental mode.
+        """
+
+        def job(conn: sqlite3.Connection) -> None:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+
+        self._run_in_writer(job)
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._writer.join()
+            self._log.close()
+            self._conn.close()
+            self._lock_file.close()
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    def _select(
+        self,
+        columns: str,
+        *,
+        run_id: str | None,
+        task_id: str | None,
+        kind: str | None,
+        team_run_id: str | None,
+        since: str | None,
+        until: str | None,
+        fields: Mapping[str, str] | None,
+        after_id: int | None,
+        limit: int,
+    ) -> tuple[list[tuple[Any, ...]], int | None]:
+        """Run a filtered ``SELECT id, <columns>`` and return rows plus the next cursor."""
+        clauses, params = self._filters(
+            run_id=run_id,
+            task_id=task_id,
+            kind=kind,
+            team_run_id=team_run_id,
+            since=since,
+            until=until,
+            fields=fields,
+            after_id=after_id,
+        )
         where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
-        sql = f"SELECT schema_version, ts, run_id, kind, task_id, step, payload, metadata, team_run_id FROM events{where} ORDER BY id"  # noqa: E501
+        sql = f"SELECT id, {columns} FROM events{where} ORDER BY id"
 
         if limit > 0:
             sql += " LIMIT ?"
             params.append(limit)
 
-        conn = self._get_conn()
-        rows = conn.execute(sql, params).fetchall()
-        return [self._row_to_event(row) for row in rows]
+        with self._reader() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        next_cursor = rows[-1][0] if limit > 0 and len(rows) == limit else None
+        return rows, next_cursor
 
-    def close(self) -> None:
-        if self._conn is not None:
-            self._conn.close()
-            self._conn = None
+    @staticmethod
+    def _filters(
+        *,
+        run_id: str | None,
+        task_id: str | None,
+        kind: str | None,
+        team_run_id: str | None,
+        since: str | None,
+        until: str | None,
+        fields: Mapping[str, str] | None,
+        after_id: int | None,
+    ) -> tuple[list[str], list[Any]]:
+        """``WHERE`` clauses and parameters for the shared event filters."""
+        clauses: list[str] = []
+        params: list[Any] = []
+
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        if task_id is not None:
+            clauses.append("task_id = ?")
+            params.append(task_id)
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if team_run_id is not None:
+            clauses.append("team_run_id = ?")
+            params.append(team_run_id)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        for param, value in (fields or {}).items():
+            extracted = _FIELDS_BY_PARAM.get(param)
+            if extracted is None:
+                raise ValueError(f"unknown field: {param}")
+            clauses.append(f"{extracted.column} = ?")
+            params.append(value)
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        return clauses, params
 
     def _ensure_dir(self) -> None:
         self._data_dir.mkdir(parents=True, exist_ok=True)
 
+    def _open_writer(self) -> sqlite3.Connection:
+        # Created here, then used exclusively by the writer thread.
+        conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
+        # Only takes effect for a new database; see enable_incremental_vacuum().
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
     def _init_db(self) -> None:
-        conn = self._get_conn()
-        conn.execute(_CREATE_TABLE)
-        for idx in _CREATE_INDEXES:
-            conn.execute(idx)
+        conn = self._conn
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        create_tables(conn)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+        for column in ("raw", "event_id"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE events ADD COLUMN {column} TEXT")
+        for stmt in _DROP_INDEXES:
+            conn.execute(stmt)
+        create_indexes(conn)
+        # Databases written before these tables existed are backfilled once.
+        if not {"runs", "run_ids"} <= existing:
+            runs.rebuild_runs(conn)
+        else:
+            # Runs left stale by a retention pass that was cut short.
+            runs.rebuild_stale(conn)
+        if "events_fts" not in existing:
+            logger.info("building the full-text index")
+            search.rebuild(conn)
         conn.commit()
 
-    def _get_conn(self) -> sqlite3.Connection:
-        if self._conn is None:
-            self._conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
-        return self._conn
+    @contextmanager
+    def _reader(self) -> Generator[sqlite3.Connection]:
+        """Check out a read-only connection, waiting if the pool is exhausted."""
+        conn: sqlite3.Connection | None = None
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._readers_lock:
+                if self._readers_created < self._max_readers:
+                    self._readers_created += 1
+                    conn = self._open_reader()
+            if conn is None:
+                conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def _open_reader(self) -> sqlite3.Connection:
+        uri = f"{self._db_path.resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _run_in_writer(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        if self._closed:
+            raise RuntimeError("EventStore is closed")
+        job = _WriterJob(fn)
+        self._queue.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _writer_loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            if isinstance(first, _WriterJob):
+                self._run_job(first)
+                continue
+            batch = [first]
+            size = len(first.events)
+            stop = False
+            job: _WriterJob | None = None
+            deadline = time.monotonic() + self._max_delay
+            while size < self._max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, _WriterJob):
+                    job = item
+                    break
+                batch.append(item)
+                size += len(item.events)
+            self._commit(batch)
+            if job is not None:
+                self._run_job(job)
+            if stop:
+                return
+
+    def _run_job(self, job: _WriterJob) -> None:
+        try:
+            job.result = job.fn(self._conn)
+        except Exception as exc:
+            job.error = exc
+        finally:
+            job.done.set()
+
+    @staticmethod
+    def _delete_ids(conn: sqlite3.Connection, ids: list[int]) -> None:
+        """Delete events by id inside the caller's transaction.
+
+        They are dropped from the full-text index, and the runs they belonged
+        to are marked stale rather than recomputed: rebuilding a long run per
+        chunk would make a purge quadratic in the run's length.
+        """
+        run_ids: set[str] = set()
+        for start in range(0, len(ids), _ID_CHUNK):
+            chunk = ids[start : start + _ID_CHUNK]
+            marks = ", ".join("?" * len(chunk))
+            sql = f"SELECT DISTINCT run_id FROM events WHERE id IN ({marks})"
+            run_ids.update(row[0] for row in conn.execute(sql, chunk))
+        search.unindex(conn, ids)
+        conn.executemany("DELETE FROM events WHERE id = ?", [(i,) for i in ids])
+        runs.mark_stale(conn, run_ids)
+
+    def _commit(self, batch: list[_PendingWrite]) -> None:
+        events = [event for pending in batch for event in pending.events]
+        conn = self._conn
+        try:
+            # Take the write lock first so the ids are known before the JSONL
+            # write; JSONL goes first as it is the source of truth the SQLite
+            # index is built from.
+            conn.execute("BEGIN IMMEDIATE")
+            logged = False
+            try:
+                first_id: int = conn.execute(_NEXT_ID).fetchone()[0]
+                # Events whose event_id is already stored, or repeated within
+                # the batch, are retries: they take the stored id and are not
+                # written again, so new events still get consecutive ids.
+                seen = _stored_event_ids(conn, events)
+                fresh: list[EventV1] = []
+                ids: list[int] = []
+                created: list[bool] = []
+                for event in events:
+                    if event.event_id is not None and event.event_id in seen:
+                        ids.append(seen[event.event_id])
+                        created.append(False)
+                        continue
+                    row_id = first_id + len(fresh)
+                    if event.event_id is not None:
+                        seen[event.event_id] = row_id
+                    fresh.append(event)
+                    ids.append(row_id)
+                    created.append(True)
+                rows = [event_to_row(e) for e in fresh]
+                if fresh:
+                    # Set first: a write that fails partway must still be cut off.
+                    logged = True
+                    self._log.write(
+                        [log_line(first_id + i, row[_RAW_INDEX]) for i, row in enumerate(rows)],
+                        first_id=first_id,
+                        first_ts=fresh[0].ts,
+                        last_ts=fresh[-1].ts,
+                    )
+                    conn.executemany(_INSERT, rows)
+                    runs.update_runs(conn, enumerate(fresh, start=first_id))
+                    search.index_range(conn, first_id, first_id + len(fresh) - 1)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                if logged:
+                    self._log.undo_write()
+                raise
+            start = 0
+            for pending in batch:
+                end = start + len(pending.events)
+                pending.ids = ids[start:end]
+                pending.created = created[start:end]
+                start = end
+        except Exception as exc:
+            for pending in batch:
+                pending.error = exc
+            return
+        finally:
+            for pending in batch:
+                pending.done.set()
+        if fresh:
+            self._notify(
+                [
+                    StoredEvent(first_id + i, e, row[_RAW_INDEX])
+                    for i, (e, row) in enumerate(zip(fresh, rows, strict=True))
+                ]
+            )
+
+    def _notify(self, stored: list[StoredEvent]) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(stored)
+            except Exception:
+                logger.exception("event listener failed")
 
     @staticmethod
     def _row_to_event(row: tuple[Any, ...]) -> EventV1:
@@ -132,7 +1138,8 @@ class EventStore:
             kind=row[3],
             task_id=row[4],
             step=row[5],
-            payload=json.loads(row[6]),
-            metadata=json.loads(row[7]),
+            payload=codec.loads(row[6]),
+            metadata=codec.loads(row[7]),
             team_run_id=row[8],
+            event_id=row[9],
         )
@@ -0,0 +1,89 @@
+"""Serialization cost of events with the stdlib vs the active codec backend.
+
+Usage: python benchmarks/bench_codec.py [--events 50000]
+
+"stdlib" is the encoding agentmeshd used before ``agentmeshd.codec``:
+``json.dumps(..., ensure_ascii=False)`` and ``json.loads``. The codec column
+uses whichever backend is active (orjson when installed, see
+``AGENTMESH_JSON``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from agentmeshd import codec
+from agentmeshd.events import EventV1, make_event
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = [
+        make_event(
+            run_id="bench",
+            kind="tool",
+            payload={"name": "exec", "args": {"cmd": "ls -la", "i": i}, "text": "résumé " * 20},
+            metadata={"agent": "bench", "tokens": i % 97, "cost": 0.0012},
+        )
+        for i in range(args.events)
+    ]
+    dicts = [e.to_dict() for e in events]
+    lines_std = [json.dumps(d, ensure_ascii=False) for d in dicts]
+    lines_codec = [e.to_json() for e in events]
+
+    cases: list[tuple[str, Callable[[], Any], Callable[[], Any]]] = [
+        (
+            "EventV1.to_json",
+            lambda: [json.dumps(e.to_dict(), ensure_ascii=False) for e in events],
+            lambda: [e.to_json() for e in events],
+        ),
+        (
+            "EventV1.from_json",
+            lambda: [EventV1.from_dict(json.loads(line)) for line in lines_std],
+            lambda: [EventV1.from_json(line) for line in lines_codec],
+        ),
+        (
+            "store row encode",
+            lambda: [
+                (json.dumps(d["payload"], ensure_ascii=False), json.dumps(d["metadata"]))
+                for d in dicts
+            ],
+            lambda: [(codec.dumps(d["payload"]), codec.dumps(d["metadata"])) for d in dicts],
+        ),
+        (
+            "HTTP response body",
+            lambda: json.dumps(dicts, ensure_ascii=False, separators=(",", ":")).encode(),
+            lambda: codec.dumps_bytes(dicts),
+        ),
+    ]
+
+    print(f"{args.events} events, codec backend: {codec.BACKEND}")
+    print(f"{'':22} {'stdlib':>10} {'codec':>10}")
+    for name, before, after in cases:
+        t_before = _best(before, args.repeat)
+        t_after = _best(after, args.repeat)
+        print(
+            f"{name:22} {t_before * 1000:8.1f}ms {t_after * 1000:8.1f}ms"
+            f"  {t_before / t_after:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare decoded vs raw-passthrough serialization of a large run.
+
+Usage: python benchmarks/bench_raw_query.py [--events 100000]
+
+The decoded path is what ``GET /api/events`` did before: build ``EventV1``
+objects from the columns, then ``to_dict`` and re-encode with ``json.dumps``.
+The raw path joins the stored JSON documents into the response body.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from agentmeshd.events import make_event
+from agentmeshd.store import EventStore
+
+
+def _fill(store: EventStore, count: int) -> None:
+    batch = 5000
+    for start in range(0, count, batch):
+        store.append_many(
+            [
+                make_event(
+                    run_id="bench",
+                    kind="tool",
+                    payload={"name": "exec", "args": {"cmd": "ls -la", "i": i}, "ok": True},
+                    metadata={"agent": "bench", "tokens": i % 97},
+                )
+                for i in range(start, min(start + batch, count))
+            ]
+        )
+
+
+def _time(fn: Callable[[], bytes], repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        size = len(fn())
+        best = min(best, time.perf_counter() - t0)
+    return best, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EventStore(Path(tmp), compression="none")
+        _fill(store, args.events)
+
+        def decoded() -> bytes:
+            page = store.query_page(run_id="bench", limit=0)
+            return json.dumps(
+                [e.to_dict() for e in page.events], ensure_ascii=False, separators=(",", ":")
+            ).encode()
+
+        def raw() -> bytes:
+            return store.query_raw_page(run_id="bench", limit=0).json_array()
+
+        t_decoded, size = _time(decoded, args.repeat)
+        t_raw, _ = _time(raw, args.repeat)
+        store.close()
+
+    print(f"{args.events} events, {size / 1e6:.1f} MB response")
+    print(f"decoded: {t_decoded * 1000:8.1f} ms")
+    print(f"raw:     {t_raw * 1000:8.1f} ms  ({t_decoded / t_raw:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Time full-text search against a LIKE scan over the payload column.
+
+Usage: python benchmarks/bench_search.py [--events 1000000]
+
+Fills a store with tool/message events where one in ``--rare`` carries a
+distinctive error message, then asks for the first page of matches both
+through ``EventStore.search_raw_page`` (FTS5) and with ``payload LIKE``,
+which is what finding an error message costs without the index.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from agentmeshd.events import make_event
+from agentmeshd.store import EventStore
+
+_WORDS = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa"]
+
+
+def _fill(store: EventStore, count: int, rare: int) -> float:
+    batch = 5000
+    started = time.perf_counter()
+    for start in range(0, count, batch):
+        events = []
+        for i in range(start, min(start + batch, count)):
+            if i % rare == 0:
+                payload = {"message": f"ConnectionResetError: peer reset during step {i}"}
+                kind = "error"
+            else:
+                words = " ".join(_WORDS[(i + k) % len(_WORDS)] for k in range(8))
+                payload = {"text": words, "i": i}
+                kind = "message"
+            events.append(make_event(run_id=f"run-{i // 50}", kind=kind, payload=payload))
+        store.append_many(events)
+    return time.perf_counter() - started
+
+
+def _time(fn: Callable[[], int], repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    hits = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        hits = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--rare", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EventStore(Path(tmp), compression="none")
+        fill_seconds = _fill(store, args.events, args.rare)
+
+        def fts() -> int:
+            return len(store.search_raw_page("ConnectionResetError", limit=args.limit).ids)
+
+        conn = sqlite3.connect(Path(tmp) / "events.db")
+
+        def like() -> int:
+            rows = conn.execute(
+                "SELECT id, raw FROM events WHERE payload LIKE ? ORDER BY id LIMIT ?",
+                ("%ConnectionResetError%", args.limit),
+            ).fetchall()
+            return len(rows)
+
+        t_fts, hits = _time(fts, args.repeat)
+        t_like, _ = _time(like, args.repeat)
+        conn.close()
+        store.close()
+
+    print(f"{args.events} events appended in {fill_seconds:.1f}s, {hits} hits per page")
+    print(f"fts5: {t_fts * 1000:8.2f} ms")
+    print(f"like: {t_like * 1000:8.2f} ms  ({t_like / t_fts:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
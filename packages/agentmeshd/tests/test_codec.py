@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from typing import Any
+
+import pytest
+from agentmeshd import codec
+from agentmeshd.events import EventV1, make_event
+
+requires_orjson = pytest.mark.skipif(codec.BACKEND != "orjson", reason="orjson not installed")
+
+SAMPLES: list[Any] = [
+    {},
+    [],
+    {"text": "plain ascii"},
+    {"text": "héllo wörld — 日本語 🚀"},
+    {"text": 'quotes " backslash \\ slash / tab \t newline \n cr \r'},
+    {"text": "control \x00 \x01 \x1f \x7f bell \x07"},
+    {"text": "separators    "},
+    {"nested": {"list": [1, 2.5, -3, True, False, None], "empty": {}}},
+    {"ints": [0, -1, 2**31, 2**53 + 1, -(2**63), 2**64 - 1]},
+    {"floats": [0.0, -0.0, 0.1, 1.5, 3.141592653589793, 1e16, 1.7976931348623157e308]},
+    {"1": "numeric string key", "": "empty key"},
+    {"order": {"z": 1, "a": 2, "m": 3}},
+    "bare string",
+    12345,
+    None,
+]
+
+
+def _stdlib(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class TestCompatibility:
+    @requires_orjson
+    @pytest.mark.parametrize("obj", SAMPLES)
+    def test_orjson_matches_stdlib_bytes(self, obj: Any) -> None:
+        assert codec.dumps(obj) == _stdlib(obj)
+        assert codec.dumps_bytes(obj) == _stdlib(obj).encode()
+
+    @requires_orjson
+    def test_event_json_matches_stdlib(self) -> None:
+        event = make_event(
+            run_id="r1",
+            kind="tool",
+            payload={"name": "exec", "args": {"cmd": "ls"}, "text": "résumé"},
+            task_id="t1",
+            metadata={"tokens": 12, "cost": 0.0042},
+        )
+        assert event.to_json() == _stdlib(event.to_dict())
+
+    @requires_orjson
+    def test_non_string_keys_match_stdlib(self) -> None:
+        obj = {1: "a", 2.5: "b", False: "c", None: "d"}
+        assert codec.dumps(obj) == _stdlib(obj)
+
+    def test_ints_wider_than_64_bits_fall_back(self) -> None:
+        obj = {"big": 2**70, "neg": -(2**70)}
+        assert codec.dumps(obj) == _stdlib(obj)
+        assert codec.dumps_bytes(obj) == _stdlib(obj).encode()
+
+    @pytest.mark.parametrize("obj", SAMPLES)
+    def test_round_trip(self, obj: Any) -> None:
+        assert codec.loads(codec.dumps(obj)) == obj
+        assert codec.loads(codec.dumps_bytes(obj)) == obj
+
+    def test_small_exponent_floats_round_trip(self) -> None:
+        obj = {"tiny": 1e-7, "tinier": 2.5e-300}
+        assert codec.loads(codec.dumps(obj)) == obj
+
+
+class TestDecoding:
+    def test_invalid_json_raises_json_decode_error(self) -> None:
+        with pytest.raises(json.JSONDecodeError):
+            codec.loads('{"torn": ')
+        with pytest.raises(json.JSONDecodeError):
+            codec.loads(b"not json")
+
+    def test_event_from_json_accepts_bytes(self) -> None:
+        event = make_event(run_id="r1", kind="message", payload={"text": "hi"})
+        assert EventV1.from_json(event.to_json().encode()) == event
+
+
+class TestBackendSelection:
+    def test_env_forces_stdlib(self) -> None:
+        result = subprocess.run(
+            [sys.executable, "-c", "from agentmeshd import codec; print(codec.BACKEND)"],
+            env={**os.environ, "AGENTMESH_JSON": "stdlib"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == "stdlib"
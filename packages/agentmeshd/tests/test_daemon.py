@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import stat
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+import uvicorn
+from agentmeshd import daemon
+from agentmeshd.cli import app as cli_app
+from agentmeshd.events import make_event
+from agentmeshd.server import create_app
+from agentmeshd.store import EMBEDDED_WRITER, EventStore
+from typer.testing import CliRunner
+
+
+@pytest.fixture
+def served(monkeypatch: pytest.MonkeyPatch) -> list[dict[str, Any]]:
+    """Replace the uvicorn server with a recorder of how it would have been run."""
+    calls: list[dict[str, Any]] = []
+
+    def fake_serve(app: Any, **kwargs: Any) -> None:
+        calls.append(kwargs)
+
+    monkeypatch.setattr(daemon, "_serve", fake_serve)
+    return calls
+
+
+class TestStartLock:
+    def test_fails_fast_while_daemon_holds_store(
+        self, tmp_path: Path, served: list[dict[str, Any]], capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        running = EventStore(tmp_path)
+        (tmp_path / "agentmeshd.pid").write_text("4242")
+        try:
+            with pytest.raises(SystemExit):
+                daemon.start(data_dir=tmp_path)
+        finally:
+            running.close()
+
+        assert served == []
+        assert (tmp_path / "agentmeshd.pid").read_text() == "4242"
+        assert "is locked by pid" in capsys.readouterr().err
+
+    def test_waits_for_embedded_writer(
+        self, tmp_path: Path, served: list[dict[str, Any]], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(daemon, "EMBEDDED_WAIT", 5.0)
+        embedded = EventStore(tmp_path, writer=EMBEDDED_WRITER)
+        timer = threading.Timer(0.3, embedded.close)
+        timer.start()
+        try:
+            daemon.start(data_dir=tmp_path, unix_socket=False)
+        finally:
+            timer.join()
+
+        assert len(served) == 1
+        assert not (tmp_path / "agentmeshd.pid").exists()
+
+
+class TestShutdown:
+    def test_open_event_stream_does_not_block_shutdown(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        app = create_app(store)
+        sock = tmp_path / "d.sock"
+        config = uvicorn.Config(
+            app, uds=str(sock), log_level="warning", timeout_graceful_shutdown=10
+        )
+        server = daemon._DaemonServer(config, app.state.broker)
+        thread = threading.Thread(target=server.run)
+        thread.start()
+        try:
+            while not server.started:
+                time.sleep(0.01)
+            transport = httpx.HTTPTransport(uds=str(sock))
+            with (
+                httpx.Client(transport=transport, base_url="http://agentmeshd") as client,
+                client.stream("GET", "/api/events/stream") as resp,
+            ):
+                store.append(make_event(run_id="r1", kind="status"))
+                lines = resp.iter_lines()
+                assert next(lines).startswith("id: 1")
+
+                server.should_exit = True
+                thread.join(timeout=3)
+                assert not thread.is_alive()
+        finally:
+            server.should_exit = True
+            thread.join()
+            store.close()
+
+
+class TestVacuum:
+    def test_converts_legacy_db_once(self, tmp_path: Path) -> None:
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute("CREATE TABLE t (x)")
+        conn.close()
+
+        assert daemon.vacuum(data_dir=tmp_path) is True
+        assert daemon.vacuum(data_dir=tmp_path) is False
+
+    def test_refuses_while_daemon_running(self, tmp_path: Path) -> None:
+        (tmp_path / "agentmeshd.pid").write_text(str(os.getpid()))
+        with pytest.raises(RuntimeError, match="running"):
+            daemon.vacuum(data_dir=tmp_path)
+
+
+class TestUnixSocket:
+    def test_serve_binds_tcp_and_replaces_stale_socket(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        bound: list[socket.socket] = []
+        monkeypatch.setattr(
+            daemon._DaemonServer, "run", lambda self, sockets: bound.extend(sockets)
+        )
+        sock = tmp_path / "d.sock"
+        sock.write_text("left by a killed daemon")
+        store = EventStore(tmp_path)
+        try:
+            daemon._serve(create_app(store), host="127.0.0.1", port=0, uds=sock)
+        finally:
+            store.close()
+            for s in bound:
+                s.close()
+
+        assert [s.family for s in bound] == [socket.AF_INET, socket.AF_UNIX]
+        assert sock.is_socket()
+        assert stat.S_IMODE(sock.stat().st_mode) == 0o600
+
+    def test_start_records_custom_socket(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        custom = tmp_path / "custom.sock"
+        record = tmp_path / "agentmeshd.sock.path"
+        seen: list[str] = []
+
+        def fake_serve(app: Any, *, host: str, port: int, uds: Path | None) -> None:
+            seen.append(record.read_text())
+            assert uds is not None
+            uds.touch()
+
+        monkeypatch.setattr(daemon, "_serve", fake_serve)
+        daemon.start(data_dir=tmp_path, uds=custom)
+
+        assert seen == [str(custom)]
+        assert not custom.exists()
+        assert not record.exists()
+
+    def test_start_removes_stale_sockets_even_without_uds(
+        self, tmp_path: Path, served: list[dict[str, Any]]
+    ) -> None:
+        custom = tmp_path / "custom.sock"
+        custom.touch()
+        (tmp_path / "agentmeshd.sock.path").write_text(str(custom))
+        daemon.socket_file(tmp_path).touch()
+
+        daemon.start(data_dir=tmp_path, unix_socket=False)
+
+        assert served[0]["uds"] is None
+        assert not custom.exists()
+        assert not daemon.socket_file(tmp_path).exists()
+
+    def test_stop_removes_recorded_socket(self, tmp_path: Path) -> None:
+        custom = tmp_path / "custom.sock"
+        custom.touch()
+        (tmp_path / "agentmeshd.sock.path").write_text(str(custom))
+        proc = subprocess.Popen(["sleep", "30"])
+        (tmp_path / "agentmeshd.pid").write_text(str(proc.pid))
+        try:
+            assert daemon.stop(data_dir=tmp_path)
+        finally:
+            proc.wait(timeout=5)
+
+        assert not custom.exists()
+        assert not (tmp_path / "agentmeshd.sock.path").exists()
+
+    def test_stop_cleans_up_after_dead_daemon(self, tmp_path: Path) -> None:
+        proc = subprocess.Popen(["true"])
+        proc.wait()
+        (tmp_path / "agentmeshd.pid").write_text(str(proc.pid))
+        daemon.socket_file(tmp_path).touch()
+
+        assert not daemon.stop(data_dir=tmp_path)
+        assert not daemon.socket_file(tmp_path).exists()
+
+    @pytest.mark.parametrize(
+        ("args", "uds", "unix_socket"),
+        [
+            ([], None, True),
+            (["--uds", "/tmp/a.sock"], Path("/tmp/a.sock"), True),
+            (["--no-uds"], None, False),
+        ],
+    )
+    def test_cli_socket_options(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        args: list[str],
+        uds: Path | None,
+        unix_socket: bool,
+    ) -> None:
+        calls: list[dict[str, Any]] = []
+        monkeypatch.setattr(daemon, "start", lambda **kwargs: calls.append(kwargs))
+
+        result = CliRunner().invoke(cli_app, ["start", "--data-dir", str(tmp_path), *args])
+
+        assert result.exit_code == 0, result.output
+        assert (calls[0]["uds"], calls[0]["unix_socket"]) == (uds, unix_socket)
@@ -36,6 +36,15 @@ class TestEventV1Roundtrip:
         assert event.metadata == {}
         assert event.team_run_id is None
 
+    def test_event_id(self) -> None:
+        first = make_event(run_id="r5", kind="tool")
+        assert first.event_id and first.event_id != make_event(run_id="r5", kind="tool").event_id
+        assert make_event(run_id="r5", kind="tool", event_id="e1").event_id == "e1"
+
+        untagged = EventV1.from_dict({"run_id": "r5", "kind": "tool"})
+        assert untagged.event_id is None
+        assert "event_id" not in untagged.to_dict()
+
 
 class TestLegacyFormatPromotion:
     def test_event_type_promoted_to_kind(self) -> None:
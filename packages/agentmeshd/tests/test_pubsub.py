@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from agentmeshd.events import make_event
+from agentmeshd.pubsub import EventBroker, EventFilter
+from agentmeshd.store import StoredEvent
+
+
+def _stored(event_id: int, run_id: str = "r1", kind: str = "status") -> StoredEvent:
+    event = make_event(run_id=run_id, kind=kind)
+    return StoredEvent(event_id, event, event.to_json())
+
+
+class TestEventFilter:
+    def test_matches(self) -> None:
+        event = make_event(run_id="r1", kind="tool", task_id="t1")
+        assert EventFilter().matches(event)
+        assert EventFilter(run_id="r1", kind="tool", task_id="t1").matches(event)
+        assert not EventFilter(run_id="r2").matches(event)
+        assert not EventFilter(team_run_id="team").matches(event)
+
+
+class TestEventBroker:
+    @pytest.mark.asyncio
+    async def test_fan_out_by_filter(self) -> None:
+        broker = EventBroker()
+        r1 = broker.subscribe(EventFilter(run_id="r1"))
+        tools = broker.subscribe(EventFilter(kind="tool"))
+
+        broker.publish([_stored(1, "r1"), _stored(2, "r2", "tool"), _stored(3, "r1", "tool")])
+
+        assert [e.id for e in await r1.get()] == [1, 3]
+        assert [e.id for e in await tools.get()] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_publish_from_another_thread(self) -> None:
+        broker = EventBroker()
+        sub = broker.subscribe(EventFilter())
+        await asyncio.to_thread(broker.publish, [_stored(1)])
+        assert [e.id for e in await asyncio.wait_for(sub.get(), 1)] == [1]
+
+    @pytest.mark.asyncio
+    async def test_overflow_drops_subscriber(self) -> None:
+        broker = EventBroker(max_queue=3)
+        slow = broker.subscribe(EventFilter())
+        broker.publish([_stored(1), _stored(2)])
+        broker.publish([_stored(3), _stored(4)])
+        await asyncio.sleep(0)
+
+        assert await slow.get() == []
+        assert slow.overflowed
+        assert broker.subscriber_count == 0
+
+    @pytest.mark.asyncio
+    async def test_close_unsubscribes_and_wakes_reader(self) -> None:
+        broker = EventBroker()
+        sub = broker.subscribe(EventFilter())
+        waiter = asyncio.create_task(sub.get())
+        await asyncio.sleep(0)
+        sub.close()
+
+        assert await asyncio.wait_for(waiter, 1) == []
+        assert broker.subscriber_count == 0
+
+    @pytest.mark.asyncio
+    async def test_close_ends_every_subscription(self) -> None:
+        broker = EventBroker()
+        sub = broker.subscribe(EventFilter())
+        waiter = asyncio.create_task(sub.get())
+        await asyncio.sleep(0)
+        broker.close()
+
+        assert await asyncio.wait_for(waiter, 1) == []
+        assert await broker.subscribe(EventFilter()).get() == []
+        assert broker.subscriber_count == 0
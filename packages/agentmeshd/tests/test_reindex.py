@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+from agentmeshd import daemon, search
+from agentmeshd.events import make_event
+from agentmeshd.reindex import log_bytes, reindex
+from agentmeshd.store import EventStore, log_line
+
+
+def _populate(data_dir: Path, count: int = 20, compression: str = "gzip") -> None:
+    store = EventStore(data_dir, segment_bytes=600, compression=compression)
+    for i in range(count):
+        kind = "tool" if i % 3 else "status"
+        store.append(make_event(run_id=f"r{i % 2}", kind=kind, payload={"i": i}))
+    store.close()
+
+
+def _rows(data_dir: Path) -> list[tuple[object, ...]]:
+    conn = sqlite3.connect(data_dir / "events.db")
+    try:
+        return conn.execute(
+            "SELECT id, ts, run_id, kind, payload, metadata FROM events ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+class TestReindex:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_rebuild_matches_original(self, tmp_path: Path, workers: int) -> None:
+        _populate(tmp_path)
+        before = _rows(tmp_path)
+
+        stats = reindex(tmp_path, workers=workers, chunk_bytes=256)
+
+        assert stats.events == len(before) == 20
+        assert stats.skipped == 0
+        assert stats.segments > 1
+        assert _rows(tmp_path) == before
+
+    def test_rebuild_after_db_lost(self, tmp_path: Path) -> None:
+        _populate(tmp_path, compression="none")
+        before = _rows(tmp_path)
+        for name in ("events.db", "events.db-wal", "events.db-shm"):
+            (tmp_path / name).unlink(missing_ok=True)
+
+        reindex(tmp_path, workers=1)
+        assert _rows(tmp_path) == before
+
+        store = EventStore(tmp_path)
+        assert store.append(make_event(run_id="r9", kind="status")) == 21
+        assert len(store.query(run_id="r0")) == 10
+        runs = {r.run_id: r.event_count for r in store.query_runs().runs}
+        assert runs == {"r0": 10, "r1": 10, "r9": 1}
+        store.close()
+
+    def test_keeps_ids_after_retention(self, tmp_path: Path) -> None:
+        _populate(tmp_path, compression="none")
+        store = EventStore(tmp_path)
+        oldest = store.log_segments()[0]
+        assert oldest.last_id is not None
+        store.purge(upto_id=oldest.last_id)
+        store.drop_segment(oldest)
+        store.close()
+        before = _rows(tmp_path)
+
+        reindex(tmp_path, workers=1)
+        assert _rows(tmp_path) == before
+
+    def test_legacy_lines_are_promoted(self, tmp_path: Path) -> None:
+        legacy = {
+            "ts": "2025-01-01T00:00:00+00:00",
+            "run_id": "old",
+            "event_type": "error",
+            "message": "boom",
+        }
+        (tmp_path / "events.jsonl").write_text(json.dumps(legacy) + "\n", encoding="utf-8")
+
+        reindex(tmp_path, workers=1)
+
+        store = EventStore(tmp_path)
+        (event,) = store.query(run_id="old")
+        assert event.kind == "error"
+        assert event.payload == {"text": "boom"}
+        store.close()
+
+    def test_skips_unparsable_lines(self, tmp_path: Path) -> None:
+        lines = [make_event(run_id="r1", kind="status").to_json(), '{"torn": ', "[1, 2]"]
+        (tmp_path / "events.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        stats = reindex(tmp_path, workers=1)
+        assert (stats.events, stats.skipped) == (1, 2)
+
+    def test_skips_lines_that_are_not_objects(self, tmp_path: Path) -> None:
+        lines = ["42", "[]", '"x"', "null", make_event(run_id="r1", kind="status").to_json()]
+        (tmp_path / "events.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        stats = reindex(tmp_path, workers=1)
+        assert (stats.events, stats.skipped) == (1, 4)
+        assert [row[0] for row in _rows(tmp_path)] == [5]
+
+    def test_drops_repeated_event_ids(self, tmp_path: Path) -> None:
+        event = make_event(run_id="r1", kind="status")
+        lines = [event.to_json(), make_event(run_id="r1", kind="tool").to_json(), event.to_json()]
+        (tmp_path / "events.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        stats = reindex(tmp_path, workers=1)
+        assert (stats.events, stats.skipped, stats.duplicates) == (2, 0, 1)
+        assert [row[0] for row in _rows(tmp_path)] == [1, 2]
+
+    def test_rejected_batch_leaves_no_line(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        store = EventStore(tmp_path, compression="none")
+        store.append(make_event(run_id="r1", kind="status", payload={"n": "a"}))
+        index_range = search.index_range
+
+        def fail_once(*args: object) -> None:
+            monkeypatch.setattr(search, "index_range", index_range)
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(search, "index_range", fail_once)
+        with pytest.raises(sqlite3.OperationalError):
+            store.append(make_event(run_id="r1", kind="status", payload={"n": "b"}))
+        assert store.append(make_event(run_id="r1", kind="status", payload={"n": "c"})) == 2
+        store.close()
+        before = _rows(tmp_path)
+
+        stats = reindex(tmp_path, workers=1)
+        assert (stats.events, stats.skipped) == (2, 0)
+        assert _rows(tmp_path) == before
+        assert [json.loads(str(row[4]))["n"] for row in before] == ["a", "c"]
+
+    def test_unparsable_lines_keep_their_ids(self, tmp_path: Path) -> None:
+        lines = [
+            make_event(run_id="r1", kind="status").to_json(),
+            '{"torn": ',
+            make_event(run_id="r1", kind="tool").to_json(),
+        ]
+        (tmp_path / "events.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        reindex(tmp_path, workers=1)
+        assert [(row[0], row[3]) for row in _rows(tmp_path)] == [(1, "status"), (3, "tool")]
+
+    def test_uses_ids_written_on_lines(self, tmp_path: Path) -> None:
+        _populate(tmp_path, compression="none")
+        segment = next((tmp_path / "log").glob("events-*.jsonl"))
+        first, *rest = segment.read_bytes().splitlines(keepends=True)
+        segment.write_bytes(b"garbage\n" + first + b"{}\n" + b"".join(rest))
+        before = _rows(tmp_path)
+
+        stats = reindex(tmp_path, workers=1)
+        assert (stats.skipped, stats.duplicates) == (1, 1)
+        assert _rows(tmp_path) == before
+
+    def test_later_line_wins_for_repeated_id(self, tmp_path: Path) -> None:
+        lines = [
+            log_line(1, make_event(run_id="r1", kind="status").to_json()),
+            log_line(2, make_event(run_id="r1", kind="error").to_json()),
+            log_line(2, make_event(run_id="r1", kind="tool").to_json()),
+        ]
+        (tmp_path / "events.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        stats = reindex(tmp_path, workers=1)
+        assert (stats.events, stats.skipped, stats.duplicates) == (2, 0, 1)
+        assert [(row[0], row[3]) for row in _rows(tmp_path)] == [(1, "status"), (2, "tool")]
+
+    def test_reports_progress_in_log_bytes(self, tmp_path: Path) -> None:
+        _populate(tmp_path)
+        seen: list[int] = []
+
+        reindex(tmp_path, workers=1, chunk_bytes=128, progress=seen.append)
+        assert sum(seen) == log_bytes(tmp_path)
+        assert len(seen) > 1
+
+
+class TestDaemonReindex:
+    def test_refuses_while_daemon_running(self, tmp_path: Path) -> None:
+        (tmp_path / "agentmeshd.pid").write_text(str(os.getpid()))
+        with pytest.raises(RuntimeError, match="running"):
+            daemon.reindex(data_dir=tmp_path, workers=1)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import replace
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+from agentmeshd.events import EventV1, make_event
+from agentmeshd.reindex import reindex
+from agentmeshd.retention import (
+    RetentionPolicy,
+    RetentionWorker,
+    enforce,
+    parse_duration,
+    parse_kind_max_age,
+    parse_size,
+)
+from agentmeshd.segments import read_manifest
+from agentmeshd.store import EventStore
+
+NOW = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+def _event(ts: str, kind: str = "status", run_id: str = "r1") -> EventV1:
+    return replace(make_event(run_id=run_id, kind=kind), ts=ts)
+
+
+class TestParsing:
+    def test_parse_duration(self) -> None:
+        assert parse_duration("90") == 90
+        assert parse_duration("30m") == 1800
+        assert parse_duration("12h") == 43200
+        assert parse_duration("7d") == 7 * 86400
+        assert parse_duration("1.5h") == 5400
+
+    def test_parse_size(self) -> None:
+        assert parse_size("512") == 512
+        assert parse_size("10kb") == 10 * 1024
+        assert parse_size("500MB") == 500 * 1024**2
+        assert parse_size("2G") == 2 * 1024**3
+
+    def test_parse_kind_max_age(self) -> None:
+        assert parse_kind_max_age(["reasoning=1d", "tool=2h"]) == {
+            "reasoning": 86400,
+            "tool": 7200,
+        }
+
+    @pytest.mark.parametrize("value", ["", "abc", "5y", "-1d"])
+    def test_invalid_duration(self, value: str) -> None:
+        with pytest.raises(ValueError):
+            parse_duration(value)
+
+    def test_invalid_kind_spec(self) -> None:
+        with pytest.raises(ValueError):
+            parse_kind_max_age(["reasoning"])
+
+    def test_disabled_by_default(self) -> None:
+        assert not RetentionPolicy().enabled
+        assert RetentionPolicy(max_age=60).enabled
+
+
+class TestPurge:
+    def test_purge_respects_limit(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append_many([_event("2026-01-01T00:00:00+00:00") for _ in range(5)])
+        assert store.purge(limit=2) == 2
+        assert [e.ts for e in store.query()] == ["2026-01-01T00:00:00+00:00"] * 3
+        store.close()
+
+    def test_new_db_uses_incremental_auto_vacuum(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        assert store.incremental_vacuum_enabled()
+        store.close()
+
+    def test_enable_incremental_vacuum_on_legacy_db(self, tmp_path: Path) -> None:
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute("CREATE TABLE t (x)")
+        conn.close()
+
+        store = EventStore(tmp_path)
+        assert not store.incremental_vacuum_enabled()
+        store.enable_incremental_vacuum()
+        assert store.incremental_vacuum_enabled()
+        store.close()
+
+
+class TestRetentionWorker:
+    def test_does_not_vacuum_legacy_db(self, tmp_path: Path) -> None:
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute("CREATE TABLE t (x)")
+        conn.close()
+
+        store = EventStore(tmp_path)
+        worker = RetentionWorker(store, RetentionPolicy(max_age=60, interval=60))
+        worker.start()
+        worker.stop()
+        assert not store.incremental_vacuum_enabled()
+        store.close()
+
+
+class TestEnforce:
+    def test_age_purges_old_events_in_chunks(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append_many([_event("2026-01-01T00:00:00+00:00") for _ in range(7)])
+        store.append(_event("2026-02-28T00:00:00+00:00"))
+
+        policy = RetentionPolicy(max_age=parse_duration("7d"), chunk_size=3)
+        assert enforce(store, policy, now=NOW) == 7
+        assert [e.ts for e in store.query()] == ["2026-02-28T00:00:00+00:00"]
+        store.close()
+
+    def test_age_drops_expired_sealed_segments(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path, segment_bytes=1, compression="none")
+        store.append(_event("2026-01-01T00:00:00+00:00"))
+        store.append(_event("2026-02-28T00:00:00+00:00"))
+        store.append(_event("2026-02-28T01:00:00+00:00"))
+
+        enforce(store, RetentionPolicy(max_age=parse_duration("7d")), now=NOW)
+        segments = store.log_segments()
+        assert [s.first_ts for s in segments] == [
+            "2026-02-28T00:00:00+00:00",
+            "2026-02-28T01:00:00+00:00",
+        ]
+        store.close()
+        assert not (tmp_path / "log" / "events-000001.jsonl").exists()
+
+    def test_kind_max_age_only_touches_that_kind(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append(_event("2026-02-20T00:00:00+00:00", kind="reasoning"))
+        store.append(_event("2026-02-20T00:00:00+00:00", kind="status"))
+        store.append(_event("2026-02-28T23:00:00+00:00", kind="reasoning"))
+
+        policy = RetentionPolicy(kind_max_age={"reasoning": parse_duration("1d")})
+        assert enforce(store, policy, now=NOW) == 1
+        assert [(e.kind, e.ts[:10]) for e in store.query()] == [
+            ("status", "2026-02-20"),
+            ("reasoning", "2026-02-28"),
+        ]
+        store.close()
+
+    def test_size_drops_oldest_segments_with_their_events(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path, segment_bytes=1, compression="none")
+        ids = [store.append(_event(f"2026-02-0{i}T00:00:00+00:00")) for i in range(1, 6)]
+
+        total = store.db_bytes() + sum(s.bytes for s in store.log_segments())
+        enforce(store, RetentionPolicy(max_bytes=total - 1), now=NOW)
+
+        remaining = [s.first_id for s in store.log_segments()]
+        assert ids[0] not in remaining
+        assert remaining[-1] == ids[-1]
+        kept = {e.ts for e in store.query()}
+        assert "2026-02-01T00:00:00+00:00" not in kept
+        assert "2026-02-05T00:00:00+00:00" in kept
+        store.close()
+
+    def test_size_purges_events_of_legacy_segment(self, tmp_path: Path) -> None:
+        legacy = [_event(f"2026-01-0{i}T00:00:00+00:00").to_json() for i in (1, 2)]
+        (tmp_path / "events.jsonl").write_text("\n".join(legacy) + "\n", encoding="utf-8")
+        reindex(tmp_path, workers=1)
+        store = EventStore(tmp_path, segment_bytes=1, compression="none")
+        store.append(_event("2026-02-01T00:00:00+00:00"))
+        store.append(_event("2026-02-02T00:00:00+00:00"))
+        assert store.log_segments()[0].last_id is None
+
+        total = store.db_bytes() + sum(s.bytes for s in store.log_segments())
+        assert enforce(store, RetentionPolicy(max_bytes=total - 1), now=NOW) >= 2
+        kept = [e.ts[:10] for e in store.query()]
+        store.close()
+
+        assert "2026-01-01" not in kept and "2026-01-02" not in kept
+        assert kept[-1] == "2026-02-02"
+
+    def test_size_keeps_active_segment(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path, compression="none")
+        store.append(_event("2026-02-01T00:00:00+00:00"))
+
+        assert enforce(store, RetentionPolicy(max_bytes=1), now=NOW) == 0
+        assert len(store.query()) == 1
+        store.close()
+        assert len(read_manifest(tmp_path / "log")) == 1
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from agentmeshd import runs as runs_module
+from agentmeshd.events import EventV1, make_event
+from agentmeshd.runs import RunSummary, rebuild_runs
+from agentmeshd.store import EventStore
+
+
+def _event(run_id: str, kind: str, ts: str, **kwargs: object) -> EventV1:
+    return replace(make_event(run_id=run_id, kind=kind, **kwargs), ts=ts)  # type: ignore[arg-type]
+
+
+def _run_story(store: EventStore) -> None:
+    store.append(
+        _event("r1", "message", "2026-01-01T00:00:00+00:00", metadata={"agent_url": "http://a"})
+    )
+    store.append_many(
+        [
+            _event(
+                "r1",
+                "status",
+                "2026-01-01T00:00:01+00:00",
+                task_id="t1",
+                payload={"state": "working"},
+            ),
+            _event("r2", "message", "2026-01-01T00:00:05+00:00", team_run_id="team"),
+            _event("r1", "artifact", "2026-01-01T00:00:02+00:00", task_id="t2"),
+        ]
+    )
+    store.append(
+        _event(
+            "r1",
+            "status",
+            "2026-01-01T00:00:04+00:00",
+            task_id="t1",
+            payload={"state": "completed"},
+            metadata={"final": True},
+        )
+    )
+
+
+def _table(store_dir: Path) -> dict[str, RunSummary]:
+    conn = sqlite3.connect(store_dir / "events.db")
+    try:
+        rows = conn.execute(
+            "SELECT run_id, team_run_id, agent_url, first_id, last_id, first_ts, last_ts, "
+            "event_count, kind_counts, task_ids, state, final FROM runs"
+        ).fetchall()
+    finally:
+        conn.close()
+    return {row[0]: RunSummary.from_row(row) for row in rows}
+
+
+class TestIncrementalSummaries:
+    def test_summary_tracks_appends(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _run_story(store)
+        page = store.query_runs(sort="first_ts", descending=False)
+        store.close()
+
+        assert [r.run_id for r in page.runs] == ["r1", "r2"]
+        r1 = page.runs[0]
+        assert r1.first_ts == "2026-01-01T00:00:00+00:00"
+        assert r1.last_ts == "2026-01-01T00:00:04+00:00"
+        assert r1.duration == 4.0
+        assert r1.event_count == 4
+        assert r1.kind_counts == {"message": 1, "status": 2, "artifact": 1}
+        assert r1.task_ids == ["t1", "t2"]
+        assert r1.agent_url == "http://a"
+        assert r1.state == "completed"
+        assert r1.final is True
+        assert page.runs[1].team_run_id == "team"
+        assert page.runs[1].final is False
+
+    def test_rebuild_matches_incremental(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _run_story(store)
+        store.close()
+        incremental = _table(tmp_path)
+
+        conn = sqlite3.connect(tmp_path / "events.db")
+        with conn:
+            rebuild_runs(conn)
+        conn.close()
+
+        assert _table(tmp_path) == incremental
+
+    def test_backfills_existing_database(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _run_story(store)
+        store.close()
+        expected = _table(tmp_path)
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute("DROP TABLE runs")
+        conn.commit()
+        conn.close()
+
+        store = EventStore(tmp_path)
+        store.close()
+
+        assert _table(tmp_path) == expected
+
+    def test_purge_recomputes_affected_runs(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _run_story(store)
+        store.purge(upto_id=2)
+        assert store.refresh_runs() == 1
+        runs = {r.run_id: r for r in store.query_runs().runs}
+        store.close()
+
+        assert runs["r1"].event_count == 2
+        assert runs["r1"].first_ts == "2026-01-01T00:00:02+00:00"
+        assert runs["r1"].agent_url is None
+        assert runs["r1"].kind_counts == {"status": 1, "artifact": 1}
+        assert runs["r1"].state == "completed"
+        assert runs["r2"].event_count == 1
+
+    def test_purge_removes_empty_runs(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _run_story(store)
+        store.purge(kind="message")
+        store.purge(kind="status")
+        store.purge(kind="artifact")
+        store.refresh_runs()
+        page = store.query_runs()
+        store.close()
+
+        assert page.runs == []
+
+    def test_purge_chunks_rebuild_each_run_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        store = EventStore(tmp_path)
+        _run_story(store)
+        rebuilt: list[list[str]] = []
+        rebuild_runs = runs_module.rebuild_runs
+
+        def spy(conn: sqlite3.Connection, run_ids: list[str] | None = None) -> None:
+            rebuilt.append(sorted(run_ids or []))
+            rebuild_runs(conn, run_ids)
+
+        monkeypatch.setattr(runs_module, "rebuild_runs", spy)
+        while store.purge(kind="status", limit=1):
+            pass
+        assert rebuilt == []
+        assert store.refresh_runs() == 1
+        counts = {r.run_id: r.event_count for r in store.query_runs().runs}
+        store.close()
+
+        assert rebuilt == [["r1"]]
+        assert counts == {"r1": 2, "r2": 1}
+
+    def test_stale_runs_rebuilt_on_open(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _run_story(store)
+        store.purge(upto_id=2)
+        store.close()
+
+        store = EventStore(tmp_path)
+        store.close()
+        assert _table(tmp_path)["r1"].event_count == 2
+
+
+class TestQueryRuns:
+    @pytest.fixture()
+    def store(self, tmp_path: Path) -> EventStore:
+        store = EventStore(tmp_path)
+        events: list[EventV1] = []
+        for i in range(10):
+            ts = f"2026-01-01T00:00:{i:02d}+00:00"
+            events.append(_event(f"r{i}", "message", ts, team_run_id="even" if i % 2 else None))
+            for _ in range(i % 3):
+                events.append(_event(f"r{i}", "tool", ts))
+        store.append_many(events)
+        return store
+
+    def test_filters(self, store: EventStore) -> None:
+        team = store.query_runs(team_run_id="even").runs
+        started = store.query_runs(
+            since="2026-01-01T00:00:03+00:00", until="2026-01-01T00:00:06+00:00"
+        ).runs
+        store.close()
+
+        assert {r.run_id for r in team} == {"r1", "r3", "r5", "r7", "r9"}
+        assert [r.run_id for r in started] == ["r5", "r4", "r3"]
+
+    @pytest.mark.parametrize("sort", ["first_ts", "last_ts", "event_count"])
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_cursor_walks_every_run_once(
+        self, store: EventStore, sort: str, descending: bool
+    ) -> None:
+        seen: list[RunSummary] = []
+        cursor: str | None = None
+        while True:
+            page = store.query_runs(sort=sort, descending=descending, cursor=cursor, limit=3)
+            seen.extend(page.runs)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        store.close()
+
+        assert sorted(r.run_id for r in seen) == sorted(f"r{i}" for i in range(10))
+        keys = [(getattr(r, sort), r.run_id) for r in seen]
+        assert keys == sorted(keys, reverse=descending)
+
+    @pytest.mark.parametrize(
+        ("column", "index"),
+        [
+            ("team_run_id", "idx_runs_team_run_id"),
+            ("agent_url", "idx_runs_agent_url"),
+            ("state", "idx_runs_state"),
+            ("final", "idx_runs_final"),
+        ],
+    )
+    def test_filters_use_index(self, tmp_path: Path, column: str, index: str) -> None:
+        store = EventStore(tmp_path)
+        conn = sqlite3.connect(tmp_path / "events.db")
+        try:
+            plan = conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT run_id FROM runs WHERE {column} = ? "
+                "ORDER BY first_ts DESC, run_id DESC LIMIT 10",
+                ("x",),
+            ).fetchall()
+        finally:
+            conn.close()
+        details = " ".join(row[-1] for row in plan)
+        assert index in details
+        assert "TEMP B-TREE" not in details
+        store.close()
+
+    def test_rejects_bad_sort_and_cursor(self, store: EventStore) -> None:
+        with pytest.raises(ValueError):
+            store.query_runs(sort="payload")
+        with pytest.raises(ValueError):
+            store.query_runs(cursor="not-a-cursor")
+        store.close()
+
+
+class TestTraceLookup:
+    @pytest.fixture()
+    def store(self, tmp_path: Path) -> EventStore:
+        store = EventStore(tmp_path)
+        _run_story(store)
+        store.append(_event("r3", "message", "2026-01-01T00:00:06+00:00", team_run_id="team"))
+        return store
+
+    def test_resolves_each_kind_of_id(self, store: EventStore) -> None:
+        by_run = store.trace_raw("r1")
+        by_task = store.trace_raw("t2")
+        by_team = store.trace_raw("team")
+        unknown = store.trace_raw("nope")
+        store.close()
+
+        assert by_run is not None and by_task is not None and by_team is not None
+        assert (by_run.match, [r.run_id for r in by_run.runs]) == ("run_id", ["r1"])
+        assert by_task.match == "task_id"
+        assert by_task.events.ids == by_run.events.ids == [1, 2, 4, 5]
+        assert (by_team.match, [r.run_id for r in by_team.runs]) == ("team_run_id", ["r2", "r3"])
+        assert by_team.events.ids == [3, 6]
+        assert unknown is None
+
+    def test_pages_events(self, store: EventStore) -> None:
+        first = store.trace_raw("r1", limit=3)
+        assert first is not None and first.events.next_cursor == 4
+        rest = store.trace_raw("r1", after_id=first.events.next_cursor, limit=3)
+        store.close()
+
+        assert rest is not None
+        assert rest.events.ids == [5]
+        assert rest.events.next_cursor is None
+
+    def test_purge_drops_stale_ids(self, store: EventStore) -> None:
+        store.purge(kind="artifact")
+        store.refresh_runs()
+        assert store.trace_raw("t2") is None
+        assert store.trace_raw("t1") is not None
+        store.close()
+
+    def test_backfills_id_table(self, tmp_path: Path, store: EventStore) -> None:
+        store.close()
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute("DROP TABLE run_ids")
+        conn.commit()
+        conn.close()
+
+        store = EventStore(tmp_path)
+        trace = store.trace_raw("t1")
+        store.close()
+
+        assert trace is not None and trace.runs[0].run_id == "r1"
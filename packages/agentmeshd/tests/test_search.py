@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from agentmeshd.events import make_event
+from agentmeshd.reindex import reindex
+from agentmeshd.store import EventStore
+
+
+def _populate(store: EventStore) -> None:
+    store.append_many(
+        [
+            make_event(run_id="r1", kind="message", payload={"text": "deploy the service"}),
+            make_event(
+                run_id="r1",
+                kind="error",
+                payload={"message": "connection refused by upstream", "code": 111},
+            ),
+            make_event(
+                run_id="r2",
+                kind="artifact",
+                payload={"parts": [{"text": "The request was Refused by the server"}]},
+            ),
+            make_event(
+                run_id="r3",
+                kind="error",
+                payload={"message": "refused refused refused", "detail": {"host": "db-1"}},
+            ),
+            make_event(run_id="r3", kind="status", payload={"state": "failed"}),
+        ]
+    )
+
+
+def _hits(store: EventStore, query: str, **kwargs: object) -> list[tuple[int, str]]:
+    page = store.search_raw_page(query, **kwargs)  # type: ignore[arg-type]
+    return [(i, json.loads(e)["run_id"]) for i, e in zip(page.ids, page.events, strict=True)]
+
+
+class TestSearch:
+    def test_matches_nested_payload_strings_by_rank(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _populate(store)
+        hits = _hits(store, "refused")
+        store.close()
+
+        assert {run_id for _, run_id in hits} == {"r1", "r2", "r3"}
+        assert hits[0] == (4, "r3")  # most occurrences ranks first
+
+    def test_query_syntax_and_filters(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _populate(store)
+        assert _hits(store, '"connection refused"', fts_syntax=True) == [(2, "r1")]
+        assert _hits(store, "db*", fts_syntax=True) == [(4, "r3")]
+        assert [i for i, _ in _hits(store, "refused", kind="error", run_id="r1")] == [2]
+        assert _hits(store, "111") == []  # only string values are indexed
+        store.close()
+
+    def test_cursor_pages_through_every_hit(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append_many(
+            [
+                make_event(run_id=f"r{i}", kind="error", payload={"message": "boom"})
+                for i in range(7)
+            ]
+        )
+        ids: list[int] = []
+        cursor: str | None = None
+        while True:
+            page = store.search_raw_page("boom", cursor=cursor, limit=3)
+            ids.extend(page.ids)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        store.close()
+
+        assert sorted(ids) == list(range(1, 8))
+        assert len(ids) == len(set(ids))
+
+    @pytest.mark.parametrize(
+        ("query", "run_id"),
+        [("127.0.0.1:8080", "r4"), ("KeyError: 'user-id'", "r5"), ("user-id", "r5")],
+    )
+    def test_pasted_text_matches_literally(self, tmp_path: Path, query: str, run_id: str) -> None:
+        store = EventStore(tmp_path)
+        _populate(store)
+        store.append_many(
+            [
+                make_event(run_id="r4", kind="error", payload={"message": "dial 127.0.0.1:8080"}),
+                make_event(run_id="r5", kind="error", payload={"message": "KeyError: 'user-id'"}),
+            ]
+        )
+        hits = _hits(store, query)
+        store.close()
+
+        assert [r for _, r in hits] == [run_id]
+
+    def test_rejects_malformed_query(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _populate(store)
+        with pytest.raises(ValueError):
+            store.search_raw_page('"unbalanced', fts_syntax=True)
+        with pytest.raises(ValueError):
+            store.search_raw_page("refused", cursor="garbage")
+        store.close()
+
+    def test_purged_events_leave_the_index(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _populate(store)
+        store.purge(kind="error")
+        hits = _hits(store, "refused")
+        store.close()
+
+        assert hits == [(3, "r2")]
+
+
+class TestIndexBuild:
+    def test_backfills_existing_database(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _populate(store)
+        store.close()
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute("DROP TABLE events_fts")
+        conn.commit()
+        conn.close()
+
+        store = EventStore(tmp_path)
+        hits = _hits(store, "deploy")
+        store.close()
+
+        assert hits == [(1, "r1")]
+
+    def test_reindex_rebuilds_search(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        _populate(store)
+        store.close()
+
+        reindex(tmp_path, workers=1)
+        store = EventStore(tmp_path)
+        hits = _hits(store, "upstream")
+        store.close()
+
+        assert hits == [(2, "r1")]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+from agentmeshd.events import EventV1, make_event
+from agentmeshd.segments import SegmentedLog, iter_lines, read_manifest
+from agentmeshd.store import EventStore
+
+
+def _write(
+    log: SegmentedLog, first_id: int, count: int, ts: str = "2026-01-01T00:00:00+00:00"
+) -> None:
+    lines = [
+        make_event(run_id="r1", kind="status", payload={"i": i}).to_json() for i in range(count)
+    ]
+    log.write(lines, first_id=first_id, first_ts=ts, last_ts=ts)
+
+
+class TestRotation:
+    def test_rotates_by_size(self, tmp_path: Path) -> None:
+        log = SegmentedLog(tmp_path, max_bytes=200, compression="none")
+        for n in range(5):
+            _write(log, first_id=n * 2 + 1, count=2)
+        log.close()
+
+        segments = read_manifest(tmp_path)
+        assert len(segments) == 5
+        assert all(s.sealed for s in segments[:-1])
+        assert not segments[-1].sealed
+        assert [(s.first_id, s.last_id) for s in segments] == [
+            (1, 2),
+            (3, 4),
+            (5, 6),
+            (7, 8),
+            (9, 10),
+        ]
+        assert (tmp_path / "events-000001.jsonl").exists()
+
+    def test_rotates_by_age(self, tmp_path: Path) -> None:
+        log = SegmentedLog(tmp_path, max_age=0, compression="none")
+        _write(log, first_id=1, count=1)
+        _write(log, first_id=2, count=1)
+        log.close()
+        assert len(read_manifest(tmp_path)) == 2
+
+    def test_reopen_continues_active_segment(self, tmp_path: Path) -> None:
+        log = SegmentedLog(tmp_path, compression="none")
+        _write(log, first_id=1, count=3)
+        log.close()
+
+        log = SegmentedLog(tmp_path, compression="none")
+        _write(log, first_id=4, count=2)
+        log.close()
+
+        segments = read_manifest(tmp_path)
+        assert len(segments) == 1
+        assert segments[0].events == 5
+        assert segments[0].last_id == 5
+
+
+class TestCompression:
+    def test_sealed_segments_are_gzipped(self, tmp_path: Path) -> None:
+        log = SegmentedLog(tmp_path, max_bytes=1)
+        _write(log, first_id=1, count=2)
+        _write(log, first_id=3, count=2)
+        log.close()
+
+        sealed, active = read_manifest(tmp_path)
+        assert sealed.compression == "gzip"
+        assert sealed.file == "events-000001.jsonl.gz"
+        assert not (tmp_path / "events-000001.jsonl").exists()
+        assert active.compression == "none"
+        assert len(list(iter_lines(tmp_path))) == 4
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("zstandard") is not None, reason="zstandard installed"
+    )
+    def test_zstd_requires_zstandard(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="zstandard"):
+            SegmentedLog(tmp_path, compression="zstd")
+
+    def test_unknown_compression(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            SegmentedLog(tmp_path, compression="lz4")
+
+
+class TestRangeReads:
+    def test_iter_lines_skips_segments_outside_range(self, tmp_path: Path) -> None:
+        log = SegmentedLog(tmp_path, max_bytes=1, compression="none")
+        _write(log, first_id=1, count=2, ts="2026-01-01T00:00:00+00:00")
+        _write(log, first_id=3, count=2, ts="2026-01-02T00:00:00+00:00")
+        _write(log, first_id=5, count=2, ts="2026-01-03T00:00:00+00:00")
+        log.close()
+
+        assert len(list(iter_lines(tmp_path, after_id=4))) == 2
+        assert len(list(iter_lines(tmp_path, since="2026-01-02T00:00:00+00:00"))) == 4
+        assert len(list(iter_lines(tmp_path, until="2026-01-02T00:00:00+00:00"))) == 2
+
+
+class TestStoreIntegration:
+    def test_store_writes_segments(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path, segment_bytes=300)
+        ids = [store.append(make_event(run_id="r1", kind="status")) for _ in range(4)]
+        store.close()
+
+        segments = read_manifest(tmp_path / "log")
+        assert len(segments) > 1
+        assert segments[0].first_id == ids[0]
+        assert segments[-1].last_id == ids[-1]
+        assert len(list(iter_lines(tmp_path / "log"))) == 4
+
+    def test_legacy_jsonl_adopted_as_segment_zero(self, tmp_path: Path) -> None:
+        legacy = make_event(run_id="old", kind="status")
+        (tmp_path / "events.jsonl").write_text(legacy.to_json() + "\n", encoding="utf-8")
+
+        store = EventStore(tmp_path, compression="none")
+        store.append(make_event(run_id="new", kind="status"))
+        store.close()
+
+        assert not (tmp_path / "events.jsonl").exists()
+        segments = read_manifest(tmp_path / "log")
+        assert segments[0].segment == 0
+        runs = [EventV1.from_json(line).run_id for line in iter_lines(tmp_path / "log")]
+        assert runs == ["old", "new"]
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import time
 from pathlib import Path
 
+import httpx
 import pytest
-from agentmeshd.events import make_event
+from agentmeshd.events import EventV1, make_event
 from agentmeshd.server import create_app
-from agentmeshd.store import EventStore
+from agentmeshd.store import EventStore, RawEventPage
 from starlette.testclient import TestClient
 
 
@@ -52,6 +56,20 @@ class TestPostEvent:
         resp = client.post("/api/events", json=[1, 2, 3])
         assert resp.status_code == 400
 
+    def test_non_string_ts(self, client: TestClient) -> None:
+        resp = client.post("/api/events", json={"run_id": "r1", "kind": "status", "ts": 5})
+        assert resp.status_code == 400
+        assert resp.json() == {"error": "ts must be a string"}
+
+    def test_resent_event_id(self, client: TestClient) -> None:
+        body = {"run_id": "r1", "kind": "status", "event_id": "e-1"}
+        first = client.post("/api/events", json=body)
+        again = client.post("/api/events", json=body)
+        assert first.status_code == 201
+        assert again.status_code == 200
+        assert again.json()["event_id"] == "e-1"
+        assert len(client.get("/api/events", params={"run_id": "r1"}).json()) == 1
+
 
 class TestGetEvents:
     def test_empty(self, client: TestClient) -> None:
@@ -89,6 +107,423 @@ class TestGetEvents:
         resp = client.get("/api/events", params={"limit": "abc"})
         assert resp.status_code == 400
 
+    def test_cursor_pagination(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append_many(
+            [make_event(run_id="r1", kind="status", payload={"i": i}) for i in range(5)]
+        )
+        c = TestClient(create_app(store))
+
+        first = c.get("/api/events", params={"run_id": "r1", "limit": "3"})
+        assert [e["payload"]["i"] for e in first.json()] == [0, 1, 2]
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = c.get("/api/events", params={"run_id": "r1", "limit": "3", "after_id": cursor})
+        assert [e["payload"]["i"] for e in second.json()] == [3, 4]
+        assert "X-Next-Cursor" not in second.headers
+        store.close()
+
+    def test_since_until(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        for hour in range(3):
+            store.append(
+                EventV1.from_dict(
+                    {"ts": f"2026-01-01T0{hour}:00:00+00:00", "run_id": "r1", "kind": "status"}
+                )
+            )
+        c = TestClient(create_app(store))
+
+        resp = c.get(
+            "/api/events",
+            params={"since": "2026-01-01T01:00:00Z", "until": "2026-01-01T02:00:00Z"},
+        )
+        assert resp.status_code == 200
+        assert [e["ts"] for e in resp.json()] == ["2026-01-01T01:00:00+00:00"]
+        store.close()
+
+    def test_invalid_since(self, client: TestClient) -> None:
+        resp = client.get("/api/events", params={"since": "yesterday"})
+        assert resp.status_code == 400
+
+    def test_invalid_after_id(self, client: TestClient) -> None:
+        resp = client.get("/api/events", params={"after_id": "abc"})
+        assert resp.status_code == 400
+
+
+class TestExtractedFieldFilters:
+    def test_filters_on_payload_and_metadata_fields(self, client: TestClient) -> None:
+        client.post(
+            "/api/events/batch",
+            json=[
+                {"run_id": "r1", "kind": "tool", "payload": {"name": "exec"}},
+                {"run_id": "r2", "kind": "status", "payload": {"state": "failed"}},
+                {"run_id": "r3", "kind": "message", "metadata": {"agent_url": "http://a"}},
+            ],
+        )
+
+        for params, run_id in [
+            ({"name": "exec"}, "r1"),
+            ({"state": "failed"}, "r2"),
+            ({"agent_url": "http://a"}, "r3"),
+        ]:
+            resp = client.get("/api/events", params=params)
+            assert [e["run_id"] for e in resp.json()] == [run_id]
+
+
+class TestNdjsonEvents:
+    @pytest.fixture()
+    def client(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+        monkeypatch.setattr("agentmeshd.server._STREAM_PAGE", 3)
+        store = EventStore(tmp_path)
+        store.append_many(
+            [
+                make_event(run_id=f"r{i % 2}", kind="error", payload={"message": f"boom {i}"})
+                for i in range(8)
+            ]
+        )
+        return TestClient(create_app(store))
+
+    @staticmethod
+    def _lines(resp: httpx.Response) -> list[dict[str, object]]:
+        return [json.loads(line) for line in resp.text.splitlines()]
+
+    def test_accept_header_streams_every_page(self, client: TestClient) -> None:
+        resp = client.get(
+            "/api/events", params={"limit": "0"}, headers={"Accept": "application/x-ndjson"}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        assert "X-Next-Cursor" not in resp.headers
+        assert [e["payload"] for e in self._lines(resp)] == [
+            {"message": f"boom {i}"} for i in range(8)
+        ]
+
+    def test_format_param_honours_filters_and_limit(self, client: TestClient) -> None:
+        resp = client.get(
+            "/api/events", params={"format": "ndjson", "run_id": "r1", "after_id": "2"}
+        )
+        assert [e["payload"] for e in self._lines(resp)] == [
+            {"message": f"boom {i}"} for i in (3, 5, 7)
+        ]
+
+        resp = client.get("/api/events", params={"format": "ndjson", "limit": "5"})
+        assert len(self._lines(resp)) == 5
+
+    def test_search_streams_hits(self, client: TestClient) -> None:
+        resp = client.get("/api/events", params={"format": "ndjson", "q": "boom", "limit": "0"})
+        assert len(self._lines(resp)) == 8
+
+        resp = client.get("/api/events", params={"format": "ndjson", "q": 'AND "', "syntax": "fts"})
+        assert resp.status_code == 400
+
+
+class TestSearchEvents:
+    def test_q_returns_ranked_hits_with_cursor(self, client: TestClient) -> None:
+        client.post(
+            "/api/events/batch",
+            json=[
+                {"run_id": "r1", "kind": "error", "payload": {"message": "disk full"}},
+                {"run_id": "r2", "kind": "message", "payload": {"text": "all good"}},
+                {"run_id": "r3", "kind": "error", "payload": {"message": "disk full, disk"}},
+            ],
+        )
+
+        resp = client.get("/api/events", params={"q": "disk", "limit": "1"})
+        assert resp.status_code == 200
+        assert [e["run_id"] for e in resp.json()] == ["r3"]
+
+        resp = client.get(
+            "/api/events",
+            params={"q": "disk", "limit": "1", "cursor": resp.headers["X-Next-Cursor"]},
+        )
+        assert [e["run_id"] for e in resp.json()] == ["r1"]
+
+    def test_invalid_query(self, client: TestClient) -> None:
+        resp = client.get("/api/events", params={"q": 'AND "', "syntax": "fts"})
+        assert resp.status_code == 400
+
+        resp = client.get("/api/events", params={"q": "disk", "syntax": "regex"})
+        assert resp.status_code == 400
+
+    def test_pasted_error_text_is_literal(self, client: TestClient) -> None:
+        client.post(
+            "/api/events",
+            json={"run_id": "r1", "kind": "error", "payload": {"message": "KeyError: 'user-id'"}},
+        )
+        for q in ("127.0.0.1:8080", "KeyError: 'user-id'", "user-id", 'AND "'):
+            resp = client.get("/api/events", params={"q": q})
+            assert resp.status_code == 200, q
+
+        resp = client.get("/api/events", params={"q": "KeyError: 'user-id'"})
+        assert [e["run_id"] for e in resp.json()] == ["r1"]
+
+
+class TestGetRuns:
+    def test_lists_summaries_with_cursor(self, client: TestClient) -> None:
+        for i in range(3):
+            ts = f"2026-01-01T00:00:0{i}Z"
+            client.post("/api/events", json={"run_id": f"r{i}", "kind": "message", "ts": ts})
+        client.post(
+            "/api/events",
+            json={"run_id": "r1", "kind": "status", "payload": {"state": "completed"}},
+        )
+
+        resp = client.get("/api/runs", params={"limit": "2"})
+        assert resp.status_code == 200
+        assert [r["run_id"] for r in resp.json()] == ["r2", "r1"]
+        cursor = resp.headers["X-Next-Cursor"]
+
+        resp = client.get("/api/runs", params={"limit": "2", "cursor": cursor})
+        assert [r["run_id"] for r in resp.json()] == ["r0"]
+        assert "X-Next-Cursor" not in resp.headers
+
+        done = client.get("/api/runs", params={"final": "true"}).json()
+        assert [(r["run_id"], r["state"], r["event_count"]) for r in done] == [
+            ("r1", "completed", 2)
+        ]
+
+    def test_sort_and_order(self, client: TestClient) -> None:
+        client.post("/api/events/batch", json=[{"run_id": "a", "kind": "tool"}] * 3)
+        client.post("/api/events", json={"run_id": "b", "kind": "tool"})
+
+        resp = client.get("/api/runs", params={"sort": "event_count", "order": "asc"})
+        assert [r["run_id"] for r in resp.json()] == ["b", "a"]
+
+    @pytest.mark.parametrize(
+        "params",
+        [{"sort": "payload"}, {"order": "up"}, {"final": "yes"}, {"cursor": "!!"}],
+    )
+    def test_invalid_params(self, client: TestClient, params: dict[str, str]) -> None:
+        assert client.get("/api/runs", params=params).status_code == 400
+
+
+class TestGetTrace:
+    def test_resolves_task_id_to_full_run(self, client: TestClient) -> None:
+        client.post("/api/events", json={"run_id": "r1", "kind": "message"})
+        client.post("/api/events", json={"run_id": "r1", "task_id": "t1", "kind": "status"})
+
+        resp = client.get("/api/trace/t1")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["match"] == "task_id"
+        assert data["run_ids"] == ["r1"]
+        assert data["runs"][0]["event_count"] == 2
+        assert [e["kind"] for e in data["events"]] == ["message", "status"]
+
+    def test_limit_sets_cursor(self, client: TestClient) -> None:
+        client.post("/api/events/batch", json=[{"run_id": "r1", "kind": "tool"}] * 3)
+
+        resp = client.get("/api/trace/r1", params={"limit": "2"})
+        assert len(resp.json()["events"]) == 2
+        assert resp.headers["X-Next-Cursor"] == "2"
+
+    def test_unknown_id(self, client: TestClient) -> None:
+        assert client.get("/api/trace/missing").status_code == 404
+
+    def test_id_with_slash(self, client: TestClient) -> None:
+        client.post("/api/events", json={"run_id": "team/run-1", "kind": "message"})
+
+        resp = client.get("/api/trace/team%2Frun-1")
+        assert resp.status_code == 200
+        assert resp.json()["run_ids"] == ["team/run-1"]
+
+
+class TestResponseCaching:
+    @staticmethod
+    def _finish(client: TestClient, run_id: str) -> None:
+        client.post(
+            "/api/events",
+            json={"run_id": run_id, "kind": "status", "payload": {"state": "completed"}},
+        )
+
+    def test_large_responses_are_gzipped(self, client: TestClient) -> None:
+        client.post(
+            "/api/events/batch",
+            json=[{"run_id": "r1", "kind": "message", "payload": {"text": "hi"}}] * 50,
+        )
+
+        resp = client.get("/api/events", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert len(resp.json()) == 50
+
+        small = client.get("/api/events", params={"limit": "1"})
+        assert "content-encoding" not in small.headers
+
+    def test_finished_trace_revalidates(self, client: TestClient) -> None:
+        client.post("/api/events", json={"run_id": "r1", "kind": "message"})
+        assert "ETag" not in client.get("/api/trace/r1").headers
+
+        self._finish(client, "r1")
+        resp = client.get("/api/trace/r1")
+        etag = resp.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        cached = client.get("/api/trace/r1", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+        # Weak comparison: one tag covers the gzip and identity encodings.
+        identity = client.get("/api/trace/r1", headers={"Accept-Encoding": "identity"})
+        assert identity.headers["ETag"] == etag
+        strong = client.get("/api/trace/r1", headers={"If-None-Match": etag.removeprefix("W/")})
+        assert strong.status_code == 304
+        other = client.get("/api/trace/r1", params={"limit": "1"}, headers={"If-None-Match": etag})
+        assert other.status_code == 200
+
+        client.post("/api/events", json={"run_id": "r1", "kind": "message"})
+        resp = client.get("/api/trace/r1", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+    def test_purged_run_is_not_revalidated_until_refreshed(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        client = TestClient(create_app(store))
+        client.post("/api/events", json={"run_id": "r1", "kind": "message"})
+        self._finish(client, "r1")
+        etag = client.get("/api/trace/r1").headers["ETag"]
+
+        store.purge(upto_id=1)
+        resp = client.get("/api/trace/r1", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert "ETag" not in resp.headers
+        events = client.get("/api/events", params={"run_id": "r1"}, headers={"If-None-Match": etag})
+        assert events.status_code == 200
+        assert "ETag" not in events.headers
+
+        store.refresh_runs()
+        assert client.get("/api/trace/r1").headers["ETag"] != etag
+        store.close()
+
+    def test_finished_run_events_revalidate(self, client: TestClient) -> None:
+        client.post("/api/events", json={"run_id": "r1", "kind": "message"})
+        client.post("/api/events", json={"run_id": "r2", "kind": "message"})
+        self._finish(client, "r1")
+
+        assert "ETag" not in client.get("/api/events", params={"run_id": "r2"}).headers
+        etag = client.get("/api/events", params={"run_id": "r1"}).headers["ETag"]
+        resp = client.get("/api/events", params={"run_id": "r1"}, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+
+class TestPostEventsBatch:
+    def test_json_array(self, client: TestClient) -> None:
+        body = [
+            {"run_id": "r1", "kind": "status", "payload": {"state": "working"}},
+            {"run_id": "r1", "kind": "message", "payload": {"text": "hi"}},
+        ]
+        resp = client.post("/api/events/batch", json=body)
+        assert resp.status_code == 201
+        data = resp.json()
+        assert data["created"] == 2
+        assert data["failed"] == 0
+        assert [r["status"] for r in data["results"]] == ["created", "created"]
+        assert data["results"][1]["id"] == data["results"][0]["id"] + 1
+
+        events = client.get("/api/events", params={"run_id": "r1"}).json()
+        assert [e["kind"] for e in events] == ["status", "message"]
+        assert events[0]["ts"] != ""
+
+    def test_ndjson(self, client: TestClient) -> None:
+        lines = [
+            json.dumps({"run_id": "r1", "kind": "status"}),
+            "",
+            json.dumps({"run_id": "r1", "kind": "artifact"}),
+        ]
+        resp = client.post(
+            "/api/events/batch",
+            content="\n".join(lines).encode(),
+            headers={"content-type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 201
+        assert resp.json()["created"] == 2
+
+    def test_per_item_errors(self, client: TestClient) -> None:
+        lines = [json.dumps({"run_id": "r1", "kind": "status"}), "{broken", "[1]"]
+        resp = client.post(
+            "/api/events/batch",
+            content="\n".join(lines).encode(),
+            headers={"content-type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 207
+        data = resp.json()
+        assert data["created"] == 1
+        assert data["failed"] == 2
+        assert data["results"][1] == {"index": 1, "status": "error", "error": "invalid JSON"}
+        assert data["results"][2]["error"] == "expected JSON object"
+        assert len(client.get("/api/events").json()) == 1
+
+    def test_bad_item_does_not_fail_batch(self, client: TestClient) -> None:
+        body = [
+            {"run_id": "r1", "kind": "status", "ts": 1767225600},
+            "status",
+            {"run_id": "r1", "kind": "tool"},
+        ]
+        resp = client.post("/api/events/batch", json=body)
+        assert resp.status_code == 207
+        data = resp.json()
+        assert (data["created"], data["failed"]) == (1, 2)
+        assert data["results"][0] == {"index": 0, "status": "error", "error": "ts must be a string"}
+        assert [r["status"] for r in data["results"]] == ["error", "error", "created"]
+
+    def test_duplicate_event_ids(self, client: TestClient) -> None:
+        client.post("/api/events", json={"run_id": "r1", "kind": "status", "event_id": "e-1"})
+        body = [
+            {"run_id": "r1", "kind": "status", "event_id": "e-1"},
+            {"run_id": "r1", "kind": "tool", "event_id": "e-2"},
+            {"run_id": "r1", "kind": "tool", "event_id": "e-2"},
+        ]
+        resp = client.post("/api/events/batch", json=body)
+        assert resp.status_code == 201
+        data = resp.json()
+        assert (data["created"], data["duplicates"], data["failed"]) == (1, 2, 0)
+        assert [r["status"] for r in data["results"]] == ["duplicate", "created", "duplicate"]
+        assert data["results"][2]["id"] == data["results"][1]["id"]
+        events = client.get("/api/events", params={"run_id": "r1"}).json()
+        assert [e["event_id"] for e in events] == ["e-1", "e-2"]
+
+    def test_non_array_body(self, client: TestClient) -> None:
+        resp = client.post("/api/events/batch", json={"run_id": "r1"})
+        assert resp.status_code == 400
+
+    def test_invalid_json(self, client: TestClient) -> None:
+        resp = client.post(
+            "/api/events/batch",
+            content=b"not json",
+            headers={"content-type": "application/json"},
+        )
+        assert resp.status_code == 400
+
+
+class TestIngestStream:
+    def test_acks_each_frame_after_commit(self, client: TestClient) -> None:
+        with client.websocket_connect("/api/events/ingest?run_id=r1") as ws:
+            ws.send_text(json.dumps({"seq": 1, "events": [{"kind": "status"}]}))
+            assert ws.receive_json() == {"ack": 1, "created": 1, "duplicates": 0, "failed": 0}
+            frame = {
+                "seq": 2,
+                "events": [
+                    {"kind": "tool", "event_id": "e-1"},
+                    {"kind": "tool", "event_id": "e-1"},
+                    {"run_id": "r2", "kind": "message"},
+                    [1],
+                    {"kind": "tool", "ts": [2026]},
+                ],
+            }
+            ws.send_bytes(json.dumps(frame).encode())
+            assert ws.receive_json() == {"ack": 2, "created": 2, "duplicates": 1, "failed": 2}
+
+        events = client.get("/api/events").json()
+        assert [(e["run_id"], e["kind"]) for e in events] == [
+            ("r1", "status"),
+            ("r1", "tool"),
+            ("r2", "message"),
+        ]
+
+    def test_malformed_frame_closes_channel(self, client: TestClient) -> None:
+        with client.websocket_connect("/api/events/ingest") as ws:
+            ws.send_text(json.dumps({"events": []}))
+            message = ws.receive()
+        assert message == {"type": "websocket.close", "code": 1007, "reason": ""}
+
 
 class TestRoundtripViaApi:
     def test_post_then_get(self, client: TestClient) -> None:
@@ -114,3 +549,146 @@ class TestRoundtripViaApi:
         data = resp.json()
         assert data["ts"] != ""
         assert data["schema_version"] == "1"
+
+
+class TestNonBlockingStore:
+    @pytest.mark.asyncio
+    async def test_ingest_latency_flat_during_slow_query(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        store = EventStore(tmp_path)
+        real_query = store.query_raw_page
+
+        def slow_query(**kwargs: object) -> RawEventPage:
+            time.sleep(0.5)
+            return real_query(**kwargs)  # type: ignore[arg-type]
+
+        monkeypatch.setattr(store, "query_raw_page", slow_query)
+        transport = httpx.ASGITransport(app=create_app(store))
+        body = {"run_id": "r1", "kind": "message", "payload": {"text": "hi"}}
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            t0 = time.perf_counter()
+            assert (await c.post("/api/events", json=body)).status_code == 201
+            baseline = time.perf_counter() - t0
+
+            slow = asyncio.create_task(c.get("/api/events", params={"limit": "0"}))
+            await asyncio.sleep(0.05)
+            t0 = time.perf_counter()
+            assert (await c.post("/api/events", json=body)).status_code == 201
+            during = time.perf_counter() - t0
+            assert not slow.done()
+
+            assert (await slow).status_code == 200
+        assert during < baseline + 0.2
+        store.close()
+
+
+async def _read_sse(
+    app: object,
+    path: str,
+    *,
+    query: str = "",
+    headers: list[tuple[bytes, bytes]] | None = None,
+    count: int,
+) -> tuple[asyncio.Task[None], asyncio.Future[list[tuple[int, dict[str, object]]]]]:
+    """Run a GET against the raw ASGI app and collect ``count`` SSE events, then disconnect."""
+    disconnect = asyncio.Event()
+    received: asyncio.Future[list[tuple[int, dict[str, object]]]] = (
+        asyncio.get_running_loop().create_future()
+    )
+    events: list[tuple[int, dict[str, object]]] = []
+    buffer = ""
+
+    async def receive() -> dict[str, object]:
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, object]) -> None:
+        nonlocal buffer
+        if message["type"] != "http.response.body":
+            return
+        buffer += message.get("body", b"").decode()  # type: ignore[union-attr]
+        while "\n\n" in buffer:
+            block, buffer = buffer.split("\n\n", 1)
+            fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+            if "id" in fields:
+                events.append((int(fields["id"]), json.loads(fields["data"])))
+        if len(events) >= count and not received.done():
+            received.set_result(events[:count])
+            disconnect.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": headers or [],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+    task = asyncio.create_task(app(scope, receive, send))  # type: ignore[operator]
+    return task, received
+
+
+async def _wait_for_subscribers(app: object, n: int) -> None:
+    for _ in range(200):
+        if app.state.broker.subscriber_count == n:  # type: ignore[attr-defined]
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"expected {n} subscribers")
+
+
+class TestEventStream:
+    @pytest.mark.asyncio
+    async def test_live_events_filtered(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        app = create_app(store)
+        task, received = await _read_sse(app, "/api/events/stream", query="run_id=r1", count=2)
+        await _wait_for_subscribers(app, 1)
+
+        await asyncio.to_thread(store.append, make_event(run_id="r2", kind="status"))
+        ids = await asyncio.to_thread(
+            store.append_many,
+            [
+                make_event(run_id="r1", kind="message", payload={"text": "a"}),
+                make_event(run_id="r1", kind="message", payload={"text": "b"}),
+            ],
+        )
+
+        events = await asyncio.wait_for(received, 5)
+        assert [i for i, _ in events] == ids
+        assert [e["payload"] for _, e in events] == [{"text": "a"}, {"text": "b"}]
+        await asyncio.wait_for(task, 5)
+        assert app.state.broker.subscriber_count == 0
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_last_event_id_replays_then_follows(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        first, second, third = store.append_many(
+            [make_event(run_id="r1", kind="status", payload={"n": n}) for n in range(3)]
+        )
+        app = create_app(store)
+        task, received = await _read_sse(
+            app,
+            "/api/events/stream",
+            query="run_id=r1",
+            headers=[(b"last-event-id", str(first).encode())],
+            count=3,
+        )
+        await _wait_for_subscribers(app, 1)
+        live = await asyncio.to_thread(store.append, make_event(run_id="r1", kind="status"))
+
+        events = await asyncio.wait_for(received, 5)
+        assert [i for i, _ in events] == [second, third, live]
+        await asyncio.wait_for(task, 5)
+        store.close()
+
+    def test_invalid_last_event_id(self, client: TestClient) -> None:
+        resp = client.get("/api/events/stream", headers={"Last-Event-ID": "abc"})
+        assert resp.status_code == 400
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import json
+import os
+import sqlite3
+import threading
 from pathlib import Path
 
+import pytest
 from agentmeshd.events import EventV1, make_event
-from agentmeshd.store import EventStore
+from agentmeshd.segments import iter_lines
+from agentmeshd.store import EventStore, StoreLockedError, writer_lock
 
 
 class TestEventStoreAppendAndQuery:
@@ -60,6 +65,24 @@ class TestEventStoreAppendAndQuery:
         assert len(results) == 3
         store.close()
 
+    def test_append_returns_row_id(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        first = store.append(make_event(run_id="r1", kind="status"))
+        second = store.append(make_event(run_id="r1", kind="status"))
+        assert second == first + 1
+        store.close()
+
+    def test_append_many(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        events = [make_event(run_id="r1", kind="message", payload={"i": i}) for i in range(50)]
+        ids = store.append_many(events)
+
+        assert ids == list(range(ids[0], ids[0] + 50))
+        results = store.query(run_id="r1", limit=0)
+        assert [r.payload["i"] for r in results] == list(range(50))
+        assert store.append_many([]) == []
+        store.close()
+
     def test_empty_query(self, tmp_path: Path) -> None:
         store = EventStore(tmp_path)
         results = store.query()
@@ -67,6 +90,182 @@ class TestEventStoreAppendAndQuery:
         store.close()
 
 
+class TestFiltersAndIndexes:
+    def test_filter_by_team_run_id(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append(make_event(run_id="r1", kind="status", team_run_id="tr1"))
+        store.append(make_event(run_id="r2", kind="status", team_run_id="tr2"))
+
+        results = store.query(team_run_id="tr1")
+        assert [r.run_id for r in results] == ["r1"]
+        store.close()
+
+    def test_since_until_window(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        for minute in range(5):
+            store.append(
+                EventV1.from_dict(
+                    {
+                        "ts": f"2026-01-01T00:0{minute}:00+00:00",
+                        "run_id": "r1",
+                        "kind": "status",
+                        "payload": {"m": minute},
+                    }
+                )
+            )
+
+        results = store.query(since="2026-01-01T00:01:00+00:00", until="2026-01-01T00:03:00+00:00")
+        assert [r.payload["m"] for r in results] == [1, 2]
+        store.close()
+
+    def test_run_and_kind_filter_avoids_sort(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        conn = sqlite3.connect(tmp_path / "events.db")
+        try:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM events "
+                "WHERE run_id = ? AND kind = ? AND id > ? ORDER BY id LIMIT 10",
+                ("r1", "status", 0),
+            ).fetchall()
+        finally:
+            conn.close()
+        details = " ".join(row[-1] for row in plan)
+        assert "idx_events_run_id_id" in details
+        assert "TEMP B-TREE" not in details
+        store.close()
+
+    def test_legacy_indexes_dropped(self, tmp_path: Path) -> None:
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "schema_version TEXT NOT NULL DEFAULT '1', ts TEXT NOT NULL, run_id TEXT NOT NULL, "
+            "kind TEXT NOT NULL, task_id TEXT, step TEXT, payload TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, team_run_id TEXT)"
+        )
+        conn.execute("CREATE INDEX idx_events_run_id ON events(run_id)")
+        conn.commit()
+        conn.close()
+
+        store = EventStore(tmp_path)
+        conn = sqlite3.connect(tmp_path / "events.db")
+        try:
+            names = {
+                row[0]
+                for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            }
+        finally:
+            conn.close()
+        assert "idx_events_run_id" not in names
+        assert "idx_events_run_id_id" in names
+        store.close()
+
+    def test_filter_by_extracted_fields(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append_many(
+            [
+                make_event(run_id="r1", kind="message", metadata={"agent_url": "http://a"}),
+                make_event(run_id="r1", kind="status", payload={"state": "failed"}),
+                make_event(run_id="r2", kind="tool", payload={"name": "exec"}),
+                make_event(run_id="r2", kind="tool", payload={"name": "read"}),
+                make_event(run_id="r3", kind="message", metadata={"from": "bob"}),
+            ]
+        )
+
+        assert [e.run_id for e in store.query(fields={"agent_url": "http://a"})] == ["r1"]
+        assert [e.kind for e in store.query(fields={"state": "failed"})] == ["status"]
+        assert [e.payload["name"] for e in store.query(kind="tool", fields={"name": "read"})] == [
+            "read"
+        ]
+        assert store.query_raw_page(fields={"from": "bob"}).ids == [5]
+        with pytest.raises(ValueError):
+            store.query(fields={"payload": "x"})
+        store.close()
+
+    @pytest.mark.parametrize(
+        ("column", "index"),
+        [
+            ("payload_state", "idx_events_payload_state_id"),
+            ("payload_name", "idx_events_payload_name_id"),
+            ("meta_agent_url", "idx_events_meta_agent_url_id"),
+            ("meta_from", "idx_events_meta_from_id"),
+        ],
+    )
+    def test_extracted_fields_use_index(self, tmp_path: Path, column: str, index: str) -> None:
+        store = EventStore(tmp_path)
+        conn = sqlite3.connect(tmp_path / "events.db")
+        try:
+            plan = conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT id FROM events "
+                f"WHERE {column} = ? AND id > ? ORDER BY id LIMIT 10",
+                ("x", 0),
+            ).fetchall()
+        finally:
+            conn.close()
+        details = " ".join(row[-1] for row in plan)
+        assert index in details
+        assert "TEMP B-TREE" not in details
+        store.close()
+
+    def test_existing_table_gains_extracted_columns(self, tmp_path: Path) -> None:
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "schema_version TEXT NOT NULL DEFAULT '1', ts TEXT NOT NULL, run_id TEXT NOT NULL, "
+            "kind TEXT NOT NULL, task_id TEXT, step TEXT, payload TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, team_run_id TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO events (ts, run_id, kind, payload, metadata) VALUES "
+            """('2026-01-01T00:00:00+00:00', 'r1', 'status', '{"state":"failed"}', '{}')"""
+        )
+        conn.commit()
+        conn.close()
+
+        store = EventStore(tmp_path)
+        assert [e.run_id for e in store.query(fields={"state": "failed"})] == ["r1"]
+        store.close()
+
+
+class TestKeysetPagination:
+    def test_pages_cover_all_events(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append_many(
+            [make_event(run_id="r1", kind="status", payload={"i": i}) for i in range(25)]
+        )
+        store.append(make_event(run_id="r2", kind="status"))
+
+        seen: list[int] = []
+        cursor: int | None = None
+        pages = 0
+        while True:
+            page = store.query_page(run_id="r1", after_id=cursor, limit=10)
+            seen.extend(e.payload["i"] for e in page.events)
+            pages += 1
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        assert seen == list(range(25))
+        assert pages == 3
+        store.close()
+
+    def test_no_cursor_on_partial_page(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append(make_event(run_id="r1", kind="status"))
+        page = store.query_page(limit=10)
+        assert len(page.events) == 1
+        assert page.next_cursor is None
+        store.close()
+
+    def test_no_cursor_when_unlimited(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append_many([make_event(run_id="r1", kind="status") for _ in range(3)])
+        page = store.query_page(limit=0)
+        assert len(page.events) == 3
+        assert page.next_cursor is None
+        store.close()
+
+
 class TestJsonlConsistency:
     def test_jsonl_matches_sqlite(self, tmp_path: Path) -> None:
         store = EventStore(tmp_path)
@@ -84,12 +283,7 @@ class TestJsonlConsistency:
         sqlite_results = store.query(run_id="r1")
 
         # Read from JSONL
-        jsonl_path = tmp_path / "events.jsonl"
-        jsonl_results = [
-            EventV1.from_json(line)
-            for line in jsonl_path.read_text(encoding="utf-8").splitlines()
-            if line.strip()
-        ]
+        jsonl_results = [EventV1.from_json(line) for line in iter_lines(tmp_path / "log")]
 
         assert len(sqlite_results) == len(jsonl_results) == 3
         for sq, jl in zip(sqlite_results, jsonl_results, strict=True):
@@ -104,8 +298,7 @@ class TestJsonlConsistency:
         store.append(make_event(run_id="r1", kind="status"))
         store.append(make_event(run_id="r2", kind="error"))
 
-        jsonl_path = tmp_path / "events.jsonl"
-        lines = jsonl_path.read_text(encoding="utf-8").splitlines()
+        lines = list(iter_lines(tmp_path / "log"))
         assert len(lines) == 2
         for line in lines:
             parsed = json.loads(line)
@@ -113,6 +306,155 @@ class TestJsonlConsistency:
             assert "schema_version" in parsed
         store.close()
 
+    def test_failed_log_write_is_cut_off(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        store = EventStore(tmp_path)
+        store.append(make_event(run_id="r1", kind="status"))
+        real_fsync = os.fsync
+        failures = [OSError("disk full")]
+
+        def failing_fsync(fd: int) -> None:
+            if failures:
+                raise failures.pop()
+            real_fsync(fd)
+
+        monkeypatch.setattr(os, "fsync", failing_fsync)
+        with pytest.raises(OSError, match="disk full"):
+            store.append(make_event(run_id="r1", kind="tool"))
+        assert store.append(make_event(run_id="r1", kind="artifact")) == 2
+        store.close()
+
+        lines = [json.loads(line) for line in iter_lines(tmp_path / "log")]
+        assert [(line["id"], line["kind"]) for line in lines] == [(1, "status"), (2, "artifact")]
+
+
+class TestGroupCommit:
+    def test_concurrent_appends_share_commits(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        fsyncs: list[int] = []
+        real_fsync = os.fsync
+
+        def counting_fsync(fd: int) -> None:
+            fsyncs.append(fd)
+            real_fsync(fd)
+
+        store = EventStore(tmp_path, max_batch=100, max_delay=0.2)
+        store.append(make_event(run_id="warmup", kind="status"))
+        monkeypatch.setattr(os, "fsync", counting_fsync)
+        barrier = threading.Barrier(20)
+
+        def worker(i: int) -> None:
+            barrier.wait()
+            store.append(make_event(run_id="r1", kind="message", payload={"i": i}))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(store.query(run_id="r1", limit=0)) == 20
+        assert len(fsyncs) < 20
+        store.close()
+
+    def test_max_batch_caps_commit_size(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        fsyncs: list[int] = []
+        real_fsync = os.fsync
+
+        def counting_fsync(fd: int) -> None:
+            fsyncs.append(fd)
+            real_fsync(fd)
+
+        store = EventStore(tmp_path, max_batch=1)
+        store.append(make_event(run_id="warmup", kind="status"))
+        monkeypatch.setattr(os, "fsync", counting_fsync)
+        for i in range(5):
+            store.append(make_event(run_id="r1", kind="status", payload={"i": i}))
+
+        assert len(fsyncs) == 5
+        store.close()
+
+    def test_append_is_durable_on_return(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path, max_delay=0.01)
+        store.append(make_event(run_id="r1", kind="status"))
+
+        lines = list(iter_lines(tmp_path / "log"))
+        assert len(lines) == 1
+        assert len(store.query(run_id="r1")) == 1
+        store.close()
+
+    def test_append_after_close_raises(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.close()
+        with pytest.raises(RuntimeError):
+            store.append(make_event(run_id="r1", kind="status"))
+
+
+class TestConnectionPool:
+    def test_wal_mode(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        conn = sqlite3.connect(tmp_path / "events.db")
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            conn.close()
+        store.close()
+
+    def test_query_not_blocked_by_open_write_transaction(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append(make_event(run_id="r1", kind="status"))
+
+        other = sqlite3.connect(tmp_path / "events.db", timeout=0)
+        try:
+            other.execute("BEGIN IMMEDIATE")
+            other.execute(
+                "INSERT INTO events (ts, run_id, kind, payload, metadata) "
+                "VALUES ('t', 'r1', 'status', '{}', '{}')"
+            )
+            # Readers see the last committed snapshot instead of waiting.
+            assert len(store.query(run_id="r1")) == 1
+            other.rollback()
+        finally:
+            other.close()
+        store.close()
+
+    def test_parallel_queries_share_bounded_pool(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path, readers=2)
+        for i in range(10):
+            store.append(make_event(run_id="r1", kind="status", payload={"i": i}))
+
+        results: list[int] = []
+        lock = threading.Lock()
+
+        def reader() -> None:
+            for _ in range(20):
+                n = len(store.query(run_id="r1"))
+                with lock:
+                    results.append(n)
+
+        threads = [threading.Thread(target=reader) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == [10] * 160
+        assert store._readers_created <= 2  # pyright: ignore[reportPrivateUsage]
+        store.close()
+
+    def test_reader_connections_are_read_only(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        with (
+            store._reader() as conn,  # pyright: ignore[reportPrivateUsage]
+            pytest.raises(sqlite3.OperationalError),
+        ):
+            conn.execute("DELETE FROM events")
+        store.close()
+
 
 class TestStoreInitialization:
     def test_creates_data_dir(self, tmp_path: Path) -> None:
@@ -131,3 +473,153 @@ class TestStoreInitialization:
         results = store2.query(run_id="r1")
         assert len(results) == 1
         store2.close()
+
+
+class TestRawQuery:
+    def test_raw_page_is_stored_json(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        event = make_event(run_id="r1", kind="tool", payload={"name": "ls", "text": "héllo"})
+        store.append(event)
+        store.append(make_event(run_id="r2", kind="status"))
+
+        page = store.query_raw_page(run_id="r1")
+        assert page.events == [event.to_json()]
+        assert json.loads(page.json_array()) == [event.to_dict()]
+        store.close()
+
+    def test_raw_page_cursor_matches_query_page(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append_many([make_event(run_id="r1", kind="status") for _ in range(5)])
+
+        assert store.query_raw_page(limit=2).next_cursor == store.query_page(limit=2).next_cursor
+        assert store.query_raw_page(limit=10).next_cursor is None
+        store.close()
+
+    def test_rows_without_raw_are_serialized_by_sqlite(self, tmp_path: Path) -> None:
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute(
+            """CREATE TABLE events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                schema_version TEXT NOT NULL DEFAULT '1',
+                ts TEXT NOT NULL, run_id TEXT NOT NULL, kind TEXT NOT NULL,
+                task_id TEXT, step TEXT, payload TEXT NOT NULL, metadata TEXT NOT NULL,
+                team_run_id TEXT
+            )"""
+        )
+        conn.execute(
+            "INSERT INTO events (ts, run_id, kind, payload, metadata) VALUES (?, ?, ?, ?, ?)",
+            ("2026-01-01T00:00:00+00:00", "old", "message", '{"text": "hi"}', "{}"),
+        )
+        conn.commit()
+        conn.close()
+
+        store = EventStore(tmp_path)
+        (raw,) = store.query_raw_page(run_id="old").events
+        assert json.loads(raw) == store.query(run_id="old")[0].to_dict()
+        store.close()
+
+
+class TestListeners:
+    def test_listener_receives_committed_ids(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        seen: list[tuple[int, str]] = []
+        store.add_listener(lambda batch: seen.extend((s.id, s.json) for s in batch))
+
+        events = [make_event(run_id="r1", kind="status") for _ in range(3)]
+        ids = store.append_many(events)
+        assert seen == [(i, e.to_json()) for i, e in zip(ids, events, strict=True)]
+        store.close()
+
+    def test_failing_listener_does_not_fail_append(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+
+        def boom(_batch: object) -> None:
+            raise RuntimeError("boom")
+
+        store.add_listener(boom)
+        assert store.append(make_event(run_id="r1", kind="status")) == 1
+        store.remove_listener(boom)
+        store.close()
+
+
+class TestEventIds:
+    def test_resent_event_is_stored_once(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        seen: list[int] = []
+        store.add_listener(lambda batch: seen.extend(s.id for s in batch))
+        event = make_event(run_id="r1", kind="status")
+
+        first = store.ingest([event])
+        again = store.ingest([make_event(run_id="r1", kind="tool"), event])
+        events = store.query(run_id="r1")
+        store.close()
+
+        assert [(r.id, r.created) for r in first] == [(1, True)]
+        assert [(r.id, r.created) for r in again] == [(2, True), (1, False)]
+        assert [e.kind for e in events] == ["status", "tool"]
+        assert events[0].event_id == event.event_id
+        assert seen == [1, 2]
+        assert len(list(iter_lines(tmp_path / "log"))) == 2
+
+    def test_repeats_within_a_batch(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        a = make_event(run_id="r1", kind="status")
+        b = make_event(run_id="r1", kind="tool")
+        ids = store.append_many([a, b, a, b])
+        runs = store.query_runs().runs
+        store.close()
+
+        assert ids == [1, 2, 1, 2]
+        assert runs[0].event_count == 2
+
+    def test_events_without_id_are_never_merged(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        event = EventV1.from_dict({"run_id": "r1", "kind": "status", "ts": "t"})
+        ids = store.append_many([event, event])
+        store.close()
+
+        assert ids == [1, 2]
+
+    def test_adds_column_to_existing_database(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        store.append(make_event(run_id="r1", kind="status"))
+        store.close()
+        conn = sqlite3.connect(tmp_path / "events.db")
+        conn.execute("DROP INDEX idx_events_event_id")
+        conn.execute("ALTER TABLE events DROP COLUMN event_id")
+        conn.commit()
+        conn.close()
+
+        store = EventStore(tmp_path)
+        event = make_event(run_id="r1", kind="tool")
+        assert store.append_many([event, event]) == [2, 2]
+        store.close()
+
+
+class TestWriterLock:
+    def test_one_writer_per_data_dir(self, tmp_path: Path) -> None:
+        store = EventStore(tmp_path)
+        with pytest.raises(StoreLockedError, match=f"pid {os.getpid()}"):
+            EventStore(tmp_path)
+        with pytest.raises(StoreLockedError), writer_lock(tmp_path):
+            pass
+        store.close()
+
+        with writer_lock(tmp_path):
+            pass
+        store = EventStore(tmp_path)
+        store.close()
+
+    def test_waits_for_the_writer_to_close(self, tmp_path: Path) -> None:
+        first = EventStore(tmp_path)
+        first.append(make_event(run_id="r1", kind="status"))
+        closer = threading.Timer(0.2, first.close)
+        closer.start()
+
+        second = EventStore(tmp_path, lock_timeout=5.0)
+        closer.join()
+        second.append(make_event(run_id="r1", kind="tool"))
+        events = second.query(run_id="r1")
+        second.close()
+
+        assert [e.kind for e in events] == ["status", "tool"]
@@ -30,6 +30,12 @@ def pytest_collection_modifyitems(config: Any, items: list[Any]) -> None:
                 item.add_marker(skip_ci)
 
 
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep trace responses out of the user's ~/.cache/agentmesh."""
+    monkeypatch.setenv("AGENTMESH_CACHE_DIR", str(tmp_path / "cache"))
+
+
 @pytest.fixture(scope="session")
 def daemon_url(tmp_path_factory: pytest.TempPathFactory) -> Generator[str, None, None]:
     """Start an in-process agentmeshd and return its URL."""
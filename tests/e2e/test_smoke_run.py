@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
+import httpx
+import pytest
 from typer.testing import CliRunner
 
 from agentmesh_cli.cli import app
+from agentmeshd.store import EventStore
 
 runner = CliRunner()
 
@@ -27,8 +32,15 @@ class TestRunSmoke:
         assert result.exit_code == 0
         assert "run_id:" in result.output
 
-    def test_run_no_daemon_flag(self, mock_agent_url: str) -> None:
-        """Run with --no-daemon skips daemon check."""
+    def test_run_no_daemon_flag(
+        self,
+        daemon_url: str,
+        mock_agent_url: str,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Run with --no-daemon spools events; sync uploads them to the daemon."""
+        monkeypatch.setenv("AGENTMESH_DATA_DIR", str(tmp_path))
         agent_card_url = f"{mock_agent_url}/.well-known/agent-card.json"
         result = runner.invoke(
             app,
@@ -42,6 +54,36 @@ class TestRunSmoke:
         )
         assert result.exit_code == 0
         assert "run_id:" in result.output
+        assert "agentmesh sync" in result.output
+        run_id = result.output.split("run_id:")[1].split()[0]
+
+        result = runner.invoke(app, ["sync", "--daemon-url", daemon_url])
+        assert result.exit_code == 0, result.output
+        assert list((tmp_path / "spool").iterdir()) == []
+
+        trace = httpx.get(f"{daemon_url}/api/trace/{run_id}").json()
+        assert trace["events"][0]["payload"]["text"] == "Hello no-daemon"
+
+    def test_run_records_to_embedded_store(
+        self,
+        mock_agent_url: str,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Without a reachable daemon, run writes to the data dir's store itself."""
+        monkeypatch.setenv("AGENTMESH_DATA_DIR", str(tmp_path))
+        monkeypatch.delenv("AGENTMESH_DAEMON_URL", raising=False)
+        monkeypatch.setattr("agentmesh_cli.client.DEFAULT_DAEMON_URL", "http://127.0.0.1:1")
+        agent_card_url = f"{mock_agent_url}/.well-known/agent-card.json"
+        result = runner.invoke(app, ["run", "--agent", agent_card_url, "Hello embedded"])
+        assert result.exit_code == 0, result.output
+        assert "recording to" in result.output
+        run_id = result.output.split("run_id:")[1].split()[0]
+
+        store = EventStore(tmp_path)
+        events = store.query(run_id=run_id)
+        store.close()
+        assert events[0].payload["text"] == "Hello embedded"
 
     def test_run_without_daemon_exits_10(self) -> None:
         """Without daemon and without --no-daemon, expect exit code 10."""
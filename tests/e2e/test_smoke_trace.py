@@ -43,6 +43,44 @@ class TestTraceSmoke:
         assert trace_result.exit_code == 0
         assert "message" in trace_result.output
 
+    def test_trace_follow_exits_on_final_status(
+        self, daemon_url: str, mock_agent_url: str
+    ) -> None:
+        """Following a finished run replays it and stops at its final status."""
+        agent_card_url = f"{mock_agent_url}/.well-known/agent-card.json"
+        run_result = runner.invoke(
+            app,
+            ["run", "--agent", agent_card_url, "--daemon-url", daemon_url, "Follow test"],
+        )
+        assert run_result.exit_code == 0
+        match = re.search(r"run_id:\s*(\S+)", run_result.output)
+        assert match, f"run_id not found in output: {run_result.output}"
+
+        trace_result = runner.invoke(
+            app,
+            ["trace", match.group(1), "--follow", "--daemon-url", daemon_url],
+        )
+        assert trace_result.exit_code == 0
+        assert "completed" in trace_result.output
+
+    def test_trace_search_finds_run(self, daemon_url: str, mock_agent_url: str) -> None:
+        """Full-text search finds the run that carried a given message."""
+        agent_card_url = f"{mock_agent_url}/.well-known/agent-card.json"
+        run_result = runner.invoke(
+            app,
+            ["run", "--agent", agent_card_url, "--daemon-url", daemon_url, "zanzibar lookup"],
+        )
+        assert run_result.exit_code == 0
+        match = re.search(r"run_id:\s*(\S+)", run_result.output)
+        assert match, f"run_id not found in output: {run_result.output}"
+
+        search_result = runner.invoke(
+            app,
+            ["trace", "search", "zanzibar", "--format", "json", "--daemon-url", daemon_url],
+        )
+        assert search_result.exit_code == 0
+        assert match.group(1) in search_result.output
+
     def test_trace_unknown_id(self, daemon_url: str) -> None:
         """Trace with unknown ID should fail gracefully."""
         result = runner.invoke(